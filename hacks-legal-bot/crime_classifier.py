@@ -9,7 +9,7 @@ from transformers import (
     AutoTokenizer, AutoModelForSequenceClassification, 
     pipeline, AutoModel
 )
-from sentence_transformers import SentenceTransformer, util
+from model_registry import acquire_sentence_model, release_sentence_model
 from typing import Dict, List, Tuple, Optional
 import json
 from sklearn.metrics.pairwise import cosine_similarity
@@ -36,7 +36,7 @@ class CrimeClassifier:
         
         # Initialize sentence transformer for semantic similarity
         try:
-            self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.sentence_model = acquire_sentence_model('all-MiniLM-L6-v2')
         except Exception as e:
             print(f"Warning: Could not load sentence transformer: {e}")
             self.sentence_model = None
@@ -44,6 +44,12 @@ class CrimeClassifier:
         # Prepare IPC section labels and descriptions
         self.ipc_sections = self._prepare_ipc_labels()
         
+    def release_models(self):
+        """Return the sentence transformer to the shared model registry."""
+        if self.sentence_model is not None:
+            release_sentence_model('all-MiniLM-L6-v2')
+            self.sentence_model = None
+    
     def _prepare_ipc_labels(self) -> List[Dict]:
         """Prepare IPC sections for classification."""
         sections = []
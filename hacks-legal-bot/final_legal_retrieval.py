@@ -4,7 +4,7 @@ Clean, user-friendly interface with section-first approach.
 """
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from model_registry import acquire_sentence_model, release_sentence_model
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import Dict, List
 import pickle
@@ -15,11 +15,18 @@ class FinalLegalRetrieval:
     
     def __init__(self):
         """Initialize the system."""
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.model_name = "all-MiniLM-L6-v2"
+        self.model = acquire_sentence_model(self.model_name)
         self.case_embeddings = None
         self.case_data = None
         self.embeddings_file = "final_embeddings.pkl"
         
+    def release(self):
+        """Return the sentence transformer to the shared model registry."""
+        if self.model is not None:
+            release_sentence_model(self.model_name)
+            self.model = None
+        
     def load_database(self):
         """Load the cases database."""
         print("Loading legal cases database...")
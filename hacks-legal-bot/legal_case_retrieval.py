@@ -7,7 +7,7 @@ import numpy as np
 import json
 import pickle
 from typing import Dict, List, Tuple, Optional
-from sentence_transformers import SentenceTransformer
+from model_registry import acquire_sentence_model, release_sentence_model
 from sklearn.metrics.pairwise import cosine_similarity
 import os
 from datetime import datetime
@@ -31,9 +31,9 @@ class LegalCaseRetrieval:
         self.similarity_threshold = similarity_threshold
         self.precedent_threshold = precedent_threshold
         
-        # Initialize sentence transformer
+        # Shared sentence transformer
         print(f"Loading sentence transformer model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model = acquire_sentence_model(model_name)
         
         # Storage for embeddings and metadata
         self.case_embeddings = None
@@ -44,6 +44,12 @@ class LegalCaseRetrieval:
         self.embeddings_file = "case_embeddings.pkl"
         self.metadata_file = "case_metadata.pkl"
         
+    def release(self):
+        """Return the sentence transformer to the shared model registry."""
+        if self.model is not None:
+            release_sentence_model(self.model_name)
+            self.model = None
+        
     def load_cases_database(self, cases_database_path: str = "cases_database.py"):
         """Load cases from the database file."""
         print("Loading cases database...")
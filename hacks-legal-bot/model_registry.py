@@ -0,0 +1,90 @@
+"""
+Shared Model Registry
+Hands out one instance of each model per process, keyed by model name and device, so
+the classifier and the retrieval systems share the same weights. Instances are
+reference counted and dropped when the last component releases them.
+"""
+
+import gc
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+# Registry key: (role, model name, device)
+ModelKey = Tuple[str, str, str]
+
+
+class ModelRegistry:
+    """Thread-safe, reference-counted store of loaded models."""
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._models: Dict[ModelKey, Any] = {}
+        self._refcounts: Dict[ModelKey, int] = {}
+        self._lock = threading.RLock()
+
+    def acquire(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """
+        Return the shared instance for a key, loading it on first use.
+
+        Args:
+            key: (role, model name, device)
+            loader: Called without arguments to load the model if it is not registered
+
+        Returns:
+            The shared model instance (loader exceptions are propagated)
+        """
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = loader()
+                self._refcounts[key] = 0
+            self._refcounts[key] += 1
+            return self._models[key]
+
+    def release(self, key: ModelKey) -> bool:
+        """
+        Drop one reference to a model, unloading it when no references remain.
+
+        Returns:
+            True if the model was unloaded
+        """
+        with self._lock:
+            if key not in self._refcounts:
+                return False
+            self._refcounts[key] -= 1
+            if self._refcounts[key] > 0:
+                return False
+            del self._models[key]
+            del self._refcounts[key]
+        gc.collect()
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Reference count of every loaded model."""
+        with self._lock:
+            return {"/".join(key): count for key, count in self._refcounts.items()}
+
+
+# Process-wide registry used by all components
+registry = ModelRegistry()
+
+
+def _default_device() -> str:
+    """Device PyTorch models are placed on."""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def acquire_sentence_model(model_name: str = "all-MiniLM-L6-v2") -> Any:
+    """Get the shared SentenceTransformer for a model name."""
+    device = _default_device()
+
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name, device=device)
+
+    return registry.acquire(("sentence", model_name, device), load)
+
+
+def release_sentence_model(model_name: str = "all-MiniLM-L6-v2") -> bool:
+    """Release a model obtained from acquire_sentence_model."""
+    return registry.release(("sentence", model_name, _default_device()))
@@ -4,7 +4,7 @@ Asks for IPC section first, then case description for targeted search.
 """
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from model_registry import acquire_sentence_model, release_sentence_model
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import Dict, List, Tuple
 import pickle
@@ -16,11 +16,17 @@ class StreamlinedRetrieval:
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
         """Initialize the retrieval system."""
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        self.model = acquire_sentence_model(model_name)
         self.case_embeddings = None
         self.case_data = None
         self.embeddings_file = "streamlined_embeddings.pkl"
         
+    def release(self):
+        """Return the sentence transformer to the shared model registry."""
+        if self.model is not None:
+            release_sentence_model(self.model_name)
+            self.model = None
+        
     def load_database(self):
         """Load the existing cases database."""
         print("Loading existing cases database...")
@@ -0,0 +1,249 @@
+"""
+Benchmarks for the Lawyer AI Research Tool
+Measures latency and agreement of the classifier components on the bundled case database.
+
+Usage:
+    python benchmark.py backends --backend onnx_int8
+    python benchmark.py methods --methods linear keyword knn similarity ensemble
+    python benchmark.py preprocess --size-kb 100
+    python benchmark.py startup --module main --budget-ms 1000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from typing import Dict, List, Tuple
+
+from cases_database import get_all_cases
+
+
+def _case_texts() -> List[str]:
+    """Crime descriptions from the bundled case database."""
+    return [case['crime'] for case in get_all_cases().values()]
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Mean, median and p95 latency in milliseconds."""
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'mean_ms': float(latencies_ms.mean()),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95))
+    }
+
+
+def _timed_classifications(classifier, texts: List[str], method: str, top_k: int):
+    """Classify each text individually, returning section rankings and latencies."""
+    rankings, latencies = [], []
+    for text in texts:
+        start = time.perf_counter()
+        results = classifier.classify(text, [], method=method, top_k=top_k)
+        latencies.append(time.perf_counter() - start)
+        rankings.append([result['section_number'] for result in results])
+    return rankings, latencies
+
+
+def benchmark_backends(args):
+    """Compare latency and top-k agreement of an ONNX backend against PyTorch."""
+    from crime_classifier import CrimeClassifier
+
+    texts = _case_texts()
+    print(f"Benchmarking {args.backend} against pytorch on {len(texts)} cases")
+
+    # Without the result cache, so every timed run reaches the models
+    baseline = CrimeClassifier(cache_size=0)
+    candidate = CrimeClassifier(
+        cache_size=0,
+        inference_backend=args.backend,
+        onnx_model_dir=args.onnx_model_dir
+    )
+    reported_fallbacks = set()
+
+    for method in args.methods:
+        # Warm up both backends so one-time initialisation is not measured
+        baseline.classify(texts[0], [], method=method, top_k=args.top_k)
+        candidate.classify(texts[0], [], method=method, top_k=args.top_k)
+
+        # Models load on first use, so the backends in use are only known now
+        fallbacks = {
+            role for role, backend in candidate.active_backends.items() if backend == 'pytorch'
+        } - reported_fallbacks
+        if fallbacks:
+            print(f"Warning: {', '.join(sorted(fallbacks))} fell back to PyTorch")
+            reported_fallbacks |= fallbacks
+
+        baseline_rankings, baseline_latencies = _timed_classifications(baseline, texts, method, args.top_k)
+        candidate_rankings, candidate_latencies = _timed_classifications(candidate, texts, method, args.top_k)
+
+        top1_agreement = np.mean([
+            bool(b) and bool(c) and b[0] == c[0]
+            for b, c in zip(baseline_rankings, candidate_rankings)
+        ])
+        topk_overlap = np.mean([
+            len(set(b) & set(c)) / max(len(b), 1)
+            for b, c in zip(baseline_rankings, candidate_rankings)
+        ])
+
+        baseline_summary = _latency_summary(baseline_latencies)
+        candidate_summary = _latency_summary(candidate_latencies)
+
+        print(f"\n{method.upper()}")
+        print("-" * 40)
+        for name, summary in (('pytorch', baseline_summary), (args.backend, candidate_summary)):
+            print(f"{name:>10}: mean {summary['mean_ms']:.1f} ms | "
+                  f"p50 {summary['p50_ms']:.1f} ms | p95 {summary['p95_ms']:.1f} ms")
+        print(f"   speedup: {baseline_summary['mean_ms'] / candidate_summary['mean_ms']:.2f}x")
+        print(f"top-1 agreement: {top1_agreement:.1%}")
+        print(f"top-{args.top_k} overlap: {topk_overlap:.1%}")
+
+
+def benchmark_methods(args):
+    """Single-text latency and batched throughput of each classification method."""
+    from crime_classifier import CrimeClassifier
+
+    texts = _case_texts() * args.repeat
+    classifier = CrimeClassifier(cache_size=0)
+    print(f"Benchmarking {', '.join(args.methods)} on {len(texts)} texts")
+
+    print(f"\n{'method':>12} | {'mean':>9} | {'p95':>9} | {'batch throughput':>18}")
+    print("-" * 58)
+    for method in args.methods:
+        # Load the method's models so one-time initialisation is not measured
+        classifier.warmup([method])
+        classifier.classify(texts[0], [], method=method, top_k=args.top_k)
+
+        _, latencies = _timed_classifications(classifier, texts, method, args.top_k)
+        summary = _latency_summary(latencies)
+
+        start = time.perf_counter()
+        classifier.classify_many(texts, method=method, top_k=args.top_k)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        print(f"{method:>12} | {summary['mean_ms']:>6.2f} ms | {summary['p95_ms']:>6.2f} ms | "
+              f"{throughput:>11.0f} texts/s")
+
+
+def _long_transcript(size_kb: int) -> str:
+    """A transcript of roughly size_kb kilobytes built from the case database's facts and judgments."""
+    header = "Case No: Crl. Appeal No. 1234/2023\nCourt: High Court of Delhi\nDate of Judgment: 15 March 2023\n"
+    body = "\n".join(
+        f"Facts: {case['facts']}\nJudgment: {case['judgment']}" for case in get_all_cases().values()
+    )
+    text = header + body
+    return (text + "\n") * (size_kb * 1024 // len(text) + 1)
+
+
+def benchmark_preprocess(args):
+    """Time each stage of transcript preprocessing on one long transcript."""
+    from text_preprocessor import LegalTextPreprocessor
+
+    preprocessor = LegalTextPreprocessor()
+    preprocessor.warmup()
+    text = _long_transcript(args.size_kb)
+    cleaned_text = preprocessor.clean_text(text)
+    print(f"Preprocessing a {len(text) / 1024:.0f} KB transcript ({args.repeat} runs per stage)")
+
+    stages = [
+        ('clean_text', preprocessor.clean_text, text),
+        ('extract_entities', preprocessor.extract_entities, cleaned_text),
+        ('extract_actions', preprocessor.extract_actions, cleaned_text),
+        ('structure_transcript', preprocessor.structure_transcript, cleaned_text),
+        ('preprocess', preprocessor.preprocess, text)
+    ]
+    print(f"\n{'stage':>20} | {'mean':>9} | {'p95':>9}")
+    print("-" * 45)
+    for name, stage, stage_input in stages:
+        latencies = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            stage(stage_input)
+            latencies.append(time.perf_counter() - start)
+        summary = _latency_summary(latencies)
+        print(f"{name:>20} | {summary['mean_ms']:>6.1f} ms | {summary['p95_ms']:>6.1f} ms")
+
+
+# Modules that must only be imported when a model is first used, never at startup
+DEFERRED_MODULES = [
+    'torch', 'transformers', 'sentence_transformers', 'onnxruntime', 'optimum',
+    'sklearn', 'spacy', 'nltk', 'faiss'
+]
+
+
+def _import_times(stderr: str) -> List[Tuple[int, str, float]]:
+    """(nesting depth, module, cumulative milliseconds) of each import in `python -X importtime` output."""
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            times.append((depth, name.strip(), int(cumulative) / 1000))
+    return times
+
+
+def benchmark_startup(args):
+    """Import a module in a fresh interpreter and check its import time against a budget."""
+    code = (f"import json, sys, {args.module}; "
+            f"print(json.dumps([name for name in {DEFERRED_MODULES!r} if name in sys.modules]))")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if completed.returncode != 0:
+        print(completed.stderr.strip().splitlines()[-1])
+        sys.exit(1)
+
+    times = _import_times(completed.stderr)
+    total_ms = sum(ms for depth, _, ms in times if depth == 0)
+    loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    print(f"Importing {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    # The module's own imports and theirs, where the time usually goes
+    for _, name, ms in sorted((item for item in times if 1 <= item[0] <= 2), key=lambda item: -item[2])[:args.top]:
+        print(f"{name:>30} | {ms:>7.1f} ms")
+    if loaded:
+        print(f"Imported at startup instead of on first use: {', '.join(loaded)}")
+    if total_ms > args.budget_ms or loaded:
+        sys.exit(1)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Lawyer AI Research Tool benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backends = subparsers.add_parser("backends", help="Compare ONNX Runtime and PyTorch inference")
+    backends.add_argument("--backend", default="onnx_int8", choices=["onnx", "onnx_int8"])
+    backends.add_argument("--onnx-model-dir", default="onnx_models")
+    backends.add_argument("--methods", nargs="+", default=["zero_shot", "similarity"])
+    backends.add_argument("--top-k", type=int, default=5)
+    backends.set_defaults(func=benchmark_backends)
+
+    methods = subparsers.add_parser("methods", help="Compare latency and throughput of classification methods")
+    methods.add_argument("--methods", nargs="+", default=["linear", "keyword", "knn", "similarity", "ensemble"])
+    methods.add_argument("--repeat", type=int, default=20, help="Passes over the case database")
+    methods.add_argument("--top-k", type=int, default=5)
+    methods.set_defaults(func=benchmark_methods)
+
+    preprocess = subparsers.add_parser("preprocess", help="Time the transcript preprocessing stages")
+    preprocess.add_argument("--size-kb", type=int, default=100, help="Approximate transcript size")
+    preprocess.add_argument("--repeat", type=int, default=10, help="Runs per stage")
+    preprocess.set_defaults(func=benchmark_preprocess)
+
+    startup = subparsers.add_parser("startup", help="Check a module's import time against a budget")
+    startup.add_argument("--module", default="main", help="Module to import (main is the API server)")
+    startup.add_argument("--budget-ms", type=float, default=1000.0, help="Fails above this import time")
+    startup.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    startup.set_defaults(func=benchmark_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Labelled Case Index
+Nearest labelled cases of a text and the sections they were charged under, so a
+transcript can be classified by similarity-weighted votes of its neighbours (the
+classifier's 'knn' method). Search goes through the same LabelIndex used for section
+labels: exact for small case databases, FAISS HNSW for large ones.
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from typing import List, Optional
+
+from label_index import LabelIndex
+
+
+class CaseVoteIndex:
+    """Case embeddings plus a sparse (cases x sections) matrix of the sections each case cites."""
+
+    def __init__(self,
+                 embeddings: np.ndarray,
+                 case_sections: List[List[int]],
+                 num_sections: int,
+                 approximate: bool = False,
+                 index_file: Optional[str] = None):
+        """
+        Build the index.
+
+        Args:
+            embeddings: L2-normalised case embeddings, one row per case
+            case_sections: Section indices of each case, in the same order as embeddings
+            num_sections: Size of the section label set
+            approximate: Search a FAISS HNSW graph instead of the exact matrix product
+            index_file: Where to persist the HNSW graph between runs (optional)
+        """
+        self.size = len(case_sections)
+        self.index = LabelIndex(embeddings, approximate=approximate, index_file=index_file)
+
+        rows = [case for case, sections in enumerate(case_sections) for _ in sections]
+        cols = [section for sections in case_sections for section in sections]
+        self.votes = csr_matrix(
+            (np.ones(len(cols), dtype=np.float32), (rows, cols)),
+            shape=(self.size, num_sections)
+        )
+        # A case citing a section twice still casts one vote
+        self.votes.data = np.minimum(self.votes.data, 1.0)
+
+    def vote_scores(self, text_embeddings: np.ndarray, k: int) -> np.ndarray:
+        """
+        Similarity-weighted section votes of each text's k nearest cases.
+
+        Each neighbour votes for its sections with its cosine similarity (negative
+        similarities do not vote); a section's score is its share of the total vote, so
+        scores lie in [0, 1] and a section cited by every neighbour scores 1.
+
+        Args:
+            text_embeddings: L2-normalised text embeddings (texts x dim)
+            k: Number of neighbouring cases per text
+
+        Returns:
+            Dense (texts x sections) vote scores
+        """
+        num_texts = len(text_embeddings)
+        if not self.size or k <= 0:
+            return np.zeros((num_texts, self.votes.shape[1]))
+
+        similarities, indices = self.index.search(text_embeddings, k)
+        weights = np.where(indices >= 0, np.clip(similarities, 0.0, None), 0.0)
+
+        # Sparse (texts x cases) neighbour weights, then one product with the vote matrix
+        neighbours = csr_matrix(
+            (weights.ravel(), (np.repeat(np.arange(num_texts), indices.shape[1]), np.maximum(indices, 0).ravel())),
+            shape=(num_texts, self.size)
+        )
+        scores = np.asarray((neighbours @ self.votes).todense(), dtype=np.float64)
+
+        totals = weights.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(totals > 0, scores / totals, 0.0)
@@ -0,0 +1,158 @@
+"""
+Explicit Citation Extraction
+Finds statutory sections cited outright in a transcript ("charged under IPC Section 378",
+"u/s 302 IPC", "Sections 302 and 34 of the Indian Penal Code", "IPC302") and normalises
+them to canonical section database keys such as "IPC 302". A number needs a section word
+or an act name next to it, a number between capitalised words ("House 302 IPC Colony") is
+read as an address, and a section of another statute ("Section 378 CrPC", "Section 420 of
+the Companies Act") is not taken for an IPC section.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Spelled-out names of statutes, by section key prefix
+ACT_ALIASES = {
+    "IPC": ["ipc", "i.p.c.", "indian penal code", "penal code"],
+    "POCSO": ["pocso act", "protection of children from sexual offences act"],
+    "NDPS": ["ndps act", "narcotic drugs and psychotropic substances act"],
+    "IT Act": ["information technology act"],
+    "Arms Act": ["arms act"]
+}
+
+# Statute assumed when a section is cited without one ("Section 302")
+DEFAULT_ACT = "IPC"
+
+SECTION_NUMBER = r"\d{1,4}[a-z]{0,2}(?!\w)"
+NUMBER_SEPARATOR = r"\s*(?:,|/|&|\band\b|\bor\b|r/w|read\s+with)\s*"
+SECTION_WORD = r"(?:u/ss?\.?|under\s+sections?|sections?|secs?\.?|ss?\.)"
+
+# A statute outside the section database following the section numbers
+OTHER_ACT = re.compile(
+    r"\s*(?:"
+    r"(?:of\s+(?:the\s+)?)?(?:cr\.?\s*p\.?\s*c|c\.?\s*p\.?\s*c)\b"                     # CrPC, Cr.P.C., CPC
+    r"|(?:of\s+(?:the\s+)?)?code\s+of\s+(?:criminal|civil)\s+procedure"
+    r"|of\s+(?:the\s+)?(?:[\w.&'()-]+\s+){0,6}?(?:act|code|rules|ordinance|sanhita)\b"   # of the ... Act
+    r"|(?-i:(?:[A-Z][\w.&'()-]*\s+){1,6}(?:Act|Code|Rules|Ordinance|Sanhita)\b)"        # Companies Act
+    r")",
+    re.IGNORECASE
+)
+
+# Capitalised words on both sides of "302 IPC", as in an address ("House 302 IPC Colony")
+CAPITALISED_BEFORE = re.compile(r"(?<![\w.])[A-Z][\w.]*\s*$")
+CAPITALISED_AFTER = re.compile(r"\s+[A-Z]")
+
+
+class CitationExtractor:
+    """Alias index over the section database keys, matched with a few citation patterns."""
+
+    def __init__(self, sections: Dict[str, Dict]):
+        """
+        Build the alias index.
+
+        Args:
+            sections: Section database keyed by section number ("IPC 378", "POCSO 4", ...)
+        """
+        self._keys = {key.lower(): key for key in sections}
+
+        # Every act code that prefixes a key, plus its spelled-out names
+        self._act_aliases = {}
+        for key, section in sections.items():
+            if " " not in key:
+                continue
+            code = key.rsplit(" ", 1)[0]
+            aliases = [code, section.get("act")] + ACT_ALIASES.get(code, [])
+            if code not in ACT_ALIASES and not code.lower().endswith("act"):
+                aliases.append(f"{code} act")
+            for alias in aliases:
+                if alias:
+                    self._act_aliases.setdefault(alias.lower().rstrip("."), code)
+
+        acts = "|".join(
+            self._alias_pattern(alias) for alias in sorted(self._act_aliases, key=len, reverse=True)
+        )
+        numbers = rf"{SECTION_NUMBER}(?:{NUMBER_SEPARATOR}{SECTION_NUMBER})*"
+        self._patterns = [
+            # "Section 302", "u/s 302 IPC", "Sections 302 and 34 of the IPC"
+            re.compile(
+                rf"(?<![a-z]){SECTION_WORD}\s*(?P<numbers>{numbers})"
+                rf"(?:\s*(?:of\s+(?:the\s+)?)?(?P<act>{acts})(?![a-z]))?",
+                re.IGNORECASE
+            ),
+            # "IPC Section 378", "IPC 378", "IPC302"
+            re.compile(
+                rf"(?<![a-z])(?P<act>{acts})\s*(?:{SECTION_WORD}\s*)?(?P<numbers>{numbers})",
+                re.IGNORECASE
+            )
+        ]
+        # "302 IPC", "302/34 IPC", "420 of the IPC"
+        self._number_first_pattern = re.compile(
+            rf"(?<![\w/-])(?P<numbers>{numbers})\s*(?:of\s+(?:the\s+)?)?(?P<act>{acts})(?![a-z])",
+            re.IGNORECASE
+        )
+        self._patterns.append(self._number_first_pattern)
+        self._number_pattern = re.compile(SECTION_NUMBER, re.IGNORECASE)
+
+    @staticmethod
+    def _alias_pattern(alias: str) -> str:
+        """Regex for an act alias with optional dots and flexible whitespace."""
+        parts = []
+        for char in alias:
+            if char == ".":
+                parts.append(r"\.?")
+            elif char.isspace():
+                parts.append(r"\s+")
+            else:
+                parts.append(re.escape(char))
+        return "".join(parts) + r"\.?"
+
+    def _act_code(self, act: Optional[str]) -> str:
+        """Act code for a matched alias (DEFAULT_ACT when no act follows the section)."""
+        if not act:
+            return DEFAULT_ACT
+        alias = re.sub(r"\s+", " ", act.lower()).rstrip(".")
+        return self._act_aliases.get(alias, self._act_aliases.get(alias.replace(".", ""), DEFAULT_ACT))
+
+    @staticmethod
+    def _is_address(text: str, match) -> bool:
+        """Whether a "302 IPC" match sits between capitalised words, like a house number."""
+        return bool(
+            CAPITALISED_BEFORE.search(text, max(match.start() - 40, 0), match.start())
+            and CAPITALISED_AFTER.match(text, match.end())
+        )
+
+    def extract(self, text: str) -> List[Dict]:
+        """
+        Sections cited in a text.
+
+        Returns:
+            One entry per distinct cited section, in order of first mention, with the
+            canonical 'section' key and the 'mention' it was found in. Citations of
+            sections that are not in the database are ignored.
+        """
+        # Matches from all patterns; the longest match wins where they overlap
+        matches = sorted(
+            (match for pattern in self._patterns for match in pattern.finditer(text)),
+            key=lambda match: (match.start(), -len(match.group()))
+        )
+
+        citations = {}
+        covered_until = -1
+        for match in matches:
+            if match.start() < covered_until:
+                continue
+            if match.re is self._number_first_pattern and self._is_address(text, match):
+                continue
+            covered_until = match.end()
+
+            act = match.group("act")
+            if not act and OTHER_ACT.match(text, match.end()):
+                # A section of a statute outside the database, e.g. "Section 378 CrPC"
+                continue
+            code = self._act_code(act)
+            for number in self._number_pattern.findall(match.group("numbers")):
+                key = self._keys.get(f"{code} {number}".lower())
+                if key and key not in citations:
+                    citations[key] = {"section": key, "mention": match.group().strip()}
+
+        return list(citations.values())
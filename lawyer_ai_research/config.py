@@ -3,7 +3,7 @@ Configuration settings for the Lawyer AI Research Tool
 """
 
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -27,6 +27,38 @@ class Settings(BaseSettings):
     sentence_transformer_model: str = "all-MiniLM-L6-v2"
     classification_method: str = "ensemble"
     top_k_sections: int = 5
+    cascade_top_n: Optional[int] = 10  # Sections shortlisted for zero-shot NLI (None disables the cascade)
+    inference_backend: str = "pytorch"  # pytorch, onnx, or onnx_int8
+    onnx_model_dir: str = "onnx_models"
+    early_exit_margin: Optional[float] = None  # Skip zero-shot when cheap scorers lead by this margin (e.g. 0.3)
+    hierarchy_top_categories: int = 3  # Categories expanded by the hierarchical method
+    pretokenized_nli: bool = True  # Pre-tokenised hypotheses instead of the zero-shot pipeline
+    ensemble_weights: Dict[str, float] = {"zero_shot": 0.4, "similarity": 0.4, "keyword": 0.2}  # Per-method ensemble weights (JSON in env)
+    section_catalogues: List[str] = []  # Extra statute catalogues (JSON, JSONL or CSV; JSON list in env)
+    ann_threshold: int = 1000  # Section count from which label search uses an ANN index
+    ann_top_n: int = 100  # Labels retrieved per text from the ANN index
+    knn_neighbours: int = 10  # Labelled cases voting in the knn method
+    linear_model_path: str = "linear_model.pkl"  # Artifact for the linear method (trained if missing)
+    citation_mode: str = "off"  # off, augment (cited sections + models) or fast (cited sections only)
+    ner_processes: int = 1  # spaCy worker processes for batch preprocessing (nlp.pipe n_process)
+    ner_batch_size: int = 32  # Transcripts per spaCy batch
+    spacy_model: str = "en_core_web_sm"  # Model name or saved model directory (python resource_bundle.py)
+    nltk_data_dir: Optional[str] = None  # Extra NLTK data directory; nothing is downloaded at runtime
+    stream_chunk_chars: int = 100_000  # Characters scanned at a time when streaming transcript files
+    stream_section_chars: int = 20_000  # Characters kept per transcript section when streaming
+    max_transcript_sessions: int = 100  # Open /api/sessions transcripts (least recently updated dropped)
+    warmup_models: bool = True  # Load models at startup instead of on the first request
+    
+    # Classification Result Cache
+    classification_cache_size: int = 1024  # 0 disables the cache
+    classification_cache_ttl: Optional[float] = 3600  # seconds
+    
+    # Long Transcripts (sliding-window classification)
+    long_document_mode: bool = True
+    window_size: int = 180  # words per window
+    window_stride: int = 150  # words between window starts
+    nli_window_size: int = 700  # words per zero-shot NLI window
+    window_pooling: str = "max"  # max or mean
     
     # Similarity Thresholds
     similarity_threshold: float = 0.7
@@ -3,51 +3,430 @@ Crime Classification System using Transformers
 Uses pre-trained models to classify legal case transcripts into IPC sections.
 """
 
-import torch
 import numpy as np
-from transformers import (
-    AutoTokenizer, AutoModelForSequenceClassification, 
-    pipeline, AutoModel
-)
-from sentence_transformers import SentenceTransformer, util
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional
+import copy
 import json
-from sklearn.metrics.pairwise import cosine_similarity
-from ipc_database import IPC_DATABASE, get_all_sections
+import re
+import hashlib
+import os
+import threading
+from itertools import islice
+from case_index import CaseVoteIndex
+from cases_database import get_all_cases
+from ipc_database import IPC_DATABASE, get_all_sections, get_sections_by_category
+from keyword_matcher import KeywordMatcher
+from label_index import LabelIndex
+from model_registry import acquire_sentence_model, acquire_zero_shot_pipeline, release_model
+from result_cache import ClassificationCache
+from section_catalogue import load_section_catalogues
 
 class CrimeClassifier:
     """Classifies legal case transcripts into IPC sections using multiple approaches."""
     
-    def __init__(self, model_name: str = "facebook/bart-large-mnli"):
-        """Initialize the classifier with a pre-trained model."""
+    CLASSIFICATION_METHODS = ('zero_shot', 'similarity', 'keyword', 'ensemble', 'hierarchical', 'knn', 'linear')
+    
+    # Ensemble stages, cheapest first; early exit stops before the zero-shot stage
+    ENSEMBLE_STAGES = ('keyword', 'similarity', 'zero_shot')
+    
+    # Rows of the ensemble's methods x sections score matrix, and their default weights;
+    # 'knn' votes reuse the similarity stage's text embeddings and are off by default
+    ENSEMBLE_METHODS = ('zero_shot', 'similarity', 'keyword', 'knn')
+    DEFAULT_ENSEMBLE_WEIGHTS = {'zero_shot': 0.4, 'similarity': 0.4, 'keyword': 0.2}
+    EARLY_EXIT_STAGES = ('keyword', 'similarity')
+    
+    # Models each method needs; torch, transformers and the models load on first use
+    METHOD_MODELS = {
+        'zero_shot': ('zero_shot',),
+        'similarity': ('sentence',),
+        'keyword': (),
+        'ensemble': ('zero_shot', 'sentence'),
+        'hierarchical': ('zero_shot',),
+        'knn': ('sentence',),
+        'linear': ('linear',)
+    }
+    
+    # Category for sections missing from get_sections_by_category
+    OTHER_CATEGORY = "Other Offenses"
+    
+    def __init__(self, 
+                 model_name: str = "facebook/bart-large-mnli",
+                 sentence_model_name: str = "all-MiniLM-L6-v2",
+                 embeddings_cache_dir: str = ".",
+                 cascade_top_n: Optional[int] = None,
+                 batch_size: int = 16,
+                 inference_backend: str = "pytorch",
+                 onnx_model_dir: str = "onnx_models",
+                 cache_size: int = 1024,
+                 cache_ttl: Optional[float] = 3600,
+                 long_document_mode: bool = True,
+                 window_size: int = 180,
+                 window_stride: int = 150,
+                 nli_window_size: int = 700,
+                 window_pooling: str = 'max',
+                 early_exit_margin: Optional[float] = None,
+                 hierarchy_top_categories: int = 3,
+                 pretokenized_nli: bool = True,
+                 ensemble_weights: Optional[Dict[str, float]] = None,
+                 section_catalogues: Optional[List[str]] = None,
+                 ann_threshold: int = 1000,
+                 ann_top_n: int = 100,
+                 knn_neighbours: int = 10,
+                 linear_model_path: Optional[str] = "linear_model.pkl"):
+        """
+        Initialize the classifier with a pre-trained model.
+        
+        Models are not loaded here: each one is loaded the first time a method that
+        needs it runs, or up front with warmup().
+        
+        Args:
+            model_name: Pre-trained NLI model for zero-shot classification
+            sentence_model_name: Sentence transformer model for semantic similarity
+            embeddings_cache_dir: Directory for the persisted label embeddings
+            cascade_top_n: If set, only the top-N sections shortlisted by the keyword
+                and similarity scorers are sent to the zero-shot NLI model
+            batch_size: Number of sequences per forward pass in batched classification
+            inference_backend: 'pytorch', 'onnx' or 'onnx_int8' (ONNX Runtime with
+                dynamic int8 quantisation); falls back to PyTorch if no export exists
+            onnx_model_dir: Directory containing models exported by onnx_backend.py
+            cache_size: Maximum number of cached classification results (0 disables the cache)
+            cache_ttl: Lifetime of cached results in seconds (None never expires)
+            long_document_mode: Classify texts longer than the window of the model being run
+                by overlapping windows instead of letting the model truncate them
+            window_size: Words per window of the embedding scorers (similarity, kNN);
+                180 words stays within MiniLM's 256-token limit
+            window_stride: Words between window starts (window_size - stride words overlap)
+            nli_window_size: Words per window of the zero-shot NLI scorer; 700 words stays
+                within BART-MNLI's 1024-token limit with room for the hypothesis. NLI windows
+                overlap by as many words as the embedding windows
+            window_pooling: How window scores are aggregated per section ('max' or 'mean')
+            early_exit_margin: Skip the zero-shot stage of the ensemble when the combined
+                keyword/similarity top-1 score leads the runner-up by at least this much
+                (scores normalised to 1.0; None always runs all stages)
+            hierarchy_top_categories: Number of top-scoring categories whose sections are
+                scored by the 'hierarchical' method
+            pretokenized_nli: Score NLI pairs from hypothesis ids tokenised once at load
+                time instead of through the transformers zero-shot pipeline
+            ensemble_weights: Per-method ensemble weights ('zero_shot', 'similarity',
+                'keyword', 'knn'); methods left out get weight 0
+            section_catalogues: Section catalogue files (POCSO, NDPS, IT Act, ...) to
+                classify alongside the IPC; see section_catalogue.py for the format
+            ann_threshold: Section count from which similarity search goes through an
+                approximate nearest-neighbour label index
+            ann_top_n: Labels retrieved per text from the ANN index; also the NLI shortlist
+                size when cascade_top_n is unset, and the depth of cached rankings
+            knn_neighbours: Labelled cases from the case database whose sections vote in
+                the 'knn' method
+            linear_model_path: Artifact written by linear_classifier.py for the 'linear'
+                method; trained on the case database (and saved there) if missing or stale
+        """
         self.model_name = model_name
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.sentence_model_name = sentence_model_name
+        self.embeddings_cache_dir = embeddings_cache_dir
+        self.cascade_top_n = cascade_top_n
+        self.batch_size = batch_size
+        self.long_document_mode = long_document_mode
+        self.window_size = window_size
+        self.window_stride = max(1, min(window_stride, window_size))
+        self.nli_window_size = nli_window_size
+        self.nli_window_stride = max(1, nli_window_size - (self.window_size - self.window_stride))
+        self.window_pooling = window_pooling
+        self.early_exit_margin = early_exit_margin
+        self.hierarchy_top_categories = hierarchy_top_categories
+        self.pretokenized_nli = pretokenized_nli
+        self.ensemble_weights = dict(ensemble_weights or self.DEFAULT_ENSEMBLE_WEIGHTS)
+        unknown = set(self.ensemble_weights) - set(self.ENSEMBLE_METHODS)
+        if unknown:
+            raise ValueError(f"Unknown ensemble methods in weights: {sorted(unknown)}")
+        self._ensemble_weight_vector = np.array(
+            [self.ensemble_weights.get(method, 0.0) for method in self.ENSEMBLE_METHODS]
+        )
+        self._ensemble_knn = self.ensemble_weights.get('knn', 0.0) > 0
+        self._stage_counts = dict.fromkeys(('ensemble_classifications',) + self.ENSEMBLE_STAGES, 0)
+        self._stage_lock = threading.Lock()
+        
+        self.inference_backend = inference_backend
+        self.onnx_model_dir = onnx_model_dir
+        self.linear_model_path = linear_model_path
+        self.active_backends = {}
+        
+        # Lazily loaded models (see the zero_shot_classifier and sentence_model properties)
+        self._models = {}
+        self._model_locks = {role: threading.Lock() for role in ('zero_shot', 'sentence', 'linear')}
+        self._linear_columns = None
+        self._label_embeddings = None
+        self._ann_index = None
+        self._case_index = None
+        self._case_index_lock = threading.Lock()
+        
+        # IPC sections plus statutes from external catalogues; this classifier's own copy,
+        # so catalogues never leak into the shared IPC database
+        self.sections = dict(IPC_DATABASE)
+        if section_catalogues:
+            try:
+                self.sections.update(load_section_catalogues(section_catalogues))
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not load section catalogues: {e}")
+        
+        # Prepare IPC section labels and descriptions
+        self.ipc_sections = self._prepare_ipc_labels()
+        self._label_index = {section['label']: idx for idx, section in enumerate(self.ipc_sections)}
+        self._section_index = {
+            section['section_number']: idx for idx, section in enumerate(self.ipc_sections)
+        }
+        
+        # Offence categories for hierarchical classification
+        self.categories = self._prepare_categories()
+        self._category_index = {category['name']: idx for idx, category in enumerate(self.categories)}
+        self._section_category = {
+            int(idx): category['name'] for category in self.categories for idx in category['section_indices']
+        }
+        
+        # Keyword automaton compiled once from section keywords, titles and descriptions
+        self.keyword_matcher = KeywordMatcher(self.ipc_sections)
+        
+        # Labelled cases for the 'knn' method; their index is built on first use
+        self.knn_neighbours = knn_neighbours
+        self.cases = self._prepare_cases()
+        
+        # Large label sets: similarity searches an ANN index, NLI always gets a shortlist,
+        # and only the top ann_top_n sections of a ranking are cached
+        self.ann_threshold = ann_threshold
+        self.ann_top_n = ann_top_n
+        self.use_ann = len(self.ipc_sections) >= ann_threshold
+        if self.use_ann and not self.cascade_top_n:
+            self.cascade_top_n = ann_top_n
+        self._ranking_depth = min(ann_top_n, len(self.ipc_sections)) if self.use_ann else len(self.ipc_sections)
+        
+        self._database_version = self._database_hash()
+        self._cases_version = hashlib.sha256(
+            json.dumps(self.cases, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+        self._window_config = f"{long_document_mode}:{window_size}:{window_stride}:{nli_window_size}:{window_pooling}"
+        self.cache = ClassificationCache(cache_size, cache_ttl) if cache_size > 0 else None
         
-        # Initialize zero-shot classifier
+        # Statistics of each thread's current or most recent classification call
+        self._call_stats = threading.local()
+        
+    @property
+    def last_classification_stats(self) -> Dict[str, Any]:
+        """
+        Statistics of the most recent classification call on the calling thread.
+        
+        Every classify*() call starts its own dict, so concurrent requests never share
+        counters; classify_with_stats() and classify_many_with_stats() return it directly.
+        """
+        stats = getattr(self._call_stats, 'stats', None)
+        if stats is None:
+            stats = self._call_stats.stats = {'nli_pairs_evaluated': 0}
+        return stats
+    
+    @last_classification_stats.setter
+    def last_classification_stats(self, stats: Dict[str, Any]):
+        self._call_stats.stats = stats
+    
+    @property
+    def zero_shot_classifier(self):
+        """Zero-shot NLI pipeline, loaded on first access (None if it could not be loaded)."""
+        return self._get_model('zero_shot')
+    
+    @property
+    def sentence_model(self):
+        """Sentence embedding model, loaded on first access (None if it could not be loaded)."""
+        return self._get_model('sentence')
+    
+    @property
+    def linear_model(self):
+        """TF-IDF + linear section classifier, loaded on first access (None if unavailable)."""
+        return self._get_model('linear')
+    
+    @property
+    def label_embeddings(self) -> Optional[np.ndarray]:
+        """L2-normalised label embeddings (one row per IPC section), computed with the sentence model."""
+        if self.sentence_model is None:
+            return None
+        return self._label_embeddings
+    
+    @property
+    def device(self) -> str:
+        """Device used by the PyTorch models."""
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    
+    @property
+    def model_version(self) -> str:
+        """
+        Everything besides the input that changes classification scores.
+        
+        Built from configuration only (model ids, requested backend, database versions),
+        so it can key the result cache without loading any model.
+        """
+        return "|".join([
+            self.model_name,
+            self.sentence_model_name,
+            f"backend={self.inference_backend}:{self.onnx_model_dir}",
+            f"linear={self.linear_model_path}",
+            self._database_version,
+            f"cascade={self.cascade_top_n}",
+            f"windows={self._window_config}",
+            f"early_exit={self.early_exit_margin}",
+            f"hierarchy={self.hierarchy_top_categories}",
+            f"weights={json.dumps(self.ensemble_weights, sort_keys=True)}",
+            f"ann={self.ann_top_n if self.use_ann else None}",
+            f"knn={self.knn_neighbours}:{self._cases_version}"
+        ])
+    
+    def _get_model(self, role: str):
+        """Return a model, loading it once in a thread-safe way."""
+        if role in self._models:
+            return self._models[role]
+        
+        with self._model_locks[role]:
+            if role not in self._models:
+                if role == 'zero_shot':
+                    self._models[role] = self._load_zero_shot_model()
+                elif role == 'linear':
+                    self._models[role] = self._load_linear_model()
+                else:
+                    model = self._load_sentence_model()
+                    # Label embeddings must exist before other threads can see the model
+                    self._models[role] = model
+                    if model is not None:
+                        self._label_embeddings = self._load_label_embeddings()
+                        if self.use_ann and self._label_embeddings is not None:
+                            self._ann_index = LabelIndex(
+                                self._label_embeddings, index_file=self._label_index_file()
+                            )
+        return self._models[role]
+    
+    def _load_zero_shot_model(self):
+        """Get the shared zero-shot NLI pipeline (ONNX Runtime or PyTorch) from the registry."""
         try:
-            self.zero_shot_classifier = pipeline(
-                "zero-shot-classification",
-                model=model_name,
-                device=0 if torch.cuda.is_available() else -1
+            model, backend = acquire_zero_shot_pipeline(
+                self.model_name, self.inference_backend, self.onnx_model_dir
             )
+            self.active_backends['zero_shot'] = backend
         except Exception as e:
-            print(f"Warning: Could not load {model_name}. Using sentence transformers instead.")
-            self.zero_shot_classifier = None
+            print(f"Warning: Could not load {self.model_name}. Using sentence transformers instead.")
+            return None
+        
+        if not self.pretokenized_nli:
+            return model
         
-        # Initialize sentence transformer for semantic similarity
         try:
-            self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+            # Score through pre-tokenised hypotheses instead of the pipeline's string handling
+            from nli_scorer import PretokenizedNLIScorer
+            scorer = PretokenizedNLIScorer(model.model, model.tokenizer, batch_size=self.batch_size)
+            scorer.register_labels(
+                [section['label'] for section in self.ipc_sections] + 
+                [category['name'] for category in self.categories]
+            )
+            return scorer
+        except Exception as e:
+            print(f"Warning: Pre-tokenised NLI scoring unavailable ({e}). Using the zero-shot pipeline.")
+            return model
+    
+    def _load_sentence_model(self):
+        """Get the shared sentence embedding model (ONNX Runtime or PyTorch) from the registry."""
+        try:
+            model, backend = acquire_sentence_model(
+                self.sentence_model_name, self.inference_backend, self.onnx_model_dir
+            )
+            self.active_backends['sentence'] = backend
+            return model
         except Exception as e:
             print(f"Warning: Could not load sentence transformer: {e}")
-            self.sentence_model = None
+            return None
+    
+    def _load_linear_model(self):
+        """Load the linear classifier artifact, or train one on the case database and save it."""
+        try:
+            from linear_classifier import LinearSectionClassifier, case_training_data, training_data_hash
+        except ImportError as e:
+            print(f"Warning: Linear classifier unavailable ({e})")
+            return None
         
-        # Prepare IPC section labels and descriptions
-        self.ipc_sections = self._prepare_ipc_labels()
+        texts, labels = case_training_data()
+        model = None
+        if self.linear_model_path and os.path.exists(self.linear_model_path):
+            try:
+                model = LinearSectionClassifier.load(self.linear_model_path)
+                if model.training_hash != training_data_hash(texts, labels):
+                    print("Warning: Linear model was trained on a different case database. Retraining.")
+                    model = None
+            except Exception as e:
+                print(f"Warning: Could not read linear model: {e}")
+        
+        if model is None:
+            try:
+                model = LinearSectionClassifier().fit(texts, labels)
+            except Exception as e:
+                print(f"Warning: Could not train linear classifier: {e}")
+                return None
+            if self.linear_model_path:
+                try:
+                    model.save(self.linear_model_path)
+                except OSError as e:
+                    print(f"Warning: Could not save linear model: {e}")
+        
+        # Classifier section index of each model class (-1 for sections not classified here)
+        self._linear_columns = np.array(
+            [self._section_index.get(section, -1) for section in model.classes], dtype=int
+        )
+        self.active_backends['linear'] = f"sklearn:{model.version}"
+        return model
+    
+    def release_models(self):
+        """Return the loaded models to the shared registry; they reload lazily if used again."""
+        for role, name in (('zero_shot', self.model_name), ('sentence', self.sentence_model_name)):
+            with self._model_locks[role]:
+                model = self._models.pop(role, None)
+                backend = self.active_backends.pop(role, None)
+                if model is not None:
+                    release_model(role, name, backend)
+                if role == 'sentence':
+                    self._label_embeddings = None
+                    self._ann_index = None
+                    self._case_index = None
+        
+        with self._model_locks['linear']:
+            self._models.pop('linear', None)
+            self.active_backends.pop('linear', None)
+    
+    def _required_models(self, method: str) -> Tuple[str, ...]:
+        """Models used by a classification method."""
+        models = self.METHOD_MODELS[method]
+        if method == 'zero_shot' and self.cascade_top_n:
+            # The cascade shortlist uses similarity scores
+            models = models + ('sentence',)
+        return models
+    
+    def warmup(self, methods: Optional[Iterable[str]] = None):
+        """
+        Load the models needed by the given methods up front.
         
+        Args:
+            methods: Classification methods to prepare (defaults to all methods)
+        """
+        for method in methods or self.CLASSIFICATION_METHODS:
+            if method not in self.CLASSIFICATION_METHODS:
+                raise ValueError(f"Unknown classification method: {method}")
+            for role in self._required_models(method):
+                self._get_model(role)
+            if method == 'knn' or (method == 'ensemble' and self._ensemble_knn):
+                self.case_index
+    
+    def loaded_models(self) -> Dict[str, bool]:
+        """Which models have been loaded so far."""
+        return {
+            role: self._models.get(role) is not None 
+            for role in ('zero_shot', 'sentence', 'linear')
+        }
+    
     def _prepare_ipc_labels(self) -> List[Dict]:
         """Prepare IPC sections for classification."""
         sections = []
-        for section_num, section_data in IPC_DATABASE.items():
+        for section_num, section_data in self.sections.items():
             # Create a comprehensive label combining section number, title, and key description
             label = f"{section_data['section']}: {section_data['title']}"
             description = section_data['description'][:200] + "..." if len(section_data['description']) > 200 else section_data['description']
@@ -64,201 +443,1576 @@ class CrimeClassifier:
         
         return sections
     
-    def classify_with_zero_shot(self, text: str, top_k: int = 5) -> List[Dict]:
-        """Classify using zero-shot classification."""
-        if not self.zero_shot_classifier:
+    def _prepare_categories(self) -> List[Dict]:
+        """Group section indices by offence category; uncategorised sections form their own group."""
+        section_index = {section['section_number']: idx for idx, section in enumerate(self.ipc_sections)}
+        
+        categories = []
+        categorised = set()
+        for name, sections in get_sections_by_category(self.sections).items():
+            indices = [section_index[section['section']] for section in sections if section['section'] in section_index]
+            if indices:
+                categories.append({'name': name, 'section_indices': np.array(indices)})
+                categorised.update(indices)
+        
+        remaining = [idx for idx in range(len(self.ipc_sections)) if idx not in categorised]
+        if remaining:
+            categories.append({'name': self.OTHER_CATEGORY, 'section_indices': np.array(remaining)})
+        
+        return categories
+    
+    def _prepare_cases(self) -> List[Dict]:
+        """Fact text and known sections of each labelled case in the case database."""
+        cases = []
+        for case_id, case in get_all_cases().items():
+            sections = [section for section in case.get('sections', []) if section in self._section_index]
+            text = " ".join(filter(None, [case.get('crime', ''), case.get('facts', '')]))
+            if sections and text:
+                cases.append({'id': case_id, 'text': text, 'sections': sections})
+        return cases
+    
+    def _section_text(self, section: Dict) -> str:
+        """Combine title, description, and keywords for semantic matching."""
+        return f"{section['title']} {section['description']} {' '.join(section['keywords'])}"
+    
+    def _database_hash(self) -> str:
+        """Short content hash of the section database (IPC plus catalogues)."""
+        return hashlib.sha256(
+            json.dumps(self.sections, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+    
+    def _sentence_model_slug(self) -> str:
+        """Sentence model name and backend, as used in embedding cache file names."""
+        model_slug = self.sentence_model_name.replace('/', '_')
+        backend = self.active_backends.get('sentence', 'pytorch')
+        if backend != 'pytorch':
+            model_slug = f"{model_slug}_{backend}"
+        return model_slug
+    
+    def _label_embeddings_file(self) -> str:
+        """Cache file for label embeddings, keyed by model name and IPC database contents."""
+        return os.path.join(
+            self.embeddings_cache_dir,
+            f"ipc_label_embeddings_{self._sentence_model_slug()}_{self._database_hash()}.npy"
+        )
+    
+    def _case_embeddings_file(self) -> str:
+        """Cache file for labelled case embeddings, keyed by model name and case contents."""
+        return os.path.join(
+            self.embeddings_cache_dir,
+            f"case_embeddings_{self._sentence_model_slug()}_{self._cases_version}.npy"
+        )
+    
+    def _label_index_file(self) -> str:
+        """Cache file for the ANN label index, next to the label embeddings."""
+        return os.path.splitext(self._label_embeddings_file())[0] + ".faiss"
+    
+    def label_index_info(self) -> Dict:
+        """Size of the label set and how similarity search runs over it."""
+        return {
+            'sections': len(self.ipc_sections),
+            'ann': self.use_ann,
+            'backend': self._ann_index.backend if self._ann_index is not None else 'exact',
+            'neighbours': self.ann_top_n if self.use_ann else None,
+            'nli_shortlist': self.cascade_top_n
+        }
+    
+    def _load_label_embeddings(self) -> Optional[np.ndarray]:
+        """Load the label embedding matrix from disk, or encode and persist it."""
+        return self._cached_embeddings(
+            self._label_embeddings_file(),
+            [self._section_text(section) for section in self.ipc_sections],
+            "label",
+            "IPC section labels"
+        )
+    
+    def _cached_embeddings(self, 
+                           embeddings_file: str, 
+                           texts: List[str], 
+                           cache_name: str, 
+                           description: str) -> Optional[np.ndarray]:
+        """Normalised embeddings of the texts, read from embeddings_file or encoded and saved there."""
+        if os.path.exists(embeddings_file):
+            try:
+                embeddings = np.load(embeddings_file)
+                if embeddings.shape[0] == len(texts):
+                    return embeddings
+            except Exception as e:
+                print(f"Warning: Could not read {cache_name} embeddings cache: {e}")
+        
+        try:
+            embeddings = self._get_model('sentence').encode(texts, normalize_embeddings=True)
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+        except Exception as e:
+            print(f"Warning: Could not encode {description}: {e}")
+            return None
+        
+        try:
+            os.makedirs(self.embeddings_cache_dir, exist_ok=True)
+            np.save(embeddings_file, embeddings)
+        except OSError as e:
+            print(f"Warning: Could not save {cache_name} embeddings cache: {e}")
+        
+        return embeddings
+    
+    @property
+    def case_index(self) -> Optional[CaseVoteIndex]:
+        """Nearest-neighbour index over the labelled cases, built on first access."""
+        if self._case_index is not None or self.sentence_model is None:
+            return self._case_index
+        
+        with self._case_index_lock:
+            if self._case_index is None and self.cases:
+                embeddings = self._cached_embeddings(
+                    self._case_embeddings_file(), [case['text'] for case in self.cases], "case", "labelled cases"
+                )
+                if embeddings is not None:
+                    self._case_index = CaseVoteIndex(
+                        embeddings,
+                        [[self._section_index[section] for section in case['sections']] for case in self.cases],
+                        len(self.ipc_sections),
+                        approximate=len(self.cases) >= self.ann_threshold,
+                        index_file=os.path.splitext(self._case_embeddings_file())[0] + ".faiss"
+                    )
+        return self._case_index
+    
+    def _format_classification(self, index: int, score: float, method: str) -> Dict:
+        """Build a classification result entry for the section at the given index."""
+        section = self.ipc_sections[index]
+        return {
+            'section_number': section['section_number'],
+            'title': section['title'],
+            'description': section['description'],
+            'penalty': section['penalty'],
+            'confidence_score': float(score),
+            'method': method
+        }
+    
+    def section_result(self, section_number: str, score: float, method: str) -> Optional[Dict]:
+        """Classification entry for a section given by number (None if it is unknown)."""
+        idx = self._section_index.get(section_number)
+        return self._format_classification(idx, score, method) if idx is not None else None
+    
+    def _similarity_scores(self, 
+                           text: str, 
+                           candidate_indices: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Cosine similarity between the text and every IPC section label (or only the candidates)."""
+        similarities, _ = self._embedding_scores([text], candidate_indices)
+        return similarities[0] if similarities is not None else None
+    
+    def _embedding_scores(self, 
+                          texts: List[str], 
+                          candidate_indices: Optional[np.ndarray] = None, 
+                          knn: bool = False) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Label similarities and, if requested, case votes (texts x sections) from one batched encode.
+        
+        Either matrix is None when its model or index is unavailable.
+        """
+        if not self.sentence_model or self.label_embeddings is None:
+            return None, None
+        
+        try:
+            # sentence-transformers sorts by length and pads each batch dynamically;
+            # label embeddings are precomputed and normalised
+            text_embeddings = np.asarray(self.sentence_model.encode(
+                texts, batch_size=self.batch_size, normalize_embeddings=True
+            ))
+            similarities = self._label_similarities(text_embeddings, candidate_indices)
+        except Exception as e:
+            print(f"Error in similarity classification: {e}")
+            return None, None
+        
+        return similarities, self._knn_scores(text_embeddings, candidate_indices) if knn else None
+    
+    def _knn_scores(self, 
+                    text_embeddings: np.ndarray, 
+                    candidate_indices: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Similarity-weighted section votes of the nearest labelled cases (NaN outside the candidates)."""
+        if self.case_index is None:
+            return None
+        
+        try:
+            votes = self.case_index.vote_scores(text_embeddings, self.knn_neighbours)
+        except Exception as e:
+            print(f"Error in kNN classification: {e}")
+            return None
+        
+        if candidate_indices is not None:
+            scores = np.full_like(votes, np.nan)
+            scores[:, candidate_indices] = votes[:, candidate_indices]
+            return scores
+        return votes
+    
+    def _label_similarities(self, 
+                            text_embeddings: np.ndarray, 
+                            candidate_indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine similarity (texts x sections) between normalised text embeddings and the labels.
+        
+        With a candidate set only that slice of the label matrix is compared, and with an
+        ANN index only the ann_top_n nearest labels of each text; the other sections are
+        NaN. Otherwise it is a single matrix product.
+        """
+        if candidate_indices is not None:
+            scores = np.full((len(text_embeddings), len(self.ipc_sections)), np.nan)
+            scores[:, candidate_indices] = text_embeddings @ self.label_embeddings[candidate_indices].T
+            return scores
+        
+        if self._ann_index is None:
+            return text_embeddings @ self.label_embeddings.T
+        
+        scores = np.full((len(text_embeddings), len(self.ipc_sections)), np.nan)
+        similarities, indices = self._ann_index.search(text_embeddings, self.ann_top_n)
+        for row, (row_scores, row_indices) in enumerate(zip(similarities, indices)):
+            found = row_indices >= 0
+            scores[row, row_indices[found]] = row_scores[found]
+        return scores
+    
+    def _keyword_scores(self, 
+                        text: str, 
+                        crime_keywords: List[str], 
+                        text_lower: Optional[str] = None,
+                        candidate_indices: Optional[np.ndarray] = None) -> Tuple[np.ndarray, int]:
+        """Raw keyword matching score for every IPC section, and the number of keywords used."""
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        # One pass of the compiled automaton over the text, independent of section count
+        scores, counts = self._keyword_matrix([text_lower], [crime_keywords], candidate_indices)
+        return scores[0], counts[0]
+    
+    def _keyword_matrix(self, 
+                        texts_lower: List[str], 
+                        keywords_list: List[List[str]], 
+                        candidate_indices: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[int]]:
+        """Raw keyword scores (texts x sections); sections outside the candidate set are NaN."""
+        if candidate_indices is None:
+            return self.keyword_matcher.score_many(texts_lower, keywords_list)
+        
+        # Only the candidate columns of the weight matrix take part in the product
+        candidate_scores, counts = self.keyword_matcher.score_many(texts_lower, keywords_list, candidate_indices)
+        scores = np.full((len(texts_lower), len(self.ipc_sections)), np.nan)
+        scores[:, candidate_indices] = candidate_scores
+        return scores, counts
+    
+    def _cascade_candidates(self, 
+                            keyword_scores: np.ndarray, 
+                            similarity_scores: Optional[np.ndarray],
+                            candidate_indices: Optional[np.ndarray] = None) -> List[int]:
+        """Shortlist the top-N sections (of the candidate set, if any) using the cheap scorers."""
+        if candidate_indices is not None and not self._needs_cascade(candidate_indices):
+            return candidate_indices.tolist()
+        
+        combined = np.zeros(len(self.ipc_sections))
+        for scores in (keyword_scores, similarity_scores):
+            if scores is None:
+                continue
+            # Unscored sections (NaN: outside the ANN neighbours or candidate set) get no credit
+            scores = np.nan_to_num(scores, nan=0.0)
+            if scores.max() > 0:
+                combined += np.clip(scores, 0, None) / scores.max()
+        
+        if candidate_indices is not None:
+            outside = np.ones(len(combined), dtype=bool)
+            outside[candidate_indices] = False
+            combined[outside] = -np.inf
+        return self._top_k_indices(combined, self.cascade_top_n).tolist()
+    
+    def _needs_cascade(self, candidate_indices: Optional[np.ndarray] = None) -> bool:
+        """Whether the NLI hypotheses have to be shortlisted (not for small candidate sets)."""
+        if not self.cascade_top_n:
+            return False
+        return candidate_indices is None or len(candidate_indices) > self.cascade_top_n
+    
+    def classify_with_zero_shot(self, 
+                                text: str, 
+                                top_k: int = 5, 
+                                candidate_indices: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Classify using zero-shot classification.
+        
+        Args:
+            text: Text to classify
+            top_k: Number of top sections to return
+            candidate_indices: Optional shortlist of section indices to use as hypotheses;
+                all sections are scored when omitted
+        """
+        scores = self._zero_shot_scores(text, candidate_indices)
+        if scores is None:
             return []
+        return self._zero_shot_results(scores, top_k)
+    
+    def _zero_shot_scores(self, 
+                          text: str, 
+                          candidate_indices: Optional[List[int]] = None) -> Optional[np.ndarray]:
+        """Entailment score for every section; sections outside the shortlist are NaN."""
+        if not self.zero_shot_classifier:
+            return None
         
         # Prepare labels for zero-shot classification
-        labels = [section['label'] for section in self.ipc_sections]
+        if candidate_indices is None:
+            candidate_indices = range(len(self.ipc_sections))
+        labels = [self.ipc_sections[idx]['label'] for idx in candidate_indices]
+        scores = np.full(len(self.ipc_sections), np.nan)
+        if not labels:
+            return scores
         
         try:
-            # Run zero-shot classification
+            # Run zero-shot classification (one premise/hypothesis pair per label)
             result = self.zero_shot_classifier(text, labels, multi_label=True)
+            self.last_classification_stats['nli_pairs_evaluated'] += len(labels)
             
             # Map results back to IPC sections
-            classifications = []
-            for i, (label, score) in enumerate(zip(result['labels'][:top_k], result['scores'][:top_k])):
-                # Find the corresponding IPC section
-                section_data = next((s for s in self.ipc_sections if s['label'] == label), None)
-                if section_data:
-                    classifications.append({
-                        'section_number': section_data['section_number'],
-                        'title': section_data['title'],
-                        'description': section_data['description'],
-                        'penalty': section_data['penalty'],
-                        'confidence_score': float(score),
-                        'method': 'zero_shot'
-                    })
-            
-            return classifications
+            for label, score in zip(result['labels'], result['scores']):
+                scores[self._label_index[label]] = score
+            return scores
             
         except Exception as e:
             print(f"Error in zero-shot classification: {e}")
-            return []
+            return None
     
-    def classify_with_similarity(self, text: str, top_k: int = 5) -> List[Dict]:
+    def classify_with_similarity(self, 
+                                 text: str, 
+                                 top_k: int = 5, 
+                                 candidate_indices: Optional[np.ndarray] = None) -> List[Dict]:
         """Classify using semantic similarity with sentence transformers."""
-        if not self.sentence_model:
+        similarities = self._similarity_scores(text, candidate_indices)
+        if similarities is None:
             return []
         
-        try:
-            # Encode the input text
-            text_embedding = self.sentence_model.encode([text])
-            
-            # Encode all IPC section descriptions
-            section_texts = []
-            for section in self.ipc_sections:
-                # Combine title, description, and keywords for better matching
-                combined_text = f"{section['title']} {section['description']} {' '.join(section['keywords'])}"
-                section_texts.append(combined_text)
-            
-            section_embeddings = self.sentence_model.encode(section_texts)
-            
-            # Calculate similarities
-            similarities = cosine_similarity(text_embedding, section_embeddings)[0]
-            
-            # Get top-k most similar sections
-            top_indices = np.argsort(similarities)[::-1][:top_k]
-            
-            classifications = []
-            for idx in top_indices:
-                section = self.ipc_sections[idx]
-                classifications.append({
-                    'section_number': section['section_number'],
-                    'title': section['title'],
-                    'description': section['description'],
-                    'penalty': section['penalty'],
-                    'confidence_score': float(similarities[idx]),
-                    'method': 'similarity'
-                })
-            
-            return classifications
-            
-        except Exception as e:
-            print(f"Error in similarity classification: {e}")
+        return self._similarity_results(similarities, top_k)
+    
+    def _similarity_results(self, similarities: np.ndarray, top_k: int) -> List[Dict]:
+        """Rank sections by similarity score."""
+        # Get top-k most similar sections; NaN marks sections outside the ANN neighbours
+        top_indices = [
+            idx for idx in self._top_k_indices(np.nan_to_num(similarities, nan=-np.inf), top_k)
+            if not np.isnan(similarities[idx])
+        ]
+        
+        return [
+            self._format_classification(idx, similarities[idx], 'similarity')
+            for idx in top_indices
+        ]
+    
+    def classify_with_knn(self, 
+                          text: str, 
+                          top_k: int = 5, 
+                          candidate_indices: Optional[np.ndarray] = None) -> List[Dict]:
+        """Classify by similarity-weighted votes of the nearest labelled cases."""
+        _, knn_scores = self._embedding_scores([text], candidate_indices, knn=True)
+        if knn_scores is None:
             return []
+        
+        return self._knn_results(knn_scores[0], top_k)
     
-    def classify_with_keyword_matching(self, text: str, crime_keywords: List[str], top_k: int = 5) -> List[Dict]:
+    def _knn_results(self, knn_scores: np.ndarray, top_k: int) -> List[Dict]:
+        """Rank the sections that received votes from neighbouring cases."""
+        knn_scores = np.nan_to_num(knn_scores, nan=0.0)
+        return [
+            self._format_classification(idx, knn_scores[idx], 'knn')
+            for idx in self._top_k_indices(knn_scores, top_k) if knn_scores[idx] > 0
+        ]
+    
+    def classify_with_keyword_matching(self, 
+                                       text: str, 
+                                       crime_keywords: List[str], 
+                                       top_k: int = 5, 
+                                       candidate_indices: Optional[np.ndarray] = None) -> List[Dict]:
         """Classify using keyword matching with IPC sections."""
-        text_lower = text.lower()
-        keyword_scores = {}
-        
-        for section in self.ipc_sections:
-            score = 0
-            section_keywords = [kw.lower() for kw in section['keywords']]
-            
-            # Count keyword matches
-            for keyword in crime_keywords:
-                if keyword.lower() in section_keywords:
-                    score += 1
-                # Also check if keyword appears in text
-                if keyword.lower() in text_lower:
-                    score += 0.5
-            
-            # Check for keyword matches in section title and description
-            title_lower = section['title'].lower()
-            desc_lower = section['description'].lower()
-            
-            for keyword in crime_keywords:
-                if keyword.lower() in title_lower:
-                    score += 2  # Higher weight for title matches
-                if keyword.lower() in desc_lower:
-                    score += 1
-            
-            if score > 0:
-                keyword_scores[section['section_number']] = {
-                    'section': section,
-                    'score': score
-                }
+        keyword_scores, keyword_count = self._keyword_scores(
+            text, crime_keywords, candidate_indices=candidate_indices
+        )
+        return self._keyword_results(keyword_scores, keyword_count, top_k)
+    
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Indices of the top-k scores in descending order, ties kept in index order."""
+        if top_k >= len(scores):
+            return np.argsort(-scores, kind='stable')
+        if top_k <= 0:
+            return np.array([], dtype=int)
         
-        # Sort by score and return top-k
-        sorted_sections = sorted(keyword_scores.items(), key=lambda x: x[1]['score'], reverse=True)[:top_k]
+        # Everything scoring at least the k-th best value, then a stable sort of that subset
+        threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        candidates = np.flatnonzero(scores >= threshold)
+        return candidates[np.argsort(-scores[candidates], kind='stable')][:top_k]
+    
+    def _keyword_results(self, keyword_scores: np.ndarray, keyword_count: int, top_k: int) -> List[Dict]:
+        """Rank sections by keyword score, keeping only sections with a positive score."""
+        # Sections outside a candidate set (NaN) never have a positive score
+        keyword_scores = np.nan_to_num(keyword_scores, nan=0.0)
+        # Partial sort for the top-k
+        sorted_indices = [
+            idx for idx in self._top_k_indices(keyword_scores, top_k)
+            if keyword_scores[idx] > 0
+        ]
         
         classifications = []
-        for section_num, data in sorted_sections:
-            section = data['section']
-            max_possible_score = len(crime_keywords) * 3.5  # Approximate max score
-            confidence = min(data['score'] / max_possible_score, 1.0) if max_possible_score > 0 else 0
-            
-            classifications.append({
-                'section_number': section_num,
-                'title': section['title'],
-                'description': section['description'],
-                'penalty': section['penalty'],
-                'confidence_score': confidence,
-                'method': 'keyword_matching'
-            })
+        max_possible_score = keyword_count * 3.5  # Approximate max score
+        for idx in sorted_indices:
+            confidence = min(keyword_scores[idx] / max_possible_score, 1.0) if max_possible_score > 0 else 0
+            classifications.append(self._format_classification(idx, confidence, 'keyword_matching'))
         
         return classifications
     
-    def ensemble_classify(self, text: str, crime_keywords: List[str], top_k: int = 5) -> List[Dict]:
+    def ensemble_classify(self, 
+                          text: str, 
+                          crime_keywords: List[str], 
+                          top_k: int = 5, 
+                          candidate_indices: Optional[np.ndarray] = None) -> List[Dict]:
         """Combine multiple classification methods for better accuracy."""
-        all_classifications = {}
-        
-        # Get classifications from different methods
-        zero_shot_results = self.classify_with_zero_shot(text, top_k)
-        similarity_results = self.classify_with_similarity(text, top_k)
-        keyword_results = self.classify_with_keyword_matching(text, crime_keywords, top_k)
-        
-        # Combine results with weighted scores
-        methods = {
-            'zero_shot': {'results': zero_shot_results, 'weight': 0.4},
-            'similarity': {'results': similarity_results, 'weight': 0.4},
-            'keyword': {'results': keyword_results, 'weight': 0.2}
-        }
+        # Preprocessing shared by all scorers
+        text_lower = text.lower()
+        cascade = self._needs_cascade(candidate_indices)
         
-        for method_name, method_data in methods.items():
-            for result in method_data['results']:
-                section_num = result['section_number']
-                weighted_score = result['confidence_score'] * method_data['weight']
-                
-                if section_num in all_classifications:
-                    all_classifications[section_num]['confidence_score'] += weighted_score
-                    all_classifications[section_num]['methods'].append(method_name)
-                else:
-                    all_classifications[section_num] = {
-                        'section_number': result['section_number'],
-                        'title': result['title'],
-                        'description': result['description'],
-                        'penalty': result['penalty'],
-                        'confidence_score': weighted_score,
-                        'methods': [method_name]
-                    }
-        
-        # Sort by combined confidence score
-        sorted_classifications = sorted(
-            all_classifications.values(), 
-            key=lambda x: x['confidence_score'], 
-            reverse=True
-        )[:top_k]
-        
-        # Normalize confidence scores
-        if sorted_classifications:
-            max_score = sorted_classifications[0]['confidence_score']
-            for classification in sorted_classifications:
-                classification['confidence_score'] = classification['confidence_score'] / max_score
-        
-        return sorted_classifications
-    
-    def classify(self, text: str, crime_keywords: List[str] = None, method: str = 'ensemble', top_k: int = 5) -> List[Dict]:
-        """Main classification method."""
+        # The cheap scorers run first: the NLI shortlist and the early exit depend on them
+        keyword_scores, keyword_count = self._keyword_scores(text, crime_keywords, text_lower, candidate_indices)
+        similarity_scores, knn_scores = self._first_rows(
+            self._embedding_scores([text], candidate_indices, self._ensemble_knn)
+        )
+        
+        method_scores = self._method_score_matrix(
+            None, similarity_scores, keyword_scores, keyword_count, knn_scores
+        )
+        early_results = self._early_exit_results(method_scores, top_k)
+        if early_results is not None:
+            self._record_stages(self.EARLY_EXIT_STAGES)
+            self.last_classification_stats['stages_run'] = list(self.EARLY_EXIT_STAGES)
+            return early_results
+        
+        shortlist = candidate_indices
+        if cascade:
+            shortlist = self._cascade_candidates(keyword_scores, similarity_scores, candidate_indices)
+            self.last_classification_stats['cascade_candidates'] = [
+                self.ipc_sections[idx]['section_number'] for idx in shortlist
+            ]
+        zero_shot_scores = self._zero_shot_scores(text, shortlist)
+        
+        method_scores = self._method_score_matrix(
+            zero_shot_scores, similarity_scores, keyword_scores, keyword_count, knn_scores
+        )
+        
+        self._record_stages(self.ENSEMBLE_STAGES)
+        self.last_classification_stats['stages_run'] = list(self.ENSEMBLE_STAGES)
+        return self._ensemble_results(method_scores, top_k, self.ENSEMBLE_STAGES)
+    
+    @staticmethod
+    def _first_rows(matrices: Tuple[Optional[np.ndarray], ...]) -> Tuple[Optional[np.ndarray], ...]:
+        """First row of each (texts x sections) matrix, keeping None for missing ones."""
+        return tuple(matrix[0] if matrix is not None else None for matrix in matrices)
+    
+    def _method_score_matrix(self, 
+                             zero_shot_scores: Optional[np.ndarray], 
+                             similarity_scores: Optional[np.ndarray], 
+                             keyword_scores: Optional[np.ndarray], 
+                             keyword_count: int,
+                             knn_scores: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Dense (methods x sections) score matrix in ENSEMBLE_METHODS order.
+        
+        Keyword rows hold the keyword confidence; sections a method did not score
+        (a missing model, or outside the NLI shortlist) are NaN.
+        """
+        num_sections = len(self.ipc_sections)
+        method_scores = np.full((len(self.ENSEMBLE_METHODS), num_sections), np.nan)
+        if zero_shot_scores is not None:
+            method_scores[0] = zero_shot_scores
+        if similarity_scores is not None:
+            method_scores[1] = similarity_scores
+        if keyword_scores is not None:
+            method_scores[2] = self._keyword_confidences(keyword_scores[None, :], [keyword_count])[0]
+        if knn_scores is not None:
+            method_scores[3] = knn_scores
+        return method_scores
+    
+    def _stack_method_scores(self, 
+                             num_texts: int, 
+                             zero_shot_scores: Optional[np.ndarray], 
+                             similarity_scores: Optional[np.ndarray], 
+                             keyword_matrix: Optional[np.ndarray], 
+                             keyword_counts: Optional[List[int]],
+                             knn_scores: Optional[np.ndarray] = None) -> np.ndarray:
+        """Batched counterpart of _method_score_matrix: a (texts x methods x sections) tensor."""
+        method_scores = np.full((num_texts, len(self.ENSEMBLE_METHODS), len(self.ipc_sections)), np.nan)
+        if zero_shot_scores is not None:
+            method_scores[:, 0] = zero_shot_scores
+        if similarity_scores is not None:
+            method_scores[:, 1] = similarity_scores
+        if keyword_matrix is not None:
+            method_scores[:, 2] = self._keyword_confidences(keyword_matrix, keyword_counts)
+        if knn_scores is not None:
+            method_scores[:, 3] = knn_scores
+        return method_scores
+    
+    def _keyword_confidences(self, keyword_scores: np.ndarray, keyword_counts: List[int]) -> np.ndarray:
+        """Raw keyword scores (texts x sections) scaled to [0, 1] by the approximate maximum score."""
+        max_possible = np.asarray(keyword_counts, dtype=np.float64)[:, None] * 3.5
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidences = np.where(max_possible > 0, np.minimum(keyword_scores / max_possible, 1.0), 0.0)
+            confidences = np.where(keyword_scores > 0, confidences, 0.0)
+        # Sections outside a candidate set stay unscored
+        return np.where(np.isnan(keyword_scores), np.nan, confidences)
+    
+    def _ensemble_scores(self, method_scores: np.ndarray) -> np.ndarray:
+        """
+        Weighted sum over the methods axis.
+        
+        Accepts (methods x sections) or (texts x methods x sections); unscored (NaN)
+        entries contribute nothing.
+        """
+        return np.tensordot(np.nan_to_num(method_scores, nan=0.0), self._ensemble_weight_vector, axes=([-2], [0]))
+    
+    def _ensemble_results(self, 
+                          method_scores: np.ndarray, 
+                          top_k: int, 
+                          stages: Tuple[str, ...], 
+                          scores: Optional[np.ndarray] = None) -> List[Dict]:
+        """Rank sections by weighted ensemble score, normalised so the best section scores 1.0."""
+        if scores is None:
+            scores = self._ensemble_scores(method_scores)
+        
+        # Sections no method scored (outside a candidate set) are not ranked
+        scored = ~np.isnan(method_scores).all(axis=0)
+        top_indices = [
+            idx for idx in self._top_k_indices(np.where(scored, scores, -np.inf), top_k) if scored[idx]
+        ]
+        max_score = scores[top_indices[0]] if len(top_indices) else 0.0
+        
+        classifications = []
+        for idx in top_indices:
+            classification = self._format_classification(
+                idx, scores[idx] / max_score if max_score > 0 else scores[idx], 'ensemble'
+            )
+            del classification['method']
+            classification['methods'] = [
+                method for method, score in zip(self.ENSEMBLE_METHODS, method_scores[:, idx])
+                if not np.isnan(score) and score > 0
+            ]
+            classification['stages'] = list(stages)
+            classifications.append(classification)
+        return classifications
+    
+    def ensemble_scores(self, 
+                        texts: List[str], 
+                        keywords_list: Optional[List[List[str]]] = None, 
+                        per_method: bool = False) -> np.ndarray:
+        """
+        Full ensemble score vectors over all IPC sections (ipc_sections order).
+        
+        Args:
+            texts: Texts to score
+            keywords_list: Crime keywords for each text
+            per_method: Return the (texts x methods x sections) matrix in ENSEMBLE_METHODS
+                order instead of the weighted (texts x sections) sum
+        """
+        if keywords_list is None:
+            keywords_list = [[] for _ in texts]
+        
+        similarity_scores, knn_scores = self._embedding_scores(texts, knn=self._ensemble_knn or per_method)
+        keyword_matrix, keyword_counts = self.keyword_matcher.score_many(
+            [text.lower() for text in texts], keywords_list
+        )
+        candidate_lists = None
+        if self.cascade_top_n:
+            candidate_lists = [
+                self._cascade_candidates(
+                    keyword_matrix[i], similarity_scores[i] if similarity_scores is not None else None
+                )
+                for i in range(len(texts))
+            ]
+        zero_shot_scores, _ = self._zero_shot_scores_many(texts, candidate_lists)
+        
+        method_scores = self._stack_method_scores(
+            len(texts), zero_shot_scores, similarity_scores, keyword_matrix, keyword_counts, knn_scores
+        )
+        return method_scores if per_method else self._ensemble_scores(method_scores)
+    
+    def _exits_early(self, method_scores: np.ndarray) -> bool:
+        """
+        Whether the cheap scorers alone are confident enough to skip the zero-shot stage.
+        
+        The keyword and similarity scores are combined with their ensemble weights; the
+        stage is skipped when the normalised top-1 score beats the runner-up by at least
+        early_exit_margin.
+        """
+        if self.early_exit_margin is None:
+            return False
+        
+        scores = self._ensemble_scores(method_scores)
+        best, runner_up = (list(scores[self._top_k_indices(scores, 2)]) + [0.0])[:2]
+        return best > 0 and 1.0 - runner_up / best >= self.early_exit_margin
+    
+    def _early_exit_results(self, method_scores: np.ndarray, top_k: int) -> Optional[List[Dict]]:
+        """
+        Ensemble results from the cheap scorers alone, if they are confident enough.
+        
+        Returns:
+            The early-exit ranking, or None if the NLI stage has to run
+        """
+        if not self._exits_early(method_scores):
+            return None
+        return self._ensemble_results(method_scores, top_k, self.EARLY_EXIT_STAGES)
+    
+    def _record_stages(self, stages: Tuple[str, ...]):
+        """Count an ensemble classification and the stages it ran."""
+        with self._stage_lock:
+            self._stage_counts['ensemble_classifications'] += 1
+            for stage in stages:
+                self._stage_counts[stage] += 1
+    
+    def get_stage_stats(self) -> Dict:
+        """How often each ensemble stage ran or was skipped since start-up."""
+        with self._stage_lock:
+            total = self._stage_counts['ensemble_classifications']
+            return {
+                'early_exit_margin': self.early_exit_margin,
+                'ensemble_classifications': total,
+                'stage_runs': {stage: self._stage_counts[stage] for stage in self.ENSEMBLE_STAGES},
+                'skip_rates': {
+                    stage: round(1 - self._stage_counts[stage] / total, 3) if total else 0.0
+                    for stage in self.ENSEMBLE_STAGES
+                }
+            }
+    
+    def classify(self, 
+                 text: str, 
+                 crime_keywords: List[str] = None, 
+                 method: str = 'ensemble', 
+                 top_k: int = 5, 
+                 candidate_sections: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Main classification method.
+        
+        Args:
+            text: Text to classify
+            crime_keywords: Crime keywords extracted from the text
+            method: Classification method ('ensemble', 'zero_shot', 'similarity', 'keyword', 'hierarchical', 'knn', 'linear')
+            top_k: Number of top sections to return
+            candidate_sections: Only score and rank these sections (e.g. charges from the FIR)
+        """
+        return self.classify_with_stats(text, crime_keywords, method, top_k, candidate_sections)[0]
+    
+    def classify_with_stats(self, 
+                            text: str, 
+                            crime_keywords: List[str] = None, 
+                            method: str = 'ensemble', 
+                            top_k: int = 5, 
+                            candidate_sections: Optional[List[str]] = None) -> Tuple[List[Dict], Dict[str, Any]]:
+        """
+        classify(), also returning the statistics of this call (method, NLI pairs
+        evaluated, cache hit, windows, ...).
+        """
+        if method not in self.CLASSIFICATION_METHODS:
+            raise ValueError(f"Unknown classification method: {method}")
+        
+        stats = self.last_classification_stats = {'method': method, 'nli_pairs_evaluated': 0}
+        return self._classify(text, crime_keywords or [], method, top_k, candidate_sections), stats
+    
+    def _classify(self, 
+                  text: str, 
+                  crime_keywords: List[str], 
+                  method: str, 
+                  top_k: int, 
+                  candidate_sections: Optional[List[str]]) -> List[Dict]:
+        """classify() body; writes its statistics into last_classification_stats."""
         if not text.strip():
             return []
         
-        if crime_keywords is None:
-            crime_keywords = []
+        candidate_indices = self._candidate_indices(candidate_sections)
+        if candidate_indices is not None:
+            self.last_classification_stats['candidate_sections'] = len(candidate_indices)
+            if not len(candidate_indices):
+                return []
+        
+        if not self._cacheable(top_k):
+            return self._classify_uncached(text, crime_keywords, method, top_k, candidate_indices)
+        
+        # Cache the full ranking so any top_k can be served from one entry
+        cache_key = self._cache_key(text, crime_keywords, method, candidate_sections)
+        ranked = self.cache.get(cache_key)
+        self.last_classification_stats['cache_hit'] = ranked is not None
+        if ranked is None:
+            ranked = self._classify_uncached(
+                text, crime_keywords, method, self._ranking_depth, candidate_indices
+            )
+            self.cache.put(cache_key, ranked)
+        
+        return copy.deepcopy(ranked[:top_k])
+    
+    def _cacheable(self, top_k: int) -> bool:
+        """Whether a top-k ranking can be served from cached rankings."""
+        if self.cache is None:
+            return False
+        return top_k <= self._ranking_depth or self._ranking_depth == len(self.ipc_sections)
+    
+    def _candidate_indices(self, candidate_sections: Optional[List[str]]) -> Optional[np.ndarray]:
+        """Sorted section indices of a caller-supplied candidate set (None when unrestricted)."""
+        if candidate_sections is None:
+            return None
+        
+        unknown = [section for section in candidate_sections if section not in self._section_index]
+        if unknown:
+            print(f"Warning: Ignoring unknown candidate sections: {', '.join(unknown)}")
+        return np.array(sorted({
+            self._section_index[section] for section in candidate_sections if section in self._section_index
+        }), dtype=int)
+    
+    def _cache_key(self, 
+                   text: str, 
+                   crime_keywords: List[str], 
+                   method: str, 
+                   candidate_sections: Optional[List[str]] = None) -> str:
+        """Result cache key for a classification request (never loads a model)."""
+        return ClassificationCache.make_key(
+            text, method, self.model_version, crime_keywords, candidate_sections
+        )
+    
+    def _classify_uncached(self, 
+                           text: str, 
+                           crime_keywords: List[str], 
+                           method: str, 
+                           top_k: int, 
+                           candidate_indices: Optional[np.ndarray] = None) -> List[Dict]:
+        """Run the requested classification method."""
+        if self._is_long_document(text, method):
+            results, nli_pairs, num_windows = self._classify_windows(
+                text, crime_keywords, method, top_k, candidate_indices=candidate_indices
+            )
+            self.last_classification_stats['nli_pairs_evaluated'] += nli_pairs
+            self.last_classification_stats['windows'] = num_windows
+            return results
         
         if method == 'zero_shot':
-            return self.classify_with_zero_shot(text, top_k)
+            shortlist = candidate_indices
+            if self._needs_cascade(candidate_indices):
+                shortlist = self._cascade_candidates(
+                    self._keyword_scores(text, crime_keywords, candidate_indices=candidate_indices)[0], 
+                    self._similarity_scores(text, candidate_indices),
+                    candidate_indices
+                )
+            return self.classify_with_zero_shot(text, top_k, shortlist)
         elif method == 'similarity':
-            return self.classify_with_similarity(text, top_k)
+            return self.classify_with_similarity(text, top_k, candidate_indices)
         elif method == 'keyword':
-            return self.classify_with_keyword_matching(text, crime_keywords, top_k)
+            return self.classify_with_keyword_matching(text, crime_keywords, top_k, candidate_indices)
         elif method == 'ensemble':
-            return self.ensemble_classify(text, crime_keywords, top_k)
+            return self.ensemble_classify(text, crime_keywords, top_k, candidate_indices)
+        elif method == 'hierarchical':
+            return self.classify_hierarchical(text, top_k, candidate_indices)
+        elif method == 'knn':
+            return self.classify_with_knn(text, top_k, candidate_indices)
+        elif method == 'linear':
+            return self.classify_with_linear(text, top_k, candidate_indices)
         else:
             raise ValueError(f"Unknown classification method: {method}")
+    
+    def classify_hierarchical(self, 
+                              text: str, 
+                              top_k: int = 5, 
+                              candidate_indices: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Two-level classification: score the offence categories, then only the sections
+        inside the top hierarchy_top_categories categories.
+        
+        Each section's confidence is its category score times its own score, so the
+        number of NLI hypotheses grows with the category count plus the size of the
+        selected categories rather than with the whole section database.
+        """
+        results, pairs_per_text = self._hierarchical_many([text], top_k, candidate_indices)
+        self.last_classification_stats['nli_pairs_evaluated'] += pairs_per_text[0]
+        return results[0]
+    
+    def _category_scores_many(self, 
+                              texts: List[str], 
+                              candidate_indices: Optional[np.ndarray] = None) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        Category scores (texts x categories) and NLI pairs per text.
+        
+        Categories are NLI hypotheses when the zero-shot model is available; otherwise
+        each category takes the best similarity score among its sections. With a
+        candidate set only categories containing a candidate are scored; the others
+        are -inf.
+        """
+        category_indices = [
+            idx for idx, category in enumerate(self.categories)
+            if candidate_indices is None or np.isin(category['section_indices'], candidate_indices).any()
+        ]
+        
+        if self.zero_shot_classifier:
+            names = [self.categories[idx]['name'] for idx in category_indices]
+            scores = np.full((len(texts), len(self.categories)), -np.inf)
+            try:
+                for bucket in self._length_buckets(texts):
+                    outputs = self.zero_shot_classifier(
+                        [texts[idx] for idx in bucket], names,
+                        multi_label=True, batch_size=self.batch_size
+                    )
+                    if isinstance(outputs, dict):
+                        outputs = [outputs]
+                    for text_idx, output in zip(bucket, outputs):
+                        for name, score in zip(output['labels'], output['scores']):
+                            scores[text_idx, self._category_index[name]] = score
+                return scores, [len(names)] * len(texts)
+            except Exception as e:
+                print(f"Error in category classification: {e}")
+        
+        similarity_scores = self._similarity_scores_many(texts, candidate_indices)
+        if similarity_scores is None:
+            return None, [0] * len(texts)
+        similarity_scores = np.nan_to_num(similarity_scores, nan=-1.0)
+        scores = np.full((len(texts), len(self.categories)), -np.inf)
+        for idx in category_indices:
+            scores[:, idx] = similarity_scores[:, self.categories[idx]['section_indices']].max(axis=1)
+        return scores, [0] * len(texts)
+    
+    def _hierarchical_many(self, 
+                           texts: List[str], 
+                           top_k: int, 
+                           candidate_indices: Optional[np.ndarray] = None) -> Tuple[List[List[Dict]], List[int]]:
+        """Hierarchical classification of several texts; returns results and NLI pairs per text."""
+        category_scores, pairs_per_text = self._category_scores_many(texts, candidate_indices)
+        if category_scores is None:
+            return [[] for _ in texts], pairs_per_text
+        
+        # Sections of the top categories, with the category score each one inherits
+        top_categories = np.argsort(-category_scores, axis=1, kind='stable')[:, :self.hierarchy_top_categories]
+        candidate_lists = []
+        inherited_scores = np.zeros((len(texts), len(self.ipc_sections)))
+        for i, category_indices in enumerate(top_categories):
+            candidates = []
+            for category_idx in category_indices:
+                if np.isinf(category_scores[i, category_idx]):
+                    # Category without candidate sections
+                    continue
+                section_indices = self.categories[category_idx]['section_indices']
+                if candidate_indices is not None:
+                    section_indices = section_indices[np.isin(section_indices, candidate_indices)]
+                inherited_scores[i, section_indices] = np.maximum(
+                    inherited_scores[i, section_indices], category_scores[i, category_idx]
+                )
+                candidates.extend(section_indices.tolist())
+            candidate_lists.append(list(dict.fromkeys(candidates)))
+        
+        section_scores, section_pairs = self._zero_shot_scores_many(texts, candidate_lists)
+        if section_scores is None:
+            # No NLI model: score the candidate sections by similarity instead
+            similarity_scores = self._similarity_scores_many(texts, candidate_indices)
+            if similarity_scores is None:
+                return [[] for _ in texts], pairs_per_text
+            section_scores = np.full((len(texts), len(self.ipc_sections)), np.nan)
+            for i, candidates in enumerate(candidate_lists):
+                section_scores[i, candidates] = similarity_scores[i, candidates]
+        
+        results = []
+        for i in range(len(texts)):
+            combined = section_scores[i] * inherited_scores[i]
+            ranked = [
+                idx for idx in np.argsort(-np.nan_to_num(combined, nan=-1.0), kind='stable')
+                if not np.isnan(combined[idx])
+            ][:top_k]
+            
+            classifications = []
+            for idx in ranked:
+                classification = self._format_classification(idx, combined[idx], 'hierarchical')
+                classification['category'] = self._section_category[int(idx)]
+                classification['category_score'] = float(inherited_scores[i, idx])
+                classifications.append(classification)
+            results.append(classifications)
+            pairs_per_text[i] += section_pairs[i]
+        
+        return results, pairs_per_text
+    
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        """Token length of each text, used to bucket inputs of similar size together."""
+        encode_premises = getattr(self.zero_shot_classifier, 'encode_premises', None)
+        if encode_premises is not None:
+            # The scorer keeps these ids for the NLI call that follows
+            return [len(ids) for ids in encode_premises(texts)]
+        
+        tokenizer = getattr(self.zero_shot_classifier, 'tokenizer', None)
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(texts, add_special_tokens=False, truncation=True)
+                return [len(ids) for ids in encoded['input_ids']]
+            except Exception:
+                pass
+        return [len(text.split()) for text in texts]
+    
+    def _length_buckets(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into batches of similar token length to minimise padding."""
+        lengths = self._token_lengths(texts)
+        order = sorted(range(len(texts)), key=lambda idx: lengths[idx])
+        return [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+    
+    def _similarity_scores_many(self, 
+                                texts: List[str], 
+                                candidate_indices: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Cosine similarity matrix (texts x sections) from one batched encode."""
+        return self._embedding_scores(texts, candidate_indices)[0]
+    
+    def _zero_shot_scores_many(self, 
+                               texts: List[str], 
+                               candidate_lists: Optional[List[List[int]]] = None,
+                               candidate_indices: Optional[np.ndarray] = None) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        Zero-shot entailment scores (texts x sections) computed over real batches.
+        
+        candidate_lists gives each text its own hypotheses; otherwise all texts share
+        candidate_indices (every section when None). Sections that were not sent to the
+        NLI model are left as NaN. Also returns the number of NLI pairs evaluated for
+        each text.
+        """
+        if not self.zero_shot_classifier:
+            return None, [0] * len(texts)
+        
+        scores = np.full((len(texts), len(self.ipc_sections)), np.nan)
+        pairs_per_text = [0] * len(texts)
+        
+        try:
+            for bucket in self._length_buckets(texts):
+                if candidate_lists is None:
+                    # Shared hypothesis set: the whole bucket goes through one pipeline call
+                    shared = range(len(self.ipc_sections)) if candidate_indices is None else candidate_indices
+                    groups = [(bucket, list(shared))]
+                else:
+                    # Each text has its own shortlist; its pairs still form one batch
+                    groups = [([idx], candidate_lists[idx]) for idx in bucket]
+                
+                for text_indices, section_indices in groups:
+                    if not section_indices:
+                        continue
+                    labels = [self.ipc_sections[idx]['label'] for idx in section_indices]
+                    outputs = self.zero_shot_classifier(
+                        [texts[idx] for idx in text_indices], labels,
+                        multi_label=True, batch_size=self.batch_size
+                    )
+                    if isinstance(outputs, dict):
+                        outputs = [outputs]
+                    
+                    for text_idx, output in zip(text_indices, outputs):
+                        for label, score in zip(output['labels'], output['scores']):
+                            scores[text_idx, self._label_index[label]] = score
+                        pairs_per_text[text_idx] = len(labels)
+            
+        except Exception as e:
+            print(f"Error in batched zero-shot classification: {e}")
+            return None, [0] * len(texts)
+        
+        return scores, pairs_per_text
+    
+    def _zero_shot_results(self, scores: np.ndarray, top_k: int) -> List[Dict]:
+        """Rank the sections that were scored by the NLI model."""
+        return self._scored_results(scores, top_k, 'zero_shot')
+    
+    def _scored_results(self, scores: np.ndarray, top_k: int, method: str) -> List[Dict]:
+        """Rank the sections with a score, skipping unscored (NaN) ones."""
+        scored = np.flatnonzero(~np.isnan(scores))
+        return [
+            self._format_classification(idx, scores[idx], method)
+            for idx in scored[self._top_k_indices(scores[scored], top_k)]
+        ]
+    
+    def classify_with_linear(self, 
+                             text: str, 
+                             top_k: int = 5, 
+                             candidate_indices: Optional[np.ndarray] = None) -> List[Dict]:
+        """Classify with the TF-IDF + linear model trained on the case database."""
+        scores = self._linear_scores_many([text], candidate_indices)
+        if scores is None:
+            return []
+        return self._scored_results(scores[0], top_k, 'linear')
+    
+    def _linear_scores_many(self, 
+                            texts: List[str], 
+                            candidate_indices: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Linear model probabilities (texts x sections) from one sparse matrix product.
+        
+        Sections the model was not trained on, or outside the candidates, are NaN.
+        """
+        if self.linear_model is None:
+            return None
+        
+        try:
+            probabilities = self.linear_model.predict_proba(texts)
+        except Exception as e:
+            print(f"Error in linear classification: {e}")
+            return None
+        
+        scores = np.full((len(texts), len(self.ipc_sections)), np.nan)
+        known = self._linear_columns >= 0
+        scores[:, self._linear_columns[known]] = probabilities[:, known]
+        if candidate_indices is not None:
+            restricted = np.full_like(scores, np.nan)
+            restricted[:, candidate_indices] = scores[:, candidate_indices]
+            return restricted
+        return scores
+    
+    def classify_many(self, 
+                      texts: List[str], 
+                      keywords_list: Optional[List[List[str]]] = None, 
+                      method: str = 'ensemble', 
+                      top_k: int = 5,
+                      candidate_sections: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        Classify several texts at once, running the transformer models over real batches.
+        
+        Args:
+            texts: Texts to classify
+            keywords_list: Crime keywords for each text (same order as texts)
+            method: Classification method ('ensemble', 'zero_shot', 'similarity', 'keyword', 'hierarchical', 'knn', 'linear')
+            top_k: Number of top sections to return per text
+            candidate_sections: Only score and rank these sections, for every text
+            
+        Returns:
+            One list of classifications per input text, in input order
+        """
+        return self.classify_many_with_stats(texts, keywords_list, method, top_k, candidate_sections)[0]
+    
+    def classify_many_with_stats(self, 
+                                 texts: List[str], 
+                                 keywords_list: Optional[List[List[str]]] = None, 
+                                 method: str = 'ensemble', 
+                                 top_k: int = 5,
+                                 candidate_sections: Optional[List[str]] = None) -> Tuple[List[List[Dict]], Dict[str, Any]]:
+        """
+        classify_many(), also returning the statistics of this batch (including the
+        NLI pairs evaluated per text).
+        """
+        if method not in self.CLASSIFICATION_METHODS:
+            raise ValueError(f"Unknown classification method: {method}")
+        
+        if keywords_list is None:
+            keywords_list = [[] for _ in texts]
+        if len(keywords_list) != len(texts):
+            raise ValueError("keywords_list must have one entry per text")
+        
+        self.last_classification_stats = {
+            'method': method, 
+            'nli_pairs_evaluated': 0, 
+            'nli_pairs_per_text': [0] * len(texts),
+            'batch_size': len(texts)
+        }
+        results = self._classify_many(texts, keywords_list, method, top_k, candidate_sections)
+        return results, self.last_classification_stats
+    
+    def _classify_many(self, 
+                       texts: List[str], 
+                       keywords_list: List[List[str]], 
+                       method: str, 
+                       top_k: int,
+                       candidate_sections: Optional[List[str]]) -> List[List[Dict]]:
+        """classify_many() body; writes its statistics into last_classification_stats."""
+        candidate_indices = self._candidate_indices(candidate_sections)
+        if candidate_indices is not None and not len(candidate_indices):
+            return [[] for _ in texts]
+        
+        if not self._cacheable(top_k):
+            return self._classify_many_uncached(texts, keywords_list, method, top_k, candidate_indices)
+        
+        # Serve cached texts directly and classify only the misses, in one batch
+        results = [[] for _ in texts]
+        misses = []
+        for idx, text in enumerate(texts):
+            if not text.strip():
+                continue
+            ranked = self.cache.get(self._cache_key(text, keywords_list[idx] or [], method, candidate_sections))
+            if ranked is None:
+                misses.append(idx)
+            else:
+                results[idx] = copy.deepcopy(ranked[:top_k])
+        
+        pairs_per_text = [0] * len(texts)
+        if misses:
+            ranked_lists = self._classify_many_uncached(
+                [texts[idx] for idx in misses],
+                [keywords_list[idx] for idx in misses],
+                method, 
+                self._ranking_depth,
+                candidate_indices
+            )
+            miss_pairs = self.last_classification_stats.get('nli_pairs_per_text', [0] * len(misses))
+            for position, (idx, ranked) in enumerate(zip(misses, ranked_lists)):
+                self.cache.put(self._cache_key(texts[idx], keywords_list[idx] or [], method, candidate_sections), ranked)
+                results[idx] = copy.deepcopy(ranked[:top_k])
+                pairs_per_text[idx] = miss_pairs[position]
+        
+        self.last_classification_stats = {
+            'method': method,
+            'nli_pairs_evaluated': sum(pairs_per_text),
+            'nli_pairs_per_text': pairs_per_text,
+            'batch_size': len(texts),
+            'cache_hits': sum(1 for text in texts if text.strip()) - len(misses)
+        }
+        return results
+    
+    def _classify_many_uncached(self, 
+                                texts: List[str], 
+                                keywords_list: List[List[str]], 
+                                method: str, 
+                                top_k: int,
+                                candidate_indices: Optional[np.ndarray] = None) -> List[List[Dict]]:
+        """Batched classification without the result cache."""
+        self.last_classification_stats = {
+            'method': method, 
+            'nli_pairs_evaluated': 0, 
+            'batch_size': len(texts)
+        }
+        results = [[] for _ in texts]
+        pairs_per_text = [0] * len(texts)
+        
+        # Empty texts are skipped, mirroring classify(); long texts are classified by window
+        active = [idx for idx, text in enumerate(texts) if text.strip()]
+        long_documents = [idx for idx in active if self._is_long_document(texts[idx], method)]
+        short_documents = [idx for idx in active if idx not in set(long_documents)]
+        
+        if short_documents:
+            batch_results, batch_pairs = self._classify_batch(
+                [texts[idx] for idx in short_documents],
+                [keywords_list[idx] or [] for idx in short_documents],
+                method, 
+                top_k,
+                candidate_indices
+            )
+            for position, idx in enumerate(short_documents):
+                results[idx] = batch_results[position]
+                pairs_per_text[idx] = batch_pairs[position]
+        
+        for idx in long_documents:
+            results[idx], pairs_per_text[idx], _ = self._classify_windows(
+                texts[idx], keywords_list[idx] or [], method, top_k, candidate_indices=candidate_indices
+            )
+        
+        # Report NLI work per input text (not just per non-empty text)
+        self.last_classification_stats['nli_pairs_evaluated'] = sum(pairs_per_text)
+        self.last_classification_stats['nli_pairs_per_text'] = pairs_per_text
+        
+        return results
+    
+    def _classify_batch(self, 
+                        texts: List[str], 
+                        keywords_list: List[List[str]], 
+                        method: str, 
+                        top_k: int,
+                        candidate_indices: Optional[np.ndarray] = None) -> Tuple[List[List[Dict]], List[int]]:
+        """Classify non-empty texts with batched model calls; returns results and NLI pairs per text."""
+        if method == 'hierarchical':
+            return self._hierarchical_many(texts, top_k, candidate_indices)
+        if method == 'linear':
+            scores = self._linear_scores_many(texts, candidate_indices)
+            results = [
+                self._scored_results(scores[i], top_k, 'linear') if scores is not None else []
+                for i in range(len(texts))
+            ]
+            return results, [0] * len(texts)
+        
+        if method == 'ensemble':
+            # One weighted reduction over the (texts x methods x sections) tensor
+            method_scores, ran_nli, pairs_per_text = self._ensemble_method_scores_many(
+                texts, keywords_list, candidate_indices
+            )
+            ensemble_scores = self._ensemble_scores(method_scores)
+            results = []
+            for i in range(len(texts)):
+                stages = self.ENSEMBLE_STAGES if ran_nli[i] else self.EARLY_EXIT_STAGES
+                self._record_stages(stages)
+                results.append(self._ensemble_results(method_scores[i], top_k, stages, ensemble_scores[i]))
+            
+            self.last_classification_stats['zero_shot_skipped'] = (
+                self.last_classification_stats.get('zero_shot_skipped', 0) + ran_nli.count(False)
+            )
+            return results, pairs_per_text
+        
+        cascade = self._needs_cascade(candidate_indices)
+        similarity_scores = knn_scores = None
+        if method in ('similarity', 'knn') or (method == 'zero_shot' and cascade):
+            similarity_scores, knn_scores = self._embedding_scores(texts, candidate_indices, knn=method == 'knn')
+        
+        keyword_scores = None
+        if method == 'keyword' or (method == 'zero_shot' and cascade):
+            # One sparse matrix product scores the whole batch
+            keyword_matrix, keyword_counts = self._keyword_matrix(
+                [text.lower() for text in texts], keywords_list, candidate_indices
+            )
+            keyword_scores = list(zip(keyword_matrix, keyword_counts))
+        
+        zero_shot_scores = None
+        pairs_per_text = [0] * len(texts)
+        if method == 'zero_shot':
+            candidate_lists = None
+            if cascade:
+                candidate_lists = [
+                    self._cascade_candidates(
+                        keyword_scores[i][0], 
+                        similarity_scores[i] if similarity_scores is not None else None,
+                        candidate_indices
+                    )
+                    for i in range(len(texts))
+                ]
+            zero_shot_scores, pairs_per_text = self._zero_shot_scores_many(texts, candidate_lists, candidate_indices)
+        
+        if method == 'knn':
+            if knn_scores is None:
+                return [[] for _ in texts], pairs_per_text
+            return [self._knn_results(knn_scores[i], top_k) for i in range(len(texts))], pairs_per_text
+        
+        results = []
+        for i in range(len(texts)):
+            zero_shot_results = (
+                self._zero_shot_results(zero_shot_scores[i], top_k) if zero_shot_scores is not None else []
+            )
+            similarity_results = (
+                self._similarity_results(similarity_scores[i], top_k) if similarity_scores is not None else []
+            )
+            keyword_results = (
+                self._keyword_results(*keyword_scores[i], top_k) if keyword_scores is not None else []
+            )
+            
+            if method == 'zero_shot':
+                results.append(zero_shot_results)
+            elif method == 'similarity':
+                results.append(similarity_results)
+            else:
+                results.append(keyword_results)
+        
+        return results, pairs_per_text
+    
+    def _ensemble_method_scores_many(self, 
+                                     texts: List[str], 
+                                     keywords_list: List[List[str]],
+                                     candidate_indices: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[bool], List[int]]:
+        """
+        Raw ensemble scores of a batch, before any ranking or normalisation.
+        
+        Texts the cheap scorers already settle (early_exit_margin) skip the NLI stage
+        and keep NaN zero-shot scores.
+        
+        Returns:
+            (texts x methods x sections) scores, whether each text ran the NLI stage,
+            and NLI pairs per text
+        """
+        similarity_scores, knn_scores = self._embedding_scores(texts, candidate_indices, knn=self._ensemble_knn)
+        keyword_matrix, keyword_counts = self._keyword_matrix(
+            [text.lower() for text in texts], keywords_list, candidate_indices
+        )
+        method_scores = self._stack_method_scores(
+            len(texts), None, similarity_scores, keyword_matrix, keyword_counts, knn_scores
+        )
+        nli_indices = [i for i in range(len(texts)) if not self._exits_early(method_scores[i])]
+        
+        pairs_per_text = [0] * len(texts)
+        if nli_indices:
+            candidate_lists = None
+            if self._needs_cascade(candidate_indices):
+                candidate_lists = [
+                    self._cascade_candidates(
+                        keyword_matrix[i], 
+                        similarity_scores[i] if similarity_scores is not None else None,
+                        candidate_indices
+                    )
+                    for i in nli_indices
+                ]
+            nli_scores, nli_pairs = self._zero_shot_scores_many(
+                [texts[i] for i in nli_indices], candidate_lists, candidate_indices
+            )
+            if nli_scores is not None:
+                method_scores[nli_indices, 0] = nli_scores
+            for position, i in enumerate(nli_indices):
+                pairs_per_text[i] = nli_pairs[position]
+        
+        ran_nli = [False] * len(texts)
+        for i in nli_indices:
+            ran_nli[i] = True
+        return method_scores, ran_nli, pairs_per_text
+    
+    def _window_shape(self, method: str) -> Optional[Tuple[int, int]]:
+        """
+        (words, stride) of the windows a method's model reads; None for methods without
+        a token limit (keyword, linear).
+        """
+        if method in ('zero_shot', 'hierarchical'):
+            return self.nli_window_size, self.nli_window_stride
+        if method in ('similarity', 'knn', 'ensemble'):
+            # The ensemble's NLI stage runs on its own windows (see _ensemble_windows)
+            return self.window_size, self.window_stride
+        return None
+    
+    def _is_long_document(self, text: str, method: str) -> bool:
+        """Whether the text is longer than one window of the model the method runs."""
+        shape = self._window_shape(method)
+        if not self.long_document_mode or shape is None:
+            return False
+        words = re.finditer(r'\S+', text)
+        return sum(1 for _ in islice(words, shape[0] + 1)) > shape[0]
+    
+    def _iter_windows(self, 
+                      text: str, 
+                      window_size: Optional[int] = None, 
+                      window_stride: Optional[int] = None) -> Iterator[str]:
+        """Lazily yield overlapping word windows covering the whole text (embedding windows by default)."""
+        window_size = window_size or self.window_size
+        window_stride = window_stride or self.window_stride
+        window = []
+        new_words = 0
+        for match in re.finditer(r'\S+', text):
+            window.append(match.group())
+            new_words += 1
+            if len(window) == window_size:
+                yield ' '.join(window)
+                window = window[window_stride:]
+                new_words = 0
+        
+        # Trailing words not covered by the last full window
+        if new_words:
+            yield ' '.join(window)
+    
+    def _window_batches(self, text: str, window_size: int, window_stride: int) -> Iterator[List[str]]:
+        """Windows of the text in batches of batch_size."""
+        windows = self._iter_windows(text, window_size, window_stride)
+        while True:
+            batch = list(islice(windows, self.batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    @staticmethod
+    def pool_scores(pooled: np.ndarray, window_scores: np.ndarray, pooling: str) -> np.ndarray:
+        """
+        Fold one window's (or chunk's) raw scores into the running max or sum. Unscored
+        (NaN) entries are ignored; an entry stays NaN if no window scored it.
+        """
+        if pooling == 'max':
+            return np.fmax(pooled, window_scores)
+        return np.where(np.isnan(pooled), window_scores, pooled + np.nan_to_num(window_scores, nan=0.0))
+    
+    def _classify_windows(self, 
+                          text: str, 
+                          crime_keywords: List[str], 
+                          method: str, 
+                          top_k: int,
+                          pooling: Optional[str] = None,
+                          candidate_indices: Optional[np.ndarray] = None) -> Tuple[List[Dict], int, int]:
+        """
+        Classify a long text window by window and pool the section scores.
+        
+        Only one batch of windows and one score vector per section are held at a time,
+        so memory stays bounded regardless of the input length.
+        
+        Returns:
+            Pooled classifications, NLI pairs evaluated, and number of windows
+        """
+        pooling = pooling or self.window_pooling
+        if pooling not in ('max', 'mean'):
+            raise ValueError(f"Unknown window pooling: {pooling}")
+        
+        if method == 'ensemble':
+            return self._ensemble_windows(text, crime_keywords, top_k, pooling, candidate_indices)
+        
+        pooled = np.zeros(len(self.ipc_sections))
+        # Highest-scoring window entry per section, so results keep their usual keys
+        best_entries = {}
+        num_windows = 0
+        nli_pairs = 0
+        window_size, window_stride = self._window_shape(method) or (self.window_size, self.window_stride)
+        
+        for batch in self._window_batches(text, window_size, window_stride):
+            batch_results, batch_pairs = self._classify_batch(
+                batch, [crime_keywords] * len(batch), method, self._ranking_depth, candidate_indices
+            )
+            nli_pairs += sum(batch_pairs)
+            
+            for ranked in batch_results:
+                window_scores = np.zeros(len(self.ipc_sections))
+                for result in ranked:
+                    idx = self._section_index[result['section_number']]
+                    window_scores[idx] = result['confidence_score']
+                    if idx not in best_entries or result['confidence_score'] > best_entries[idx]['confidence_score']:
+                        best_entries[idx] = result
+                pooled = np.maximum(pooled, window_scores) if pooling == 'max' else pooled + window_scores
+                num_windows += 1
+        
+        if pooling == 'mean' and num_windows:
+            pooled /= num_windows
+        
+        order = np.argsort(-pooled, kind='stable')[:top_k]
+        results = []
+        for idx in order:
+            if pooled[idx] > 0:
+                result = dict(best_entries[idx])
+                result['confidence_score'] = float(pooled[idx])
+                results.append(result)
+        return results, nli_pairs, num_windows
+    
+    def _ensemble_windows(self, 
+                          text: str, 
+                          crime_keywords: List[str], 
+                          top_k: int,
+                          pooling: str,
+                          candidate_indices: Optional[np.ndarray] = None) -> Tuple[List[Dict], int, int]:
+        """
+        Ensemble counterpart of _classify_windows: pools the raw (methods x sections)
+        scores of the windows and ranks the pooled scores once, like a short text.
+        The stages are recorded once for the whole text.
+        
+        Returns:
+            Pooled classifications, NLI pairs evaluated, and number of embedding windows
+        """
+        pooled, stages, nli_pairs, num_windows = self._ensemble_window_scores(
+            text, crime_keywords, pooling, candidate_indices
+        )
+        self._record_stages(stages)
+        self.last_classification_stats['stages_run'] = list(stages)
+        return self._ensemble_results(pooled, top_k, stages), nli_pairs, num_windows
+    
+    def _ensemble_window_scores(self, 
+                                text: str, 
+                                crime_keywords: List[str], 
+                                pooling: str,
+                                candidate_indices: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Tuple[str, ...], int, int]:
+        """
+        Raw (methods x sections) ensemble scores of a text of any length, pooled over windows.
+        
+        The keyword and embedding scorers run on window_size windows; the early exit and
+        the NLI shortlist are decided on their pooled scores, and the NLI stage then runs
+        on nli_window_size windows, so a text within BART-MNLI's limit takes one NLI pass.
+        
+        Returns:
+            Pooled scores, stages run, NLI pairs evaluated, and number of embedding windows
+        """
+        pooled = np.full((len(self.ENSEMBLE_METHODS), len(self.ipc_sections)), np.nan)
+        num_windows = 0
+        for batch in self._window_batches(text, self.window_size, self.window_stride):
+            similarity_scores, knn_scores = self._embedding_scores(batch, candidate_indices, knn=self._ensemble_knn)
+            keyword_matrix, keyword_counts = self._keyword_matrix(
+                [window.lower() for window in batch], [crime_keywords] * len(batch), candidate_indices
+            )
+            for window_scores in self._stack_method_scores(
+                len(batch), None, similarity_scores, keyword_matrix, keyword_counts, knn_scores
+            ):
+                pooled = self.pool_scores(pooled, window_scores, pooling)
+            num_windows += len(batch)
+        
+        if pooling == 'mean' and num_windows:
+            pooled /= num_windows
+        
+        nli_pairs = 0
+        stages = self.EARLY_EXIT_STAGES
+        if not self._exits_early(pooled):
+            stages = self.ENSEMBLE_STAGES
+            shortlist = candidate_indices
+            if self._needs_cascade(candidate_indices):
+                shortlist = self._cascade_candidates(pooled[2], pooled[1], candidate_indices)
+                self.last_classification_stats['cascade_candidates'] = [
+                    self.ipc_sections[idx]['section_number'] for idx in shortlist
+                ]
+            
+            zero_shot_scores = np.full(len(self.ipc_sections), np.nan)
+            nli_windows = 0
+            for batch in self._window_batches(text, self.nli_window_size, self.nli_window_stride):
+                batch_scores, batch_pairs = self._zero_shot_scores_many(batch, candidate_indices=shortlist)
+                if batch_scores is None:
+                    break
+                nli_pairs += sum(batch_pairs)
+                for window_scores in batch_scores:
+                    zero_shot_scores = self.pool_scores(zero_shot_scores, window_scores, pooling)
+                nli_windows += len(batch)
+            
+            if pooling == 'mean' and nli_windows:
+                zero_shot_scores /= nli_windows
+            pooled[0] = zero_shot_scores
+            self.last_classification_stats['nli_windows'] = nli_windows
+        
+        return pooled, stages, nli_pairs, num_windows
+    
+    def raw_scores_with_stats(self, 
+                              text: str, 
+                              crime_keywords: List[str] = None, 
+                              method: str = 'ensemble', 
+                              candidate_sections: Optional[List[str]] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Unranked scores of a text, for pooling with those of other texts (such as the
+        chunks of a growing transcript) before ranking them once with rank_raw_scores().
+        
+        The ensemble's ranking normalises each text so its best section scores 1.0; these
+        scores come before that step, so a weak chunk stays weak once pooled.
+        
+        Returns:
+            For 'ensemble' the raw (methods x sections) scores, pooled over windows as in
+            classify(); for other methods each section's confidence score. Unscored
+            sections are NaN. Also the statistics of this call
+        """
+        if method not in self.CLASSIFICATION_METHODS:
+            raise ValueError(f"Unknown classification method: {method}")
+        
+        stats = self.last_classification_stats = {'method': method, 'nli_pairs_evaluated': 0}
+        candidate_indices = self._candidate_indices(candidate_sections)
+        skip = not text.strip() or (candidate_indices is not None and not len(candidate_indices))
+        
+        if method == 'ensemble':
+            if skip:
+                return np.full((len(self.ENSEMBLE_METHODS), len(self.ipc_sections)), np.nan), stats
+            scores, stages, nli_pairs, num_windows = self._ensemble_window_scores(
+                text, crime_keywords or [], self.window_pooling, candidate_indices
+            )
+            self._record_stages(stages)
+            stats.update(nli_pairs_evaluated=nli_pairs, windows=num_windows, stages_run=list(stages))
+            return scores, stats
+        
+        scores = np.full(len(self.ipc_sections), np.nan)
+        if not skip:
+            ranked = self._classify(text, crime_keywords or [], method, len(self.ipc_sections), candidate_sections)
+            for result in ranked:
+                scores[self._section_index[result['section_number']]] = result['confidence_score']
+        return scores, stats
+    
+    def rank_raw_scores(self, 
+                        scores: np.ndarray, 
+                        method: str, 
+                        top_k: int = 5, 
+                        stages: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Rank (pooled) raw_scores_with_stats() output the way classify() ranks a text.
+        
+        Args:
+            scores: Raw scores of one method, as returned by raw_scores_with_stats()
+            method: Method the scores came from
+            top_k: Number of top sections to return
+            stages: Ensemble stages that produced the scores (defaults to all stages)
+        """
+        if method == 'ensemble':
+            return self._ensemble_results(scores, top_k, tuple(stages or self.ENSEMBLE_STAGES))
+        return self._scored_results(scores, top_k, method)
+    
+    def classify_long(self, 
+                      text: str, 
+                      crime_keywords: List[str] = None, 
+                      method: str = 'ensemble', 
+                      top_k: int = 5,
+                      pooling: Optional[str] = None,
+                      candidate_sections: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Classify a long transcript with overlapping windows, whatever its length.
+        
+        Args:
+            text: Transcript text
+            crime_keywords: Crime keywords extracted from the text
+            method: Classification method ('ensemble', 'zero_shot', 'similarity', 'keyword', 'hierarchical', 'knn', 'linear')
+            top_k: Number of top sections to return
+            pooling: 'max' or 'mean' aggregation of window scores (defaults to window_pooling)
+            candidate_sections: Only score and rank these sections
+        """
+        if method not in self.CLASSIFICATION_METHODS:
+            raise ValueError(f"Unknown classification method: {method}")
+        
+        self.last_classification_stats = {'method': method, 'nli_pairs_evaluated': 0}
+        results, nli_pairs, num_windows = self._classify_windows(
+            text, crime_keywords or [], method, top_k, pooling, self._candidate_indices(candidate_sections)
+        )
+        self.last_classification_stats['nli_pairs_evaluated'] = nli_pairs
+        self.last_classification_stats['windows'] = num_windows
+        return results
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -278,7 +2032,7 @@ if __name__ == "__main__":
     print("Testing Crime Classification System")
     print("=" * 50)
     
-    methods = ['zero_shot', 'similarity', 'keyword', 'ensemble']
+    methods = ['zero_shot', 'similarity', 'keyword', 'ensemble', 'hierarchical']
     
     for method in methods:
         print(f"\n{method.upper()} Classification:")
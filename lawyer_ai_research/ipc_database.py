@@ -387,20 +387,20 @@ IPC_DATABASE = {
 }
 
 
-def get_ipc_section(section_number):
-    """Get IPC section details by section number."""
-    return IPC_DATABASE.get(section_number, None)
+def get_ipc_section(section_number, sections=None):
+    """Get IPC section details by section number (from sections, the IPC database by default)."""
+    return (IPC_DATABASE if sections is None else sections).get(section_number, None)
 
 def get_all_sections():
     """Get all IPC sections."""
     return IPC_DATABASE
 
-def search_sections_by_keyword(keyword):
-    """Search IPC sections by keyword."""
+def search_sections_by_keyword(keyword, sections=None):
+    """Search IPC sections (or the given section map) by keyword."""
     matching_sections = []
     keyword_lower = keyword.lower()
     
-    for section_num, section_data in IPC_DATABASE.items():
+    for section_num, section_data in (IPC_DATABASE if sections is None else sections).items():
         if (keyword_lower in section_data['title'].lower() or 
             keyword_lower in section_data['description'].lower() or
             any(keyword_lower in kw.lower() for kw in section_data['keywords'])):
@@ -408,8 +408,11 @@ def search_sections_by_keyword(keyword):
     
     return matching_sections
 
-def get_sections_by_category():
-    """Get IPC sections organized by category."""
+def get_sections_by_category(sections=None):
+    """Get IPC sections (or the given section map) organized by category."""
+    if sections is None:
+        sections = IPC_DATABASE
+    
     categories = {
         "Theft and Related": ["IPC 378", "IPC 379", "IPC 380"],
         "Robbery and Dacoity": ["IPC 390", "IPC 392", "IPC 395"],
@@ -429,6 +432,11 @@ def get_sections_by_category():
     
     result = {}
     for category, section_nums in categories.items():
-        result[category] = [IPC_DATABASE[section] for section in section_nums if section in IPC_DATABASE]
+        result[category] = [sections[section] for section in section_nums if section in sections]
+    
+    # Sections from external catalogues carry their own category
+    for section_data in sections.values():
+        if section_data.get('category'):
+            result.setdefault(section_data['category'], []).append(section_data)
     
     return result
@@ -0,0 +1,254 @@
+"""
+Keyword Matching Engine
+Precomputed per-section weights of the IPC section vocabulary for the keyword
+classification method. Scores come from a sparse term x section weight matrix, so a
+batch of texts is scored with one sparse matrix product. An Aho-Corasick automaton
+finds the vocabulary terms in every title and description when the weights are built.
+"""
+
+import numpy as np
+from collections import deque
+from scipy import sparse
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Weights of the keyword scoring scheme
+SECTION_KEYWORD_WEIGHT = 1.0
+TEXT_OCCURRENCE_WEIGHT = 0.5
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher that finds every pattern occurrence in linear time."""
+
+    def __init__(self):
+        """Create an automaton containing only the root state."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]
+
+    def add(self, pattern: str, value: int):
+        """Add a pattern; value is reported with every match of the pattern."""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append((len(pattern), value))
+
+    def build(self):
+        """Compute failure links breadth-first; call once after adding all patterns."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fallback = self._goto[fail].get(char, 0)
+                self._fail[child] = fallback if fallback != child else 0
+
+                # Inherit matches that end at the same position via the failure link
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, value) for every pattern occurrence in the text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value in output[node]:
+                yield position - length + 1, position + 1, value
+
+
+class KeywordMatcher:
+    """Scores IPC sections from the crime keywords supplied for a text.
+
+    The vocabulary is every section keyword and title. Each term carries a precomputed
+    per-section weight: SECTION_KEYWORD_WEIGHT if it is one of the section's keywords,
+    TITLE_WEIGHT if it occurs in the section title and DESCRIPTION_WEIGHT if it occurs in
+    the description. These weights form the sparse weight_matrix (terms x sections);
+    other keywords get the same weights computed on first use. Every supplied keyword
+    that occurs in the text also adds TEXT_OCCURRENCE_WEIGHT to all sections.
+    """
+
+    def __init__(self, sections: List[Dict]):
+        """Compile the automaton and term weights from prepared IPC sections."""
+        self.num_sections = len(sections)
+        self._titles = [section['title'].lower() for section in sections]
+        self._descriptions = [section['description'].lower() for section in sections]
+        self._keyword_sets = [
+            {keyword.lower() for keyword in section['keywords']} for section in sections
+        ]
+
+        # Vocabulary: section keywords and titles
+        vocabulary = []
+        for section in sections:
+            vocabulary.extend(keyword.lower() for keyword in section['keywords'])
+            vocabulary.append(section['title'].lower())
+        self.terms = list(dict.fromkeys(term for term in vocabulary if term))
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+
+        self.automaton = AhoCorasick()
+        for term_id, term in enumerate(self.terms):
+            self.automaton.add(term, term_id)
+        self.automaton.build()
+
+        self.term_weights = self._compute_vocabulary_weights()
+        self._extra_term_weights: Dict[str, List[Tuple[int, float]]] = {}
+        self.weight_matrix = self._build_weight_matrix()
+        # Column-major copy for scoring a subset of sections
+        self._weight_columns = self.weight_matrix.tocsc()
+
+    def _compute_vocabulary_weights(self) -> List[List[Tuple[int, float]]]:
+        """
+        Per-section weights of every vocabulary term.
+
+        Scanning each title and description once with the automaton finds every term
+        they contain, so building the weights is linear in the catalogue size instead
+        of comparing every term with every section.
+        """
+        weights: List[Dict[int, float]] = [{} for _ in self.terms]
+        for idx in range(self.num_sections):
+            section_weights = dict.fromkeys(
+                (self.term_ids[keyword] for keyword in self._keyword_sets[idx] if keyword in self.term_ids),
+                SECTION_KEYWORD_WEIGHT
+            )
+            for text, weight in ((self._titles[idx], TITLE_WEIGHT), (self._descriptions[idx], DESCRIPTION_WEIGHT)):
+                for term_id in {term_id for _, _, term_id in self.automaton.iter_matches(text)}:
+                    section_weights[term_id] = section_weights.get(term_id, 0.0) + weight
+            for term_id, weight in section_weights.items():
+                weights[term_id][idx] = weight
+        return [list(term_weights.items()) for term_weights in weights]
+
+    def _compute_term_weights(self, term: str) -> List[Tuple[int, float]]:
+        """Per-section weights of a term as (section index, weight) pairs."""
+        weights = []
+        for idx in range(self.num_sections):
+            weight = 0.0
+            if term in self._keyword_sets[idx]:
+                weight += SECTION_KEYWORD_WEIGHT
+            if term in self._titles[idx]:
+                weight += TITLE_WEIGHT
+            if term in self._descriptions[idx]:
+                weight += DESCRIPTION_WEIGHT
+            if weight:
+                weights.append((idx, weight))
+        return weights
+
+    def _build_weight_matrix(self) -> sparse.csr_matrix:
+        """Sparse (terms x sections) matrix of the per-section term weights."""
+        rows, cols, values = [], [], []
+        for term_id, weights in enumerate(self.term_weights):
+            for idx, weight in weights:
+                rows.append(term_id)
+                cols.append(idx)
+                values.append(weight)
+        return sparse.csr_matrix(
+            (values, (rows, cols)), shape=(len(self.terms), self.num_sections), dtype=np.float64
+        )
+
+    def _weights_for(self, term: str) -> List[Tuple[int, float]]:
+        """Weights of a vocabulary term, or of an out-of-vocabulary keyword (memoised)."""
+        term_id = self.term_ids.get(term)
+        if term_id is not None:
+            return self.term_weights[term_id]
+        if term not in self._extra_term_weights:
+            self._extra_term_weights[term] = self._compute_term_weights(term)
+        return self._extra_term_weights[term]
+
+    def _hits(self, text_lower: str, crime_keywords: List[str]) -> Tuple[List[int], List[str], int]:
+        """
+        Look up the supplied keywords of a text (repeated keywords count every time).
+
+        Returns:
+            Vocabulary term ids, out-of-vocabulary keywords, and how many of the keywords
+            occur in the text
+        """
+        term_ids, extra_keywords = [], []
+        text_matches = 0
+        for keyword in crime_keywords:
+            keyword = keyword.lower()
+            term_id = self.term_ids.get(keyword)
+            if term_id is not None:
+                term_ids.append(term_id)
+            else:
+                extra_keywords.append(keyword)
+            # Substring test in C; faster than any scan of the text for the few keywords supplied
+            text_matches += keyword in text_lower
+        return term_ids, extra_keywords, text_matches
+
+    def score(self,
+              text_lower: str,
+              crime_keywords: List[str],
+              section_indices: Optional[np.ndarray] = None) -> Tuple[np.ndarray, int]:
+        """
+        Score every section for a lowercased text.
+
+        Args:
+            text_lower: Lowercased text
+            crime_keywords: Keywords extracted by the preprocessor
+            section_indices: Only score these sections (columns follow this order)
+
+        Returns:
+            Raw section scores and the number of keywords scored
+        """
+        scores, counts = self.score_many([text_lower], [crime_keywords], section_indices)
+        return scores[0], counts[0]
+
+    def score_many(self,
+                   texts_lower: List[str],
+                   keywords_list: List[List[str]],
+                   section_indices: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[int]]:
+        """
+        Score every section for a batch of lowercased texts.
+
+        The keywords of the batch form a sparse (texts x terms) count matrix, which is
+        multiplied with the weight matrix in one call. With section_indices only those
+        columns of the weight matrix take part in the product.
+
+        Returns:
+            Raw section scores (texts x sections, or texts x section_indices) and the
+            keyword count per text
+        """
+        indptr, indices = [0], []
+        extra_keywords, text_matches, counts = [], [], []
+        for text_lower, crime_keywords in zip(texts_lower, keywords_list):
+            term_ids, extras, matches = self._hits(text_lower, crime_keywords)
+            indices.extend(term_ids)
+            indptr.append(len(indices))
+            extra_keywords.append(extras)
+            text_matches.append(matches)
+            counts.append(len(crime_keywords))
+
+        hits = sparse.csr_matrix(
+            (np.ones(len(indices)), indices, indptr), shape=(len(texts_lower), len(self.terms))
+        )
+        # Repeated keywords become counts
+        hits.sum_duplicates()
+        if section_indices is None:
+            scores = (hits @ self.weight_matrix).toarray()
+            columns = None
+        else:
+            scores = (hits @ self._weight_columns[:, section_indices]).toarray()
+            columns = {int(idx): column for column, idx in enumerate(section_indices)}
+
+        # Out-of-vocabulary keywords are rare; their memoised weights are added directly
+        for row, extras in enumerate(extra_keywords):
+            for keyword in extras:
+                for idx, weight in self._weights_for(keyword):
+                    column = idx if columns is None else columns.get(idx)
+                    if column is not None:
+                        scores[row, column] += weight
+
+        scores += TEXT_OCCURRENCE_WEIGHT * np.array(text_matches, dtype=np.float64)[:, None]
+        return scores, counts
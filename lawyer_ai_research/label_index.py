@@ -0,0 +1,94 @@
+"""
+Approximate Nearest-Neighbour Label Index
+Top-k cosine search over the section label embeddings, so similarity scoring does not
+have to compare every text with every label once the catalogue grows to thousands of
+statutory sections. Uses a FAISS HNSW graph when faiss is installed and an exact
+matrix product otherwise.
+"""
+
+import os
+import numpy as np
+from typing import Optional, Tuple
+
+
+class LabelIndex:
+    """Inner-product search over L2-normalised label embeddings."""
+
+    def __init__(self,
+                 embeddings: np.ndarray,
+                 approximate: bool = True,
+                 index_file: Optional[str] = None,
+                 hnsw_m: int = 32,
+                 ef_search: int = 128):
+        """
+        Build (or load) the index.
+
+        Args:
+            embeddings: L2-normalised label embeddings, one row per section
+            approximate: Use a FAISS HNSW graph; falls back to exact search when faiss
+                is not installed
+            index_file: Where to persist the HNSW graph between runs (optional)
+            hnsw_m: Neighbours per node in the HNSW graph
+            ef_search: Candidate list size at query time (higher is slower but more exact)
+        """
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.size = self.embeddings.shape[0]
+        self.backend = "exact"
+        self._index = None
+
+        if approximate:
+            try:
+                self._index = self._load_or_build(index_file, hnsw_m, ef_search)
+                self.backend = "faiss_hnsw"
+            except ImportError:
+                print("Warning: faiss is not installed. Using exact label search.")
+            except Exception as e:
+                print(f"Warning: Could not build ANN label index ({e}). Using exact label search.")
+
+    def _load_or_build(self, index_file: Optional[str], hnsw_m: int, ef_search: int):
+        """Read a persisted HNSW graph, or build one and persist it."""
+        import faiss
+
+        if index_file and os.path.exists(index_file):
+            try:
+                index = faiss.read_index(index_file)
+                if index.ntotal == self.size and index.d == self.embeddings.shape[1]:
+                    index.hnsw.efSearch = ef_search
+                    return index
+            except Exception as e:
+                print(f"Warning: Could not read label index cache: {e}")
+
+        index = faiss.IndexHNSWFlat(self.embeddings.shape[1], hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.add(self.embeddings)
+        index.hnsw.efSearch = ef_search
+
+        if index_file:
+            try:
+                os.makedirs(os.path.dirname(index_file) or ".", exist_ok=True)
+                faiss.write_index(index, index_file)
+            except Exception as e:
+                print(f"Warning: Could not save label index cache: {e}")
+        return index
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest labels of each query.
+
+        Args:
+            queries: L2-normalised query embeddings (queries x dim)
+            k: Number of labels to return per query
+
+        Returns:
+            Cosine similarities and label indices (queries x k), best first; rows may
+            contain index -1 if HNSW found fewer than k labels
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        k = min(k, self.size)
+        if self._index is not None:
+            return self._index.search(queries, k)
+
+        similarities = queries @ self.embeddings.T
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
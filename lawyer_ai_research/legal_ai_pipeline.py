@@ -8,10 +8,12 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
 
-from text_preprocessor import LegalTextPreprocessor
+from text_preprocessor import LegalTextPreprocessor, TranscriptStream
 from crime_classifier import CrimeClassifier
 from penalty_estimator import PenaltyEstimator
-from ipc_database import get_all_sections
+from citation_extractor import CitationExtractor
+from model_registry import registry
+from transcript_session import TranscriptSession, SessionStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,58 +22,441 @@ logger = logging.getLogger(__name__)
 class LegalAIPipeline:
     """Main pipeline for processing legal case transcripts and mapping to IPC sections."""
     
+    # 'off': models only; 'augment': cited sections first, models fill the remaining
+    # slots; 'fast': cited sections only (models run when nothing is cited)
+    CITATION_MODES = ('off', 'augment', 'fast')
+    CITED_SECTION_CONFIDENCE = 0.95
+    
     def __init__(self, 
                  classifier_model: str = "facebook/bart-large-mnli",
                  classification_method: str = "ensemble",
-                 top_k_sections: int = 5):
+                 top_k_sections: int = 5,
+                 cascade_top_n: Optional[int] = None,
+                 inference_backend: str = "pytorch",
+                 onnx_model_dir: str = "onnx_models",
+                 cache_size: int = 1024,
+                 cache_ttl: Optional[float] = 3600,
+                 long_document_mode: bool = True,
+                 window_size: int = 180,
+                 window_stride: int = 150,
+                 nli_window_size: int = 700,
+                 window_pooling: str = "max",
+                 early_exit_margin: Optional[float] = None,
+                 hierarchy_top_categories: int = 3,
+                 pretokenized_nli: bool = True,
+                 ensemble_weights: Optional[Dict[str, float]] = None,
+                 section_catalogues: Optional[List[str]] = None,
+                 ann_threshold: int = 1000,
+                 ann_top_n: int = 100,
+                 knn_neighbours: int = 10,
+                 linear_model_path: Optional[str] = "linear_model.pkl",
+                 citation_mode: str = 'off',
+                 ner_processes: int = 1,
+                 ner_batch_size: int = 32,
+                 spacy_model: str = "en_core_web_sm",
+                 nltk_data_dir: Optional[str] = None,
+                 stream_chunk_chars: int = 100_000,
+                 stream_section_chars: int = 20_000,
+                 max_sessions: int = 100):
         """
         Initialize the Legal AI Pipeline.
         
         Args:
             classifier_model: Pre-trained model for classification
-            classification_method: Method for classification ('ensemble', 'zero_shot', 'similarity', 'keyword')
+            classification_method: Method for classification ('ensemble', 'zero_shot', 'similarity', 'keyword', 'hierarchical', 'knn', 'linear')
             top_k_sections: Number of top IPC sections to return
+            cascade_top_n: Number of shortlisted sections sent to zero-shot NLI (None scores all sections)
+            inference_backend: Model runtime ('pytorch', 'onnx', 'onnx_int8')
+            onnx_model_dir: Directory containing models exported by onnx_backend.py
+            cache_size: Maximum number of cached classification results (0 disables the cache)
+            cache_ttl: Lifetime of cached classification results in seconds
+            long_document_mode: Classify long transcripts by overlapping windows instead of truncating
+            window_size: Words per window of the embedding scorers
+            window_stride: Words between window starts
+            nli_window_size: Words per window of the zero-shot NLI scorer
+            window_pooling: Aggregation of window scores per section ('max' or 'mean')
+            early_exit_margin: Skip the ensemble's zero-shot stage when the keyword and
+                similarity scorers' top-1 leads by this margin (None always runs it)
+            hierarchy_top_categories: Categories expanded to sections by the 'hierarchical' method
+            pretokenized_nli: Score NLI pairs from hypotheses tokenised once at load time
+            ensemble_weights: Per-method weights for the 'ensemble' method (defaults to
+                zero_shot 0.4, similarity 0.4, keyword 0.2)
+            section_catalogues: Extra statute catalogues (POCSO, NDPS, IT Act, ...) to load
+            ann_threshold: Section count from which label search uses an ANN index
+            ann_top_n: Labels retrieved per text from the ANN index
+            knn_neighbours: Labelled cases whose sections vote in the 'knn' method
+            linear_model_path: Model artifact for the 'linear' method (see linear_classifier.py)
+            citation_mode: Handling of sections cited explicitly in the transcript
+                ('off', 'augment' or 'fast', see CITATION_MODES)
+            ner_processes: spaCy worker processes for batch preprocessing
+            ner_batch_size: Transcripts per spaCy batch in batch preprocessing
+            spacy_model: spaCy model name or saved model directory (see resource_bundle.py)
+            nltk_data_dir: Extra directory searched for NLTK corpora
+            stream_chunk_chars: Characters scanned at a time by process_transcript_file
+            stream_section_chars: Characters kept per transcript section by process_transcript_file
+                and transcript sessions
+            max_sessions: Open transcript sessions kept (the least recently updated are dropped)
         """
+        if citation_mode not in self.CITATION_MODES:
+            raise ValueError(f"Unknown citation mode: {citation_mode}")
         self.classification_method = classification_method
         self.top_k_sections = top_k_sections
+        self.ner_processes = ner_processes
+        self.ner_batch_size = ner_batch_size
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_section_chars = stream_section_chars
+        self.sessions = SessionStore(max_sessions)
         
         logger.info("Initializing Legal AI Pipeline components...")
         
         # Initialize components
-        self.preprocessor = LegalTextPreprocessor()
-        self.classifier = CrimeClassifier(model_name=classifier_model)
-        self.penalty_estimator = PenaltyEstimator()
+        self.preprocessor = LegalTextPreprocessor(spacy_model=spacy_model, nltk_data_dir=nltk_data_dir)
+        self.classifier = CrimeClassifier(
+            model_name=classifier_model, 
+            cascade_top_n=cascade_top_n,
+            inference_backend=inference_backend,
+            onnx_model_dir=onnx_model_dir,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
+            long_document_mode=long_document_mode,
+            window_size=window_size,
+            window_stride=window_stride,
+            nli_window_size=nli_window_size,
+            window_pooling=window_pooling,
+            early_exit_margin=early_exit_margin,
+            hierarchy_top_categories=hierarchy_top_categories,
+            pretokenized_nli=pretokenized_nli,
+            ensemble_weights=ensemble_weights,
+            section_catalogues=section_catalogues,
+            ann_threshold=ann_threshold,
+            ann_top_n=ann_top_n,
+            knn_neighbours=knn_neighbours,
+            linear_model_path=linear_model_path
+        )
+        # The classifier's sections: the IPC plus any external catalogues
+        self.sections = self.classifier.sections
+        self.penalty_estimator = PenaltyEstimator(self.sections)
+        
+        self.citation_mode = citation_mode
+        self.citation_extractor = CitationExtractor(self.sections)
         
         logger.info("Legal AI Pipeline initialized successfully!")
     
+    def warmup(self, methods: Optional[List[str]] = None):
+        """
+        Load models eagerly instead of on the first request.
+        
+        Args:
+            methods: Classification methods to prepare (defaults to the configured method)
+        """
+        methods = methods or [self.classification_method]
+        logger.info(f"Loading models for: {', '.join(methods)}")
+        self.preprocessor.warmup()
+        self.classifier.warmup(methods)
+    
     def process_transcript(self, 
                           transcript_text: str,
-                          case_metadata: Optional[Dict] = None) -> Dict[str, Any]:
+                          case_metadata: Optional[Dict] = None,
+                          citation_mode: Optional[str] = None,
+                          candidate_sections: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Process a court case transcript and return structured IPC analysis.
         
         Args:
             transcript_text: Raw text of the court case transcript
             case_metadata: Optional metadata about the case
+            citation_mode: Overrides the pipeline's citation mode for this transcript
+            candidate_sections: Only rank these sections (e.g. the charges in the FIR)
             
         Returns:
             Dictionary containing complete analysis results
         """
         logger.info("Starting transcript processing...")
+        citation_mode = self._resolve_citation_mode(citation_mode)
         
         # Step 1: Preprocess the transcript
         logger.info("Step 1: Preprocessing transcript...")
         preprocessing_result = self.preprocessor.preprocess(transcript_text)
         
-        # Step 2: Classify crimes using IPC sections
-        logger.info("Step 2: Classifying crimes...")
-        classification_result = self.classifier.classify(
-            text=preprocessing_result['classification_text'],
-            crime_keywords=preprocessing_result['crime_keywords'],
+        cited = self._cited_sections(transcript_text, citation_mode, candidate_sections)
+        final_result = self._classify_and_compile(
+            transcript_text=transcript_text,
+            preprocessing_result=preprocessing_result,
+            cited=cited,
+            citation_mode=citation_mode,
+            case_metadata=case_metadata,
+            candidate_sections=candidate_sections
+        )
+        
+        logger.info("Transcript processing completed!")
+        return final_result
+    
+    def process_transcript_file(self, 
+                                path: str,
+                                case_metadata: Optional[Dict] = None,
+                                citation_mode: Optional[str] = None,
+                                candidate_sections: Optional[List[str]] = None,
+                                encoding: str = 'utf-8') -> Dict[str, Any]:
+        """
+        Process a transcript file read line by line, without loading it into memory.
+        
+        For transcripts too large for process_transcript(). Sections are classified from
+        the first stream_section_chars characters of each transcript section (see
+        LegalTextPreprocessor.preprocess_stream) and citations are found per line.
+        
+        Args:
+            path: Path of the transcript text file
+            case_metadata: Optional metadata about the case
+            citation_mode: Overrides the pipeline's citation mode for this transcript
+            candidate_sections: Only rank these sections (e.g. the charges in the FIR)
+            encoding: Text encoding of the file
+            
+        Returns:
+            Dictionary containing complete analysis results
+        """
+        logger.info(f"Starting streamed processing of {path}...")
+        citation_mode = self._resolve_citation_mode(citation_mode)
+        
+        # Step 1: Preprocess the transcript, collecting citations line by line
+        logger.info("Step 1: Preprocessing transcript...")
+        cited = {}
+        
+        def lines(f):
+            for line in f:
+                for result in self._cited_sections(line, citation_mode, candidate_sections):
+                    cited.setdefault(result['section_number'], result)
+                yield line
+        
+        with open(path, encoding=encoding) as f:
+            preprocessing_result = self.preprocessor.preprocess_stream(
+                lines(f), 
+                chunk_chars=self.stream_chunk_chars, 
+                max_section_chars=self.stream_section_chars
+            )
+        if not preprocessing_result['word_count']:
+            raise ValueError(f"Transcript file is empty: {path}")
+        
+        final_result = self._classify_and_compile(
+            transcript_text=None,
+            preprocessing_result=preprocessing_result,
+            cited=list(cited.values()),
+            citation_mode=citation_mode,
+            case_metadata=case_metadata,
+            candidate_sections=candidate_sections
+        )
+        final_result['preprocessing_summary']['truncated_sections'] = preprocessing_result['truncated_sections']
+        
+        logger.info("Transcript processing completed!")
+        return final_result
+    
+    def open_session(self, 
+                     session_id: str,
+                     case_metadata: Optional[Dict] = None,
+                     citation_mode: Optional[str] = None,
+                     candidate_sections: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Start an incremental analysis of a transcript that will be appended to.
+        
+        Args:
+            session_id: Transcript identifier (an open session with this ID is replaced)
+            case_metadata: Optional metadata about the case
+            citation_mode: Overrides the pipeline's citation mode for this transcript
+            candidate_sections: Only rank these sections (e.g. the charges in the FIR)
+            
+        Returns:
+            Session summary
+        """
+        session = TranscriptSession(
+            session_id,
+            TranscriptStream(self.preprocessor, max_section_chars=self.stream_section_chars),
+            case_metadata=case_metadata,
+            citation_mode=self._resolve_citation_mode(citation_mode),
+            candidate_sections=candidate_sections
+        )
+        self.sessions.add(session)
+        logger.info(f"Opened transcript session {session_id}")
+        return session.info()
+    
+    def append_to_session(self, session_id: str, text: str, final: bool = False) -> Dict[str, Any]:
+        """
+        Add text to a session's transcript and return the updated analysis.
+        
+        Only the appended text is preprocessed and scored; its raw scores are pooled with
+        those of earlier chunks like window scores (window_pooling) and the pooled scores
+        are ranked once, as for a one-shot transcript. A trailing incomplete
+        line is held back until the next append (or final).
+        
+        Args:
+            session_id: ID given to open_session() (SessionNotFound if it is not open)
+            text: Text appended to the transcript since the last update
+            final: Also process the incomplete last line
+            
+        Returns:
+            Analysis of the whole transcript so far, with a 'session' summary
+        """
+        session = self.sessions.get(session_id)
+        with session.lock:
+            stream = session.stream
+            chunk_lines = {}
+            for line in session.split_lines(text, final):
+                cleaned = stream.add_line(line)
+                if cleaned:
+                    chunk_lines.setdefault(stream.current_section, []).append(cleaned)
+                for result in self._cited_sections(line, session.citation_mode, session.candidate_sections):
+                    session.cited.setdefault(result['section_number'], result)
+            stream.flush()
+            
+            cited = list(session.cited.values())
+            models_run = bool(chunk_lines) and bool(self._model_top_k(cited, session.citation_mode))
+            if models_run:
+                self._classify_chunk(session, chunk_lines)
+            
+            classification_result = []
+            session_scores = session.session_scores(self.classifier.window_pooling)
+            if session_scores is not None:
+                classification_result = [
+                    result for result in self.classifier.rank_raw_scores(
+                        session_scores, self.classification_method, self.top_k_sections, session.stages_run
+                    )
+                    if result['confidence_score'] > 0
+                ]
+            result = self._estimate_and_compile(
+                transcript_text=None,
+                preprocessing_result=stream.result(),
+                classification_result=self._merge_citations(cited, classification_result),
+                case_metadata=session.case_metadata,
+                classification_stats={
+                    'method': self.classification_method,
+                    'nli_pairs_evaluated': session.nli_pairs_evaluated,
+                    'chunks': session.chunks_classified,
+                    'pooling': self.classifier.window_pooling,
+                    'citation_mode': session.citation_mode,
+                    'cited_sections': [result['section_number'] for result in cited],
+                    'models_run': models_run
+                }
+            )
+            result['preprocessing_summary']['truncated_sections'] = sorted(stream.truncated_sections)
+            result['session'] = session.info()
+            return result
+    
+    def close_session(self, session_id: str) -> Dict[str, Any]:
+        """
+        Process a session's incomplete last line, end the session and return its final
+        analysis (SessionNotFound if no session with this ID is open).
+        """
+        result = self.append_to_session(session_id, '', final=True)
+        self.sessions.remove(session_id)
+        logger.info(f"Closed transcript session {session_id}")
+        return result
+    
+    def _classify_chunk(self, session: TranscriptSession, chunk_lines: Dict[str, List[str]]):
+        """Score the lines appended to a session and pool their raw scores into the session."""
+        chunk = self.preprocessor.classification_input(chunk_lines)
+        
+        # Raw scores, before the per-text normalisation of the ranking, so a chunk that
+        # barely touches an offence does not count as much as the one describing it
+        scores, stats = self.classifier.raw_scores_with_stats(
+            text=chunk['classification_text'],
+            crime_keywords=chunk['crime_keywords'],
             method=self.classification_method,
-            top_k=self.top_k_sections
+            candidate_sections=session.candidate_sections
+        )
+        session.pool(scores, self.classifier.window_pooling, stats.get('stages_run', []))
+        session.nli_pairs_evaluated += stats.get('nli_pairs_evaluated', 0)
+    
+    def _classify_and_compile(self, 
+                              transcript_text: Optional[str],
+                              preprocessing_result: Dict,
+                              cited: List[Dict],
+                              citation_mode: str,
+                              case_metadata: Optional[Dict],
+                              candidate_sections: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Classify a preprocessed transcript, starting from its citations, and compile the result."""
+        # Step 2: Classify crimes using IPC sections, starting from explicit citations
+        logger.info("Step 2: Classifying crimes...")
+        model_top_k = self._model_top_k(cited, citation_mode)
+        classification_result = []
+        classification_stats = {'method': self.classification_method, 'nli_pairs_evaluated': 0}
+        if model_top_k:
+            classification_result, stats = self.classifier.classify_with_stats(
+                text=preprocessing_result['classification_text'],
+                crime_keywords=preprocessing_result['crime_keywords'],
+                method=self.classification_method,
+                top_k=model_top_k,
+                candidate_sections=candidate_sections
+            )
+            classification_stats = dict(stats)
+        else:
+            logger.info(f"Using {len(cited)} cited sections without model inference")
+        
+        classification_stats['citation_mode'] = citation_mode
+        classification_stats['cited_sections'] = [result['section_number'] for result in cited]
+        classification_stats['models_run'] = bool(model_top_k)
+        
+        return self._estimate_and_compile(
+            transcript_text=transcript_text,
+            preprocessing_result=preprocessing_result,
+            classification_result=self._merge_citations(cited, classification_result),
+            case_metadata=case_metadata,
+            classification_stats=classification_stats
         )
+    
+    def _resolve_citation_mode(self, citation_mode: Optional[str]) -> str:
+        """Citation mode for a request, defaulting to the pipeline's setting."""
+        citation_mode = citation_mode or self.citation_mode
+        if citation_mode not in self.CITATION_MODES:
+            raise ValueError(f"Unknown citation mode: {citation_mode}")
+        return citation_mode
+    
+    def _cited_sections(self, 
+                        transcript_text: str, 
+                        citation_mode: str, 
+                        candidate_sections: Optional[List[str]] = None) -> List[Dict]:
+        """Classification entries for the sections cited explicitly in the raw transcript."""
+        if citation_mode == 'off':
+            return []
+        
+        cited = []
+        for citation in self.citation_extractor.extract(transcript_text):
+            if candidate_sections is not None and citation['section'] not in candidate_sections:
+                continue
+            result = self.classifier.section_result(
+                citation['section'], self.CITED_SECTION_CONFIDENCE, 'citation'
+            )
+            if result is not None:
+                result['citation_text'] = citation['mention']
+                cited.append(result)
+        return cited
+    
+    def _model_top_k(self, cited: List[Dict], citation_mode: str) -> int:
+        """
+        How many sections to request from the models (0 skips them).
         
+        At most len(cited) of the model's top_k_sections are cited sections, so the
+        uncited rest always fills the slots left after the citations.
+        """
+        if not cited:
+            return self.top_k_sections
+        if citation_mode == 'fast' or len(cited) >= self.top_k_sections:
+            return 0
+        return self.top_k_sections
+    
+    def _merge_citations(self, cited: List[Dict], classification_result: List[Dict]) -> List[Dict]:
+        """Every cited section first, then uncited model-ranked sections up to top_k_sections."""
+        if not cited:
+            return classification_result
+        
+        cited_numbers = {result['section_number'] for result in cited}
+        additional = [result for result in classification_result if result['section_number'] not in cited_numbers]
+        return cited + additional[:max(self.top_k_sections - len(cited), 0)]
+    
+    def _estimate_and_compile(self, 
+                              transcript_text: Optional[str],
+                              preprocessing_result: Dict,
+                              classification_result: List[Dict],
+                              case_metadata: Optional[Dict],
+                              classification_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Estimate penalties for classified sections and compile the final result."""
         # Step 3: Estimate penalties
         logger.info("Step 3: Estimating penalties...")
         context = {
@@ -87,23 +472,22 @@ class LegalAIPipeline:
         
         # Step 4: Compile final results
         logger.info("Step 4: Compiling results...")
-        final_result = self._compile_results(
+        return self._compile_results(
             transcript_text=transcript_text,
             preprocessing_result=preprocessing_result,
             classification_result=classification_result,
             penalty_summaries=penalty_summaries,
-            case_metadata=case_metadata
+            case_metadata=case_metadata,
+            classification_stats=classification_stats
         )
-        
-        logger.info("Transcript processing completed!")
-        return final_result
     
     def _compile_results(self, 
-                        transcript_text: str,
+                        transcript_text: Optional[str],
                         preprocessing_result: Dict,
                         classification_result: List[Dict],
                         penalty_summaries: List[Dict],
-                        case_metadata: Optional[Dict]) -> Dict[str, Any]:
+                        case_metadata: Optional[Dict],
+                        classification_stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Compile all results into a structured output."""
         
         # Determine primary crime classification
@@ -120,6 +504,7 @@ class LegalAIPipeline:
                 "description": classification['description'],
                 "penalty": penalty['penalty_text'],
                 "confidence_score": classification['confidence_score'],
+                "cited": classification.get('method') == 'citation',
                 "penalty_confidence": penalty['penalty_confidence'],
                 "context_factors": penalty['context_factors']
             })
@@ -136,7 +521,8 @@ class LegalAIPipeline:
                 "ipc_sections": ipc_sections,
                 "confidence_score": overall_confidence,
                 "processing_timestamp": datetime.now().isoformat(),
-                "classification_method": self.classification_method
+                "classification_method": self.classification_method,
+                "classification_stats": classification_stats or {}
             },
             "preprocessing_summary": {
                 "word_count": preprocessing_result['word_count'],
@@ -186,40 +572,125 @@ class LegalAIPipeline:
         return round(overall_confidence, 3)
     
     def batch_process(self, 
-                     transcripts: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+                     transcripts: List[Dict[str, str]],
+                     citation_mode: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Process multiple transcripts in batch.
         
         Args:
-            transcripts: List of dictionaries with 'text' and optional 'metadata' keys
+            transcripts: List of dictionaries with 'text' and optional 'metadata' and
+                'candidate_sections' keys
+            citation_mode: Overrides the pipeline's citation mode for this batch
             
         Returns:
             List of analysis results
         """
         logger.info(f"Starting batch processing of {len(transcripts)} transcripts...")
+        citation_mode = self._resolve_citation_mode(citation_mode)
+        
+        results = [None] * len(transcripts)
+        
+        # Step 1: Preprocess all transcripts, with spaCy NER batched through nlp.pipe
+        logger.info(f"Preprocessing {len(transcripts)} transcripts...")
+        try:
+            preprocessing_results = self.preprocessor.preprocess_many(
+                [transcript_data['text'] for transcript_data in transcripts],
+                n_process=self.ner_processes,
+                batch_size=self.ner_batch_size
+            )
+        except Exception as e:
+            # Fall back to one at a time so a bad transcript only fails itself
+            logger.warning(f"Batch preprocessing failed ({e}); preprocessing transcripts individually")
+            preprocessing_results = None
         
-        results = []
+        preprocessed = {}
         for i, transcript_data in enumerate(transcripts):
-            logger.info(f"Processing transcript {i+1}/{len(transcripts)}...")
+            try:
+                if preprocessing_results is not None:
+                    preprocessing_result = preprocessing_results[i]
+                else:
+                    preprocessing_result = self.preprocessor.preprocess(transcript_data['text'])
+                preprocessed[i] = (
+                    preprocessing_result,
+                    preprocessing_result['classification_text'],
+                    preprocessing_result['crime_keywords'],
+                    self._cited_sections(
+                        transcript_data['text'], citation_mode, transcript_data.get('candidate_sections')
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Error processing transcript {i+1}: {e}")
+                results[i] = self._batch_error(e, i)
+        
+        # Step 2: Classify all preprocessed transcripts in batched model calls; those
+        # whose citations already fill the result skip the models
+        indices = list(preprocessed)
+        model_indices = [i for i in indices if self._model_top_k(preprocessed[i][3], citation_mode)]
+        logger.info(f"Classifying {len(model_indices)} transcripts in batches...")
+        model_results = {}
+        pairs_per_text = {}
+        
+        # One batch per distinct candidate section set (None: all sections)
+        groups = {}
+        for i in model_indices:
+            candidates = transcripts[i].get('candidate_sections')
+            groups.setdefault(tuple(candidates) if candidates is not None else None, []).append(i)
+        
+        for candidates, group in groups.items():
+            try:
+                batch_results, stats = self.classifier.classify_many_with_stats(
+                    texts=[preprocessed[i][1] for i in group],
+                    keywords_list=[preprocessed[i][2] for i in group],
+                    method=self.classification_method,
+                    top_k=self.top_k_sections,
+                    candidate_sections=list(candidates) if candidates is not None else None
+                )
+            except Exception as e:
+                # Only this group fails; other groups and citation-only transcripts go on
+                logger.error(f"Error classifying batch: {e}")
+                for i in group:
+                    results[i] = self._batch_error(e, i)
+                continue
             
+            batch_pairs = stats.get('nli_pairs_per_text', [0] * len(group))
+            model_results.update(zip(group, batch_results))
+            pairs_per_text.update(zip(group, batch_pairs))
+        
+        # Steps 3-4: Penalties and result compilation per transcript
+        for i in indices:
+            if results[i] is not None:
+                continue
+            cited = preprocessed[i][3]
             try:
-                result = self.process_transcript(
-                    transcript_text=transcript_data['text'],
-                    case_metadata=transcript_data.get('metadata')
+                results[i] = self._estimate_and_compile(
+                    transcript_text=transcripts[i]['text'],
+                    preprocessing_result=preprocessed[i][0],
+                    classification_result=self._merge_citations(cited, model_results.get(i, [])),
+                    case_metadata=transcripts[i].get('metadata'),
+                    classification_stats={
+                        'method': self.classification_method,
+                        'nli_pairs_evaluated': pairs_per_text.get(i, 0),
+                        'batch_size': len(model_indices),
+                        'citation_mode': citation_mode,
+                        'cited_sections': [result['section_number'] for result in cited],
+                        'models_run': i in model_results
+                    }
                 )
-                results.append(result)
-                
             except Exception as e:
                 logger.error(f"Error processing transcript {i+1}: {e}")
-                results.append({
-                    "error": str(e),
-                    "transcript_index": i,
-                    "processing_timestamp": datetime.now().isoformat()
-                })
+                results[i] = self._batch_error(e, i)
         
         logger.info("Batch processing completed!")
         return results
     
+    def _batch_error(self, error: Exception, transcript_index: int) -> Dict[str, Any]:
+        """Error entry for a transcript that failed during batch processing."""
+        return {
+            "error": str(error),
+            "transcript_index": transcript_index,
+            "processing_timestamp": datetime.now().isoformat()
+        }
+    
     def export_results(self, 
                       results: Dict[str, Any], 
                       output_format: str = "json",
@@ -290,7 +761,21 @@ class LegalAIPipeline:
             "system_version": "1.0.0",
             "classification_method": self.classification_method,
             "top_k_sections": self.top_k_sections,
-            "available_ipc_sections": len(get_all_sections()),
+            "cascade_top_n": self.classifier.cascade_top_n,
+            "inference_backends": dict(self.classifier.active_backends),
+            "loaded_models": self.classifier.loaded_models(),
+            "shared_models": registry.get_stats(),
+            "long_document_windows": {
+                "enabled": self.classifier.long_document_mode,
+                "window_size": self.classifier.window_size,
+                "window_stride": self.classifier.window_stride,
+                "nli_window_size": self.classifier.nli_window_size,
+                "pooling": self.classifier.window_pooling
+            },
+            "ensemble_stages": self.classifier.get_stage_stats(),
+            "label_index": self.classifier.label_index_info(),
+            "classification_cache": self.classifier.cache.get_stats() if self.classifier.cache else None,
+            "available_ipc_sections": len(self.sections),
             "components": {
                 "preprocessor": "LegalTextPreprocessor",
                 "classifier": "CrimeClassifier",
@@ -7,18 +7,27 @@ import numpy as np
 import json
 import pickle
 from typing import Dict, List, Tuple, Optional
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from model_registry import acquire_sentence_model, release_model
 import os
 from datetime import datetime
 
+
+def _cosine_similarities(query: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a query vector to each embedding row (0 for zero vectors)."""
+    norms = np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(norms > 0, embeddings @ query / norms, 0.0)
+
+
 class LegalCaseRetrieval:
     """Legal case retrieval system using embeddings and similarity search."""
     
     def __init__(self, 
                  model_name: str = "all-MiniLM-L6-v2",
                  similarity_threshold: float = 0.7,
-                 precedent_threshold: float = 0.85):
+                 precedent_threshold: float = 0.85,
+                 inference_backend: str = "pytorch",
+                 onnx_model_dir: str = "onnx_models"):
         """
         Initialize the legal case retrieval system.
         
@@ -26,22 +35,27 @@ class LegalCaseRetrieval:
             model_name: Sentence transformer model name
             similarity_threshold: Minimum similarity for relevant cases
             precedent_threshold: Minimum similarity for precedent cases
+            inference_backend: 'pytorch', 'onnx' or 'onnx_int8' for the sentence encoder
+            onnx_model_dir: Directory containing models exported by onnx_backend.py
         """
         self.model_name = model_name
         self.similarity_threshold = similarity_threshold
         self.precedent_threshold = precedent_threshold
         
-        # Initialize sentence transformer
+        # Shared sentence transformer (ONNX Runtime when exported, else PyTorch)
         print(f"Loading sentence transformer model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model, self.inference_backend = acquire_sentence_model(
+            model_name, inference_backend, onnx_model_dir
+        )
         
         # Storage for embeddings and metadata
         self.case_embeddings = None
         self.case_metadata = None
         self.cases_database = None
         
-        # File paths for persistence
-        self.embeddings_file = "case_embeddings.pkl"
+        # File paths for persistence (embeddings differ slightly between backends)
+        backend_suffix = "" if self.inference_backend == "pytorch" else f"_{self.inference_backend}"
+        self.embeddings_file = f"case_embeddings{backend_suffix}.pkl"
         self.metadata_file = "case_metadata.pkl"
         
     def load_cases_database(self, cases_database_path: str = "cases_database.py"):
@@ -176,7 +190,7 @@ class LegalCaseRetrieval:
         query_embedding = self.model.encode([query])
         
         # Calculate similarities
-        similarities = cosine_similarity(query_embedding, self.case_embeddings)[0]
+        similarities = _cosine_similarities(np.asarray(query_embedding)[0], np.asarray(self.case_embeddings))
         
         # Get top-k results
         top_indices = np.argsort(similarities)[::-1][:top_k]
@@ -370,8 +384,15 @@ class LegalCaseRetrieval:
                 "latest": max(dates) if dates else "N/A"
             },
             "embeddings_generated": self.case_embeddings is not None,
-            "model_used": self.model_name
+            "model_used": self.model_name,
+            "inference_backend": self.inference_backend
         }
+    
+    def release(self):
+        """Return the sentence transformer to the shared model registry."""
+        if self.model is not None:
+            release_model("sentence", self.model_name, self.inference_backend)
+            self.model = None
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -0,0 +1,235 @@
+"""
+Linear Section Classifier
+TF-IDF features (word and character n-grams) with one logistic regression per section,
+trained on the labelled cases in the case database. Needs no transformer model, so it
+can triage high volumes of transcripts on a CPU in well under a millisecond each.
+
+Usage:
+    python linear_classifier.py --output linear_model.pkl
+"""
+
+import argparse
+import hashlib
+import json
+import pickle
+import numpy as np
+from collections import Counter
+from scipy.sparse import csr_matrix, hstack
+from typing import Dict, List, Optional, Tuple
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import MultiLabelBinarizer
+
+from cases_database import get_all_cases
+
+# Version of the artifact layout written by save()
+ARTIFACT_FORMAT = 1
+
+
+def case_training_data(cases: Optional[Dict[str, Dict]] = None) -> Tuple[List[str], List[List[str]]]:
+    """Crime/facts text and charged sections of each labelled case (the case database by default)."""
+    texts, labels = [], []
+    for case in (cases or get_all_cases()).values():
+        text = " ".join(filter(None, [case.get('crime', ''), case.get('facts', '')]))
+        if text and case.get('sections'):
+            texts.append(text)
+            labels.append(list(case['sections']))
+    return texts, labels
+
+
+def training_data_hash(texts: List[str], labels: List[List[str]]) -> str:
+    """Short content hash of a training set, stored with the model to detect stale artifacts."""
+    return hashlib.sha256(
+        json.dumps([texts, labels], sort_keys=True).encode('utf-8')
+    ).hexdigest()[:16]
+
+
+class LinearSectionClassifier:
+    """Multi-label TF-IDF + logistic regression classifier scored as one sparse matrix product."""
+
+    def __init__(self,
+                 C: float = 10.0,
+                 word_ngram_range: Tuple[int, int] = (1, 2),
+                 char_ngram_range: Tuple[int, int] = (2, 5)):
+        """
+        Initialize an untrained classifier.
+
+        Args:
+            C: Inverse regularisation strength of the per-section logistic regressions
+            word_ngram_range: Word n-gram sizes for the word TF-IDF features
+            char_ngram_range: Character n-gram sizes (within word boundaries)
+        """
+        self.C = C
+        self.vectorizers = [
+            TfidfVectorizer(ngram_range=word_ngram_range, sublinear_tf=True),
+            TfidfVectorizer(analyzer='char_wb', ngram_range=char_ngram_range, sublinear_tf=True)
+        ]
+        # (analyzer, vocabulary, idf, column offset) of each fitted vectorizer
+        self._features = []
+        self.num_features = 0
+        self.classes: List[str] = []
+        self.coef = None
+        self.intercept = None
+        self.training_hash = None
+        self.version = None
+
+    def fit(self, texts: List[str], labels: List[List[str]]) -> "LinearSectionClassifier":
+        """
+        Train one binary logistic regression per section.
+
+        Args:
+            texts: Training texts
+            labels: Sections of each training text
+
+        Returns:
+            The fitted classifier
+        """
+        if not texts:
+            raise ValueError("No training texts")
+
+        features = hstack([vectorizer.fit_transform(texts) for vectorizer in self.vectorizers]).tocsr()
+        self._compile_features()
+        binarizer = MultiLabelBinarizer()
+        targets = binarizer.fit_transform(labels)
+        self.classes = list(binarizer.classes_)
+
+        coef = np.zeros((features.shape[1], len(self.classes)), dtype=np.float32)
+        intercept = np.zeros(len(self.classes), dtype=np.float32)
+        for column in range(len(self.classes)):
+            target = targets[:, column]
+            if target.min() == target.max():
+                # Every training case has (or lacks) this section
+                intercept[column] = 10.0 if target[0] else -10.0
+                continue
+            model = LogisticRegression(C=self.C, solver='liblinear', class_weight='balanced')
+            model.fit(features, target)
+            coef[:, column] = model.coef_[0]
+            intercept[column] = model.intercept_[0]
+
+        # (features x sections) weights, so a batch is scored with one sparse product
+        self.coef = coef
+        self.intercept = intercept
+        self.training_hash = training_data_hash(texts, labels)
+        self.version = hashlib.sha256(coef.tobytes() + intercept.tobytes()).hexdigest()[:16]
+        return self
+
+    def _compile_features(self):
+        """
+        Keep only what TF-IDF inference needs from the fitted vectorizers.
+        
+        sklearn's transform() validates its input and parameters on every call, which
+        costs far more than the features themselves for a single short text.
+        """
+        self._features = []
+        offset = 0
+        for vectorizer in self.vectorizers:
+            self._features.append((vectorizer.build_analyzer(), vectorizer.vocabulary_, vectorizer.idf_, offset))
+            offset += len(vectorizer.vocabulary_)
+        self.num_features = offset
+
+    def transform(self, texts: List[str]) -> csr_matrix:
+        """
+        Sparse (texts x features) TF-IDF matrix, identical to the fitted vectorizers' output.
+
+        Each vectorizer block holds (1 + log tf) * idf, L2-normalised per block.
+        """
+        indptr, indices, values = [0], [], []
+        for text in texts:
+            row_size = 0
+            for analyzer, vocabulary, idf, offset in self._features:
+                counts = Counter(term for term in analyzer(text) if term in vocabulary)
+                if not counts:
+                    continue
+                columns = np.fromiter((vocabulary[term] for term in counts), dtype=np.int64, count=len(counts))
+                weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))) * idf[columns]
+                indices.append(columns + offset)
+                values.append(weights / np.linalg.norm(weights))
+                row_size += len(columns)
+            indptr.append(indptr[-1] + row_size)
+
+        return csr_matrix(
+            (np.concatenate(values) if values else np.zeros(0), 
+             np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64), 
+             indptr),
+            shape=(len(texts), self.num_features)
+        )
+
+    def predict_proba_matrix(self, features) -> np.ndarray:
+        """
+        Section probabilities for a sparse feature matrix.
+
+        Args:
+            features: Sparse (texts x features) matrix from transform()
+
+        Returns:
+            Dense (texts x sections) probabilities in classes order
+        """
+        logits = np.asarray(features @ self.coef) + self.intercept
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Section probabilities (texts x sections, classes order) for a batch of texts."""
+        if self.coef is None:
+            raise ValueError("Model is not trained. Call fit() or load() first.")
+        if not texts:
+            return np.zeros((0, len(self.classes)))
+        return self.predict_proba_matrix(self.transform(texts))
+
+    def save(self, path: str):
+        """Serialise the fitted model to a pickle artifact."""
+        with open(path, 'wb') as f:
+            pickle.dump({
+                'format': ARTIFACT_FORMAT,
+                'C': self.C,
+                'vectorizers': self.vectorizers,
+                'classes': self.classes,
+                'coef': self.coef,
+                'intercept': self.intercept,
+                'training_hash': self.training_hash,
+                'version': self.version
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearSectionClassifier":
+        """Load a model written by save()."""
+        with open(path, 'rb') as f:
+            artifact = pickle.load(f)
+        if artifact.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported linear model format: {artifact.get('format')}")
+
+        model = cls(C=artifact['C'])
+        model.vectorizers = artifact['vectorizers']
+        model._compile_features()
+        model.classes = artifact['classes']
+        model.coef = artifact['coef']
+        model.intercept = artifact['intercept']
+        model.training_hash = artifact['training_hash']
+        model.version = artifact['version']
+        return model
+
+
+def main():
+    """Command-line entry point for training the linear classifier."""
+    parser = argparse.ArgumentParser(description="Train the linear section classifier on the case database")
+    parser.add_argument("--output", default="linear_model.pkl", help="Where to write the model artifact")
+    parser.add_argument("--C", type=float, default=10.0, help="Inverse regularisation strength")
+    args = parser.parse_args()
+
+    texts, labels = case_training_data()
+    model = LinearSectionClassifier(C=args.C).fit(texts, labels)
+    model.save(args.output)
+
+    # Accuracy on the training cases (the database is too small for a held-out split)
+    probabilities = model.predict_proba(texts)
+    top1 = np.mean([
+        model.classes[int(np.argmax(row))] in sections for row, sections in zip(probabilities, labels)
+    ])
+    print(f"Trained on {len(texts)} cases, {len(model.classes)} sections, "
+          f"{model.coef.shape[0]} features")
+    print(f"Training top-1 accuracy: {top1:.1%}")
+    print(f"Model written to {args.output} (version {model.version})")
+
+
+if __name__ == "__main__":
+    main()
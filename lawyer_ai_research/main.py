@@ -15,7 +15,9 @@ import os
 import tempfile
 
 # Import our custom modules
+from config import settings
 from legal_ai_pipeline import LegalAIPipeline
+from transcript_session import SessionNotFound
 from legal_case_retrieval import LegalCaseRetrieval
 from ipc_database import get_all_sections, get_ipc_section, search_sections_by_keyword
 from cases_database import get_all_cases, get_case_by_id, search_cases_by_keyword
@@ -52,6 +54,8 @@ class TranscriptAnalysisRequest(BaseModel):
     case_metadata: Optional[Dict[str, Any]] = Field(None, description="Optional case metadata")
     classification_method: Optional[str] = Field("ensemble", description="Classification method")
     top_k_sections: Optional[int] = Field(5, description="Number of top IPC sections to return")
+    citation_mode: Optional[str] = Field(None, description="Explicitly cited sections: 'off', 'augment' or 'fast' (defaults to the server setting)")
+    candidate_sections: Optional[List[str]] = Field(None, description="Only rank these sections (e.g. the charges in the FIR)")
 
 class CaseSearchRequest(BaseModel):
     query: str = Field(..., description="Search query for similar cases")
@@ -64,8 +68,19 @@ class IPCSectionRequest(BaseModel):
 class KeywordSearchRequest(BaseModel):
     keyword: str = Field(..., description="Keyword to search for")
 
+class SessionOpenRequest(BaseModel):
+    session_id: str = Field(..., description="Transcript identifier")
+    case_metadata: Optional[Dict[str, Any]] = Field(None, description="Optional case metadata")
+    citation_mode: Optional[str] = Field(None, description="Explicitly cited sections: 'off', 'augment' or 'fast' (defaults to the server setting)")
+    candidate_sections: Optional[List[str]] = Field(None, description="Only rank these sections (e.g. the charges in the FIR)")
+
+class SessionAppendRequest(BaseModel):
+    text: str = Field(..., description="Transcript text appended since the last update")
+    final: Optional[bool] = Field(False, description="Also process the incomplete last line")
+
 class BatchAnalysisRequest(BaseModel):
     transcripts: List[Dict[str, Any]] = Field(..., description="List of transcripts to analyze")
+    citation_mode: Optional[str] = Field(None, description="Explicitly cited sections: 'off', 'augment' or 'fast' (defaults to the server setting)")
 
 # Response models
 class AnalysisResponse(BaseModel):
@@ -94,10 +109,43 @@ async def startup_event():
     
     try:
         logger.info("Initializing Legal AI Pipeline...")
-        legal_pipeline = LegalAIPipeline()
+        legal_pipeline = LegalAIPipeline(
+            cascade_top_n=settings.cascade_top_n,
+            inference_backend=settings.inference_backend,
+            onnx_model_dir=settings.onnx_model_dir,
+            cache_size=settings.classification_cache_size,
+            cache_ttl=settings.classification_cache_ttl,
+            long_document_mode=settings.long_document_mode,
+            window_size=settings.window_size,
+            window_stride=settings.window_stride,
+            nli_window_size=settings.nli_window_size,
+            window_pooling=settings.window_pooling,
+            early_exit_margin=settings.early_exit_margin,
+            hierarchy_top_categories=settings.hierarchy_top_categories,
+            pretokenized_nli=settings.pretokenized_nli,
+            ensemble_weights=settings.ensemble_weights,
+            section_catalogues=settings.section_catalogues,
+            ann_threshold=settings.ann_threshold,
+            ann_top_n=settings.ann_top_n,
+            knn_neighbours=settings.knn_neighbours,
+            linear_model_path=settings.linear_model_path,
+            citation_mode=settings.citation_mode,
+            ner_processes=settings.ner_processes,
+            ner_batch_size=settings.ner_batch_size,
+            spacy_model=settings.spacy_model,
+            nltk_data_dir=settings.nltk_data_dir,
+            stream_chunk_chars=settings.stream_chunk_chars,
+            stream_section_chars=settings.stream_section_chars,
+            max_sessions=settings.max_transcript_sessions
+        )
+        if settings.warmup_models:
+            legal_pipeline.warmup()
         
         logger.info("Initializing Case Retrieval System...")
-        case_retrieval = LegalCaseRetrieval()
+        case_retrieval = LegalCaseRetrieval(
+            inference_backend=settings.inference_backend,
+            onnx_model_dir=settings.onnx_model_dir
+        )
         case_retrieval.load_cases_database()
         case_retrieval.generate_embeddings()
         
@@ -149,7 +197,9 @@ async def analyze_transcript(request: TranscriptAnalysisRequest):
         # Process the transcript
         result = legal_pipeline.process_transcript(
             transcript_text=request.transcript_text,
-            case_metadata=request.case_metadata
+            case_metadata=request.case_metadata,
+            citation_mode=request.citation_mode,
+            candidate_sections=request.candidate_sections
         )
         
         return AnalysisResponse(
@@ -171,7 +221,7 @@ async def analyze_batch_transcripts(request: BatchAnalysisRequest):
             raise HTTPException(status_code=503, detail="Legal pipeline not initialized")
         
         # Process batch
-        results = legal_pipeline.batch_process(request.transcripts)
+        results = legal_pipeline.batch_process(request.transcripts, citation_mode=request.citation_mode)
         
         return AnalysisResponse(
             success=True,
@@ -184,6 +234,74 @@ async def analyze_batch_transcripts(request: BatchAnalysisRequest):
         logger.error(f"Error in batch analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Incremental transcript sessions (transcripts appended to during a hearing)
+@app.post("/api/sessions", response_model=AnalysisResponse)
+async def open_transcript_session(request: SessionOpenRequest):
+    """Start an incremental analysis of a transcript."""
+    try:
+        if not legal_pipeline:
+            raise HTTPException(status_code=503, detail="Legal pipeline not initialized")
+        
+        session = legal_pipeline.open_session(
+            request.session_id,
+            case_metadata=request.case_metadata,
+            citation_mode=request.citation_mode,
+            candidate_sections=request.candidate_sections
+        )
+        
+        return AnalysisResponse(
+            success=True,
+            data=session,
+            message=f"Session {request.session_id} opened",
+            timestamp=datetime.now().isoformat()
+        )
+        
+    except Exception as e:
+        logger.error(f"Error opening session: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/sessions/{session_id}/append", response_model=AnalysisResponse)
+async def append_to_transcript_session(session_id: str, request: SessionAppendRequest):
+    """Append text to a session's transcript and return the updated analysis."""
+    if not legal_pipeline:
+        raise HTTPException(status_code=503, detail="Legal pipeline not initialized")
+    try:
+        result = legal_pipeline.append_to_session(session_id, request.text, final=request.final)
+        
+        return AnalysisResponse(
+            success=True,
+            data=result,
+            message="Transcript session updated",
+            timestamp=datetime.now().isoformat()
+        )
+        
+    except SessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error updating session {session_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/api/sessions/{session_id}", response_model=AnalysisResponse)
+async def close_transcript_session(session_id: str):
+    """End a session and return the final analysis of its transcript."""
+    if not legal_pipeline:
+        raise HTTPException(status_code=503, detail="Legal pipeline not initialized")
+    try:
+        result = legal_pipeline.close_session(session_id)
+        
+        return AnalysisResponse(
+            success=True,
+            data=result,
+            message=f"Session {session_id} closed",
+            timestamp=datetime.now().isoformat()
+        )
+        
+    except SessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error closing session {session_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Case search endpoints
 @app.post("/api/search/cases", response_model=SearchResponse)
 async def search_similar_cases(request: CaseSearchRequest):
@@ -235,7 +353,7 @@ async def find_precedent_cases(query: str, top_k: int = 5):
 async def get_all_ipc_sections():
     """Get all IPC sections."""
     try:
-        sections = get_all_sections()
+        sections = legal_pipeline.sections if legal_pipeline else get_all_sections()
         return {
             "success": True,
             "data": {"sections": sections, "total_count": len(sections)},
@@ -250,7 +368,7 @@ async def get_all_ipc_sections():
 async def get_ipc_section_details(section_number: str):
     """Get details of a specific IPC section."""
     try:
-        section = get_ipc_section(section_number)
+        section = get_ipc_section(section_number, legal_pipeline.sections if legal_pipeline else None)
         if not section:
             raise HTTPException(status_code=404, detail=f"IPC section {section_number} not found")
         
@@ -270,7 +388,9 @@ async def get_ipc_section_details(section_number: str):
 async def search_ipc_sections(request: KeywordSearchRequest):
     """Search IPC sections by keyword."""
     try:
-        matching_sections = search_sections_by_keyword(request.keyword)
+        matching_sections = search_sections_by_keyword(
+            request.keyword, legal_pipeline.sections if legal_pipeline else None
+        )
         
         return {
             "success": True,
@@ -0,0 +1,156 @@
+"""
+Shared Model Registry
+Hands out one instance of each model per process, keyed by model name, backend and
+device, so the classifier and case retrieval share the same weights. Instances are
+reference counted and dropped when the last component releases them.
+"""
+
+import gc
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+# Registry key: (role, model name, backend, device)
+ModelKey = Tuple[str, str, str, str]
+
+
+class ModelRegistry:
+    """Thread-safe, reference-counted store of loaded models."""
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._models: Dict[ModelKey, Any] = {}
+        self._refcounts: Dict[ModelKey, int] = {}
+        self._lock = threading.RLock()
+
+    def acquire(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """
+        Return the shared instance for a key, loading it on first use.
+
+        Args:
+            key: (role, model name, backend, device)
+            loader: Called without arguments to load the model if it is not registered
+
+        Returns:
+            The shared model instance (loader exceptions are propagated)
+        """
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = loader()
+                self._refcounts[key] = 0
+            self._refcounts[key] += 1
+            return self._models[key]
+
+    def release(self, key: ModelKey) -> bool:
+        """
+        Drop one reference to a model, unloading it when no references remain.
+
+        Returns:
+            True if the model was unloaded
+        """
+        with self._lock:
+            if key not in self._refcounts:
+                return False
+            self._refcounts[key] -= 1
+            if self._refcounts[key] > 0:
+                return False
+            del self._models[key]
+            del self._refcounts[key]
+        gc.collect()
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Reference count of every loaded model."""
+        with self._lock:
+            return {"/".join(key): count for key, count in self._refcounts.items()}
+
+
+# Process-wide registry used by all components
+registry = ModelRegistry()
+
+
+def _default_device() -> str:
+    """Device PyTorch models are placed on."""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _model_key(role: str, model_name: str, backend: str) -> ModelKey:
+    """Registry key for a model; ONNX Runtime sessions always run on CPU."""
+    device = _default_device() if backend == "pytorch" else "cpu"
+    return (role, model_name, backend, device)
+
+
+def acquire_sentence_model(model_name: str = "all-MiniLM-L6-v2",
+                           inference_backend: str = "pytorch",
+                           onnx_model_dir: str = "onnx_models") -> Tuple[Any, str]:
+    """
+    Get the shared sentence embedding model.
+
+    Args:
+        model_name: Sentence transformer model name
+        inference_backend: 'pytorch', 'onnx' or 'onnx_int8'; ONNX falls back to PyTorch
+            when no export is available
+        onnx_model_dir: Directory containing models exported by onnx_backend.py
+
+    Returns:
+        The model and the backend actually used
+    """
+    if inference_backend in ("onnx", "onnx_int8"):
+        def load_onnx():
+            from onnx_backend import OnnxSentenceEncoder
+            return OnnxSentenceEncoder(
+                model_name, onnx_model_dir, quantized=inference_backend == "onnx_int8"
+            )
+        try:
+            return registry.acquire(_model_key("sentence", model_name, inference_backend), load_onnx), inference_backend
+        except Exception as e:
+            print(f"Warning: ONNX backend unavailable for {model_name} ({e}). Falling back to PyTorch.")
+
+    def load_pytorch():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name, device=_default_device())
+
+    return registry.acquire(_model_key("sentence", model_name, "pytorch"), load_pytorch), "pytorch"
+
+
+def acquire_zero_shot_pipeline(model_name: str = "facebook/bart-large-mnli",
+                               inference_backend: str = "pytorch",
+                               onnx_model_dir: str = "onnx_models") -> Tuple[Any, str]:
+    """
+    Get the shared zero-shot classification pipeline.
+
+    Args:
+        model_name: NLI model name
+        inference_backend: 'pytorch', 'onnx' or 'onnx_int8'; ONNX falls back to PyTorch
+            when no export is available
+        onnx_model_dir: Directory containing models exported by onnx_backend.py
+
+    Returns:
+        The pipeline and the backend actually used
+    """
+    if inference_backend in ("onnx", "onnx_int8"):
+        def load_onnx():
+            from onnx_backend import load_zero_shot_pipeline
+            return load_zero_shot_pipeline(
+                model_name, onnx_model_dir, quantized=inference_backend == "onnx_int8"
+            )
+        try:
+            return registry.acquire(_model_key("zero_shot", model_name, inference_backend), load_onnx), inference_backend
+        except Exception as e:
+            print(f"Warning: ONNX backend unavailable for {model_name} ({e}). Falling back to PyTorch.")
+
+    def load_pytorch():
+        import torch
+        from transformers import pipeline
+        return pipeline(
+            "zero-shot-classification",
+            model=model_name,
+            device=0 if torch.cuda.is_available() else -1
+        )
+
+    return registry.acquire(_model_key("zero_shot", model_name, "pytorch"), load_pytorch), "pytorch"
+
+
+def release_model(role: str, model_name: str, backend: str) -> bool:
+    """Release a model obtained from acquire_sentence_model or acquire_zero_shot_pipeline."""
+    return registry.release(_model_key(role, model_name, backend))
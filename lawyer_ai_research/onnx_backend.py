@@ -0,0 +1,186 @@
+"""
+ONNX Runtime Inference Backend
+Exports the NLI and sentence transformer models to ONNX, optionally applies dynamic
+int8 quantisation, and serves them through ONNX Runtime for CPU-only deployments.
+"""
+
+import os
+import argparse
+import numpy as np
+from typing import List, Union
+
+try:
+    from optimum.onnxruntime import (
+        ORTModelForSequenceClassification, ORTModelForFeatureExtraction, ORTQuantizer
+    )
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer, pipeline
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# ONNX file names written by optimum
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
+
+def _hub_model_id(model_name: str) -> str:
+    """Resolve short sentence-transformers names to their Hugging Face Hub ids."""
+    if "/" not in model_name:
+        return f"sentence-transformers/{model_name}"
+    return model_name
+
+
+def get_export_dir(model_name: str, onnx_model_dir: str = "onnx_models") -> str:
+    """Directory holding the ONNX export of a model."""
+    return os.path.join(onnx_model_dir, model_name.replace("/", "_"))
+
+
+def _model_file(export_dir: str, quantized: bool) -> str:
+    """Pick the ONNX file to load from an export directory."""
+    if quantized and os.path.exists(os.path.join(export_dir, QUANTIZED_MODEL_FILE)):
+        return QUANTIZED_MODEL_FILE
+    return MODEL_FILE
+
+
+def export_model(model_name: str,
+                 task: str,
+                 onnx_model_dir: str = "onnx_models",
+                 quantize: bool = True) -> str:
+    """
+    Export a Hugging Face model to ONNX and optionally quantise it to int8.
+
+    Args:
+        model_name: Model name or Hub id
+        task: 'sequence-classification' for NLI or 'feature-extraction' for sentence embeddings
+        onnx_model_dir: Root directory for exported models
+        quantize: Apply dynamic int8 quantisation after export
+
+    Returns:
+        Path of the export directory
+    """
+    if not ONNX_AVAILABLE:
+        raise ImportError("ONNX export requires: pip install optimum[onnxruntime]")
+
+    model_class = (
+        ORTModelForSequenceClassification if task == "sequence-classification"
+        else ORTModelForFeatureExtraction
+    )
+    hub_id = model_name if task == "sequence-classification" else _hub_model_id(model_name)
+    export_dir = get_export_dir(model_name, onnx_model_dir)
+
+    print(f"Exporting {hub_id} to ONNX: {export_dir}")
+    model = model_class.from_pretrained(hub_id, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(hub_id)
+    model.save_pretrained(export_dir)
+    tokenizer.save_pretrained(export_dir)
+
+    if quantize:
+        print(f"Applying dynamic int8 quantisation to {model_name}")
+        quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=MODEL_FILE)
+        quantization_config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=export_dir, quantization_config=quantization_config)
+
+    return export_dir
+
+
+def is_exported(model_name: str, onnx_model_dir: str = "onnx_models") -> bool:
+    """Check whether an ONNX export exists for the model."""
+    return os.path.exists(os.path.join(get_export_dir(model_name, onnx_model_dir), MODEL_FILE))
+
+
+def load_zero_shot_pipeline(model_name: str,
+                            onnx_model_dir: str = "onnx_models",
+                            quantized: bool = True):
+    """Load a zero-shot classification pipeline backed by an ONNX Runtime session."""
+    if not ONNX_AVAILABLE:
+        raise ImportError("ONNX backend requires: pip install optimum[onnxruntime]")
+    if not is_exported(model_name, onnx_model_dir):
+        raise FileNotFoundError(f"No ONNX export found for {model_name} in {onnx_model_dir}")
+
+    export_dir = get_export_dir(model_name, onnx_model_dir)
+    model = ORTModelForSequenceClassification.from_pretrained(
+        export_dir, file_name=_model_file(export_dir, quantized)
+    )
+    tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+
+class OnnxSentenceEncoder:
+    """Mean-pooled sentence embeddings from an ONNX Runtime feature-extraction model.
+
+    Mirrors the subset of the SentenceTransformer.encode interface used in this project.
+    """
+
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 onnx_model_dir: str = "onnx_models",
+                 quantized: bool = True,
+                 max_seq_length: int = 256):
+        """Load the exported encoder; raises if the export is missing."""
+        if not ONNX_AVAILABLE:
+            raise ImportError("ONNX backend requires: pip install optimum[onnxruntime]")
+        if not is_exported(model_name, onnx_model_dir):
+            raise FileNotFoundError(f"No ONNX export found for {model_name} in {onnx_model_dir}")
+
+        export_dir = get_export_dir(model_name, onnx_model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            export_dir, file_name=_model_file(export_dir, quantized)
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self.max_seq_length = max_seq_length
+
+    def encode(self,
+               sentences: Union[str, List[str]],
+               batch_size: int = 32,
+               normalize_embeddings: bool = False,
+               **kwargs) -> np.ndarray:
+        """Encode sentences into embeddings, batching inputs of similar length."""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        # Sort by length so each batch is padded only to its own longest input
+        order = np.argsort([-len(sentence) for sentence in sentences], kind="stable")
+        embeddings = [None] * len(sentences)
+
+        for start in range(0, len(sentences), batch_size):
+            batch_indices = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [sentences[idx] for idx in batch_indices],
+                padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np"
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            token_embeddings = np.asarray(token_embeddings)
+
+            # Mean pooling over non-padding tokens
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+            for idx, embedding in zip(batch_indices, pooled):
+                embeddings[idx] = embedding
+
+        embeddings = np.vstack(embeddings).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+        return embeddings[0] if single else embeddings
+
+
+def main():
+    """Command-line entry point for exporting the project's models."""
+    parser = argparse.ArgumentParser(description="Export classifier models to ONNX")
+    parser.add_argument("--nli-model", default="facebook/bart-large-mnli")
+    parser.add_argument("--sentence-model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output-dir", default="onnx_models")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip int8 quantisation")
+    args = parser.parse_args()
+
+    export_model(args.nli_model, "sequence-classification", args.output_dir, not args.no_quantize)
+    export_model(args.sentence_model, "feature-extraction", args.output_dir, not args.no_quantize)
+    print("ONNX export completed!")
+
+
+if __name__ == "__main__":
+    main()
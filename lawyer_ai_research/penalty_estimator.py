@@ -10,8 +10,14 @@ from ipc_database import IPC_DATABASE, get_ipc_section
 class PenaltyEstimator:
     """Estimates penalties for IPC sections with additional context analysis."""
     
-    def __init__(self):
-        """Initialize the penalty estimator."""
+    def __init__(self, sections: Optional[Dict[str, Dict]] = None):
+        """
+        Initialize the penalty estimator.
+        
+        Args:
+            sections: Section database to look penalties up in (defaults to the IPC database)
+        """
+        self.sections = IPC_DATABASE if sections is None else sections
         self.penalty_patterns = {
             'imprisonment': [
                 r'imprisonment\s+(?:of\s+either\s+description\s+)?for\s+a\s+term\s+which\s+may\s+extend\s+to\s+(\d+)\s+years?',
@@ -108,7 +114,7 @@ class PenaltyEstimator:
 
     def estimate_penalty_range(self, section_number: str, context: Dict = None) -> Dict:
         """Estimate penalty range based on IPC section and context."""
-        section_data = get_ipc_section(section_number)
+        section_data = get_ipc_section(section_number, self.sections)
         if not section_data:
             return {}
         
@@ -0,0 +1,69 @@
+"""
+Offline Resource Bundle
+Writes the spaCy model and NLTK corpora used by the text preprocessor into one
+directory, so nodes without network access load them from disk (nothing is downloaded
+at runtime).
+
+Usage (on a machine with network access):
+    python resource_bundle.py --output-dir resources
+
+Then on the offline nodes:
+    SPACY_MODEL=resources/spacy/en_core_web_sm
+    NLTK_DATA_DIR=resources/nltk_data
+"""
+
+import argparse
+import os
+from typing import Dict
+
+from text_preprocessor import LegalTextPreprocessor
+
+# NLTK corpora behind LegalTextPreprocessor.stop_words and .lemmatizer
+NLTK_RESOURCES = ['stopwords', 'wordnet']
+
+
+def bundle_resources(output_dir: str, spacy_model: str = "en_core_web_sm") -> Dict[str, str]:
+    """
+    Download the preprocessor's resources into output_dir.
+
+    Args:
+        output_dir: Bundle directory (created if missing)
+        spacy_model: spaCy model to bundle, saved with only the components the preprocessor loads
+
+    Returns:
+        Settings pointing the preprocessor at the bundle ('spacy_model', 'nltk_data_dir')
+    """
+    import nltk
+    import spacy
+
+    nltk_data_dir = os.path.join(output_dir, 'nltk_data')
+    for resource in NLTK_RESOURCES:
+        if not nltk.download(resource, download_dir=nltk_data_dir, quiet=True):
+            raise RuntimeError(f"Could not download NLTK resource: {resource}")
+
+    try:
+        nlp = spacy.load(spacy_model, exclude=LegalTextPreprocessor.SPACY_EXCLUDE)
+    except OSError:
+        spacy.cli.download(spacy_model)
+        nlp = spacy.load(spacy_model, exclude=LegalTextPreprocessor.SPACY_EXCLUDE)
+    spacy_model_dir = os.path.join(output_dir, 'spacy', spacy_model)
+    nlp.to_disk(spacy_model_dir)
+
+    return {'spacy_model': spacy_model_dir, 'nltk_data_dir': nltk_data_dir}
+
+
+def main():
+    """Command-line entry point for writing the resource bundle."""
+    parser = argparse.ArgumentParser(description="Bundle the preprocessor's spaCy and NLTK resources for offline nodes")
+    parser.add_argument("--output-dir", default="resources", help="Where to write the bundle")
+    parser.add_argument("--spacy-model", default="en_core_web_sm", help="spaCy model to bundle")
+    args = parser.parse_args()
+
+    paths = bundle_resources(args.output_dir, args.spacy_model)
+    print(f"Resources written to {args.output_dir}. On offline nodes set:")
+    print(f"  SPACY_MODEL={paths['spacy_model']}")
+    print(f"  NLTK_DATA_DIR={paths['nltk_data_dir']}")
+
+
+if __name__ == "__main__":
+    main()
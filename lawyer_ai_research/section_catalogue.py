@@ -0,0 +1,80 @@
+"""
+External Section Catalogues
+Loads statutory sections that are not part of the built-in IPC database (POCSO, NDPS,
+IT Act, Arms Act, ...) from JSON, JSON Lines or CSV files, in the IPC_DATABASE format.
+"""
+
+import csv
+import json
+import os
+from typing import Dict, Iterable, List
+
+REQUIRED_FIELDS = ("section", "title", "description")
+
+
+def _normalise_section(entry: Dict, source: str) -> Dict:
+    """Convert a catalogue entry into an IPC_DATABASE-style section."""
+    missing = [field for field in REQUIRED_FIELDS if not entry.get(field)]
+    if missing:
+        raise ValueError(f"{source}: section entry is missing {', '.join(missing)}")
+
+    keywords = entry.get("keywords") or []
+    if isinstance(keywords, str):
+        # CSV cells hold keywords separated by semicolons
+        keywords = [keyword.strip() for keyword in keywords.split(";")]
+
+    section = {
+        "section": str(entry["section"]).strip(),
+        "title": str(entry["title"]).strip(),
+        "description": str(entry["description"]).strip(),
+        "penalty": str(entry.get("penalty") or "Not specified"),
+        "keywords": [keyword for keyword in keywords if keyword]
+    }
+    for field in ("act", "category"):
+        if entry.get(field):
+            section[field] = str(entry[field]).strip()
+    return section
+
+
+def _read_entries(path: str) -> Iterable[Dict]:
+    """Raw section entries from a catalogue file."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8") as f:
+        if extension == ".csv":
+            return list(csv.DictReader(f))
+        if extension in (".jsonl", ".ndjson"):
+            return [json.loads(line) for line in f if line.strip()]
+
+        data = json.load(f)
+        # Either a list of sections or a mapping keyed by section number
+        return list(data.values()) if isinstance(data, dict) else data
+
+
+def load_section_catalogue(path: str) -> Dict[str, Dict]:
+    """
+    Load a section catalogue.
+
+    Each entry needs 'section' (e.g. "POCSO 4"), 'title' and 'description'; 'penalty',
+    'keywords' (a list, or semicolon-separated in CSV), 'act' and 'category' are
+    optional. Sections with a category are grouped under it by the hierarchical
+    classifier.
+
+    Args:
+        path: JSON (list or section-keyed mapping), JSON Lines or CSV file
+
+    Returns:
+        Sections keyed by section number
+    """
+    sections = {}
+    for entry in _read_entries(path):
+        section = _normalise_section(entry, path)
+        sections[section["section"]] = section
+    return sections
+
+
+def load_section_catalogues(paths: List[str]) -> Dict[str, Dict]:
+    """Load several catalogues; later files override sections of earlier ones."""
+    sections = {}
+    for path in paths:
+        sections.update(load_section_catalogue(path))
+    return sections
@@ -0,0 +1,41 @@
+"""
+Shared fixtures for the behaviour tests.
+
+The modules under test live flat in lawyer_ai_research/ and import each other by
+module name, so that directory goes on sys.path. Run from lawyer_ai_research/:
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def classifier():
+    """Classifier for the model-free methods (keyword); no model is loaded."""
+    from crime_classifier import CrimeClassifier
+    return CrimeClassifier(linear_model_path=None, cache_size=0)
+
+
+@pytest.fixture(scope="session")
+def preprocessor():
+    """Preprocessor with spaCy NER disabled, so only its regex extraction runs."""
+    from text_preprocessor import LegalTextPreprocessor
+    preprocessor = LegalTextPreprocessor()
+    preprocessor._nlp_loaded = True
+    preprocessor._nlp = None
+    return preprocessor
+
+
+@pytest.fixture
+def pipeline():
+    """Keyword-method pipeline; nothing in it needs a model download."""
+    from legal_ai_pipeline import LegalAIPipeline
+    pipeline = LegalAIPipeline(classification_method='keyword', linear_model_path=None, cache_size=0)
+    pipeline.preprocessor._nlp_loaded = True
+    pipeline.preprocessor._nlp = None
+    return pipeline
@@ -0,0 +1,64 @@
+"""Explicit section citations and the statutes they are attributed to."""
+
+import pytest
+
+from citation_extractor import CitationExtractor
+from ipc_database import get_all_sections
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return CitationExtractor(get_all_sections())
+
+
+def cited(extractor, text):
+    return [citation['section'] for citation in extractor.extract(text)]
+
+
+@pytest.mark.parametrize("text,sections", [
+    ("charged under IPC Section 378", ['IPC 378']),
+    ("booked u/s 302 IPC", ['IPC 302']),
+    ("Sections 302 and 379 of the Indian Penal Code", ['IPC 302', 'IPC 379']),
+    ("IPC302", ['IPC 302']),
+    ("u/s 302/379 IPC", ['IPC 302', 'IPC 379']),
+    ("s. 379 I.P.C.", ['IPC 379']),
+    ("302 IPC", ['IPC 302']),
+    ("booked for 302 IPC", ['IPC 302']),
+    ("punishable under 302 I.P.C. and fined", ['IPC 302']),
+    ("charged with 302/379 IPC. The trial began", ['IPC 302', 'IPC 379']),
+    ("an offence under 379 of the IPC", ['IPC 379']),
+    ("Section 302 of the Indian Penal Code, 1860", ['IPC 302']),
+    # No act named: the penal code is assumed
+    ("the accused was booked under Section 379.", ['IPC 379']),
+])
+def test_ipc_citations(extractor, text, sections):
+    assert cited(extractor, text) == sections
+
+
+@pytest.mark.parametrize("text", [
+    "appeal under Section 378 CrPC",
+    "Section 320 Cr.P.C.",
+    "bail under Section 438 Code of Criminal Procedure",
+    "Section 420 of the Code of Criminal Procedure",
+    "Section 420 of the Companies Act",
+    "charged under Section 406 Negotiable Instruments Act",
+])
+def test_other_statutes_are_not_ipc(extractor, text):
+    assert cited(extractor, text) == []
+
+
+@pytest.mark.parametrize("text", [
+    "House 302 IPC Colony",
+    "Flat No. 12, Block 302 IPC Colony, Delhi",
+    "a fine of 420 rupees",
+    "booked 302 times",
+])
+def test_bare_numbers_are_not_citations(extractor, text):
+    assert cited(extractor, text) == []
+
+
+def test_distinct_sections_in_order_of_mention(extractor):
+    text = "Charged u/s 379 IPC on Monday; later Section 302 was added and IPC 379 dropped."
+    citations = extractor.extract(text)
+    assert [citation['section'] for citation in citations] == ['IPC 379', 'IPC 302']
+    assert citations[0]['mention'] == "u/s 379 IPC"
@@ -0,0 +1,46 @@
+"""Each classification call gets its own statistics, even on a shared classifier."""
+
+import threading
+
+
+def test_stats_returned_per_call(classifier):
+    results, stats = classifier.classify_with_stats("The accused stole a phone.", ['theft'], method='keyword')
+    assert results
+    assert stats['method'] == 'keyword'
+    assert stats['nli_pairs_evaluated'] == 0
+
+    _, empty_stats = classifier.classify_with_stats("   ", ['theft'], method='keyword')
+    assert empty_stats is not stats
+    assert empty_stats == {'method': 'keyword', 'nli_pairs_evaluated': 0}
+    assert stats['method'] == 'keyword'
+
+
+def test_batch_stats_have_one_entry_per_text(classifier):
+    texts = ["The accused stole a phone.", "", "He cheated the buyer."]
+    results, stats = classifier.classify_many_with_stats(texts, [['theft'], [], ['cheating']], method='keyword')
+    assert len(results) == len(stats['nli_pairs_per_text']) == stats['batch_size'] == 3
+
+
+def test_threads_do_not_share_stats(classifier):
+    barrier = threading.Barrier(2)
+    seen = {}
+
+    def classify(name, method):
+        classifier.classify("The accused stole a phone.", ['theft'], method=method)
+        stats = classifier.last_classification_stats
+        # Both threads have classified before either reads its stats again
+        barrier.wait()
+        seen[name] = (stats, classifier.last_classification_stats)
+
+    threads = [
+        threading.Thread(target=classify, args=('keyword', 'keyword')),
+        threading.Thread(target=classify, args=('hierarchical', 'hierarchical'))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for method, (stats, later_stats) in seen.items():
+        assert stats is later_stats
+        assert stats['method'] == method
@@ -0,0 +1,79 @@
+"""Keyword method scores must equal the original per-section keyword matching."""
+
+import pytest
+
+from cases_database import get_all_cases
+
+
+def baseline_keyword_matching(sections, text, crime_keywords, top_k=5):
+    """The keyword classifier before the sparse matcher, as (section, confidence) pairs."""
+    text_lower = text.lower()
+    keyword_scores = {}
+    for section in sections:
+        score = 0
+        section_keywords = [kw.lower() for kw in section['keywords']]
+        for keyword in crime_keywords:
+            if keyword.lower() in section_keywords:
+                score += 1
+            if keyword.lower() in text_lower:
+                score += 0.5
+        title_lower = section['title'].lower()
+        desc_lower = section['description'].lower()
+        for keyword in crime_keywords:
+            if keyword.lower() in title_lower:
+                score += 2
+            if keyword.lower() in desc_lower:
+                score += 1
+        if score > 0:
+            keyword_scores[section['section_number']] = score
+
+    ranked = sorted(keyword_scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    max_possible_score = len(crime_keywords) * 3.5
+    return [
+        (section_number, min(score / max_possible_score, 1.0) if max_possible_score > 0 else 0)
+        for section_number, score in ranked
+    ]
+
+
+def case_texts():
+    return [
+        (case_id, " ".join([case['crime'], case['facts']]))
+        for case_id, case in get_all_cases().items()
+    ]
+
+
+def assert_same_ranking(classifier, text, keywords):
+    results = classifier.classify(text, keywords, method='keyword', top_k=5)
+    expected = baseline_keyword_matching(classifier.ipc_sections, text, keywords)
+    assert [result['section_number'] for result in results] == [section for section, _ in expected]
+    for result, (_, confidence) in zip(results, expected):
+        assert result['confidence_score'] == pytest.approx(confidence)
+
+
+@pytest.mark.parametrize("case_id,text", case_texts())
+def test_extracted_keywords_match_baseline(classifier, preprocessor, case_id, text):
+    assert_same_ranking(classifier, text, preprocessor.extract_crime_keywords(text.lower()))
+
+
+@pytest.mark.parametrize("case_id,text", case_texts())
+def test_supplied_keywords_only(classifier, case_id, text):
+    # Vocabulary terms in the text that were not supplied must not add to the scores
+    assert_same_ranking(classifier, text, ['steal'])
+
+
+def test_repeated_and_unknown_keywords(classifier):
+    text = "The accused stole a bicycle and threatened the owner with a knife."
+    assert_same_ranking(classifier, text, ['theft', 'theft', 'Stole', 'bicycle', 'intimidation'])
+
+
+def test_no_keywords(classifier):
+    assert classifier.classify("The accused stole a bicycle.", [], method='keyword') == []
+
+
+def test_batch_matches_single(classifier):
+    texts = [text for _, text in case_texts()]
+    keywords = [['theft', 'murder'], ['steal'], [], ['cheating', 'fraud', 'fraud']]
+    keywords += [['assault']] * (len(texts) - len(keywords))
+    batch = classifier.classify_many(texts, keywords, method='keyword', top_k=5)
+    for text, text_keywords, results in zip(texts, keywords, batch):
+        assert results == classifier.classify(text, text_keywords, method='keyword', top_k=5)
@@ -0,0 +1,46 @@
+"""Sliding-window classification returns the short-text result shape and pools raw scores."""
+
+import numpy as np
+import pytest
+
+KEYWORDS = ['theft', 'murder', 'knife']
+# Windows of different strength: the first is about theft, the rest only mention a knife
+LONG_TEXT = " ".join(
+    ["The accused committed theft of the phone."] * 30 + ["The witness saw a knife on the table."] * 60
+)
+
+
+def test_windowed_ensemble_has_short_text_keys(classifier):
+    short = classifier.classify(LONG_TEXT[:200], KEYWORDS, method='ensemble')
+    long = classifier.classify(LONG_TEXT, KEYWORDS, method='ensemble')
+    assert classifier.last_classification_stats['windows'] > 1
+    assert long and set(long[0]) == set(short[0])
+    assert 'methods' in long[0] and 'stages' in long[0]
+
+
+@pytest.mark.parametrize("method", ['keyword', 'ensemble'])
+def test_windowed_entries_match_method_format(classifier, method):
+    short = classifier.classify(LONG_TEXT[:200], KEYWORDS, method=method)
+    long = classifier.classify(LONG_TEXT, KEYWORDS, method=method)
+    assert set(long[0]) == set(short[0])
+    assert long[0].get('method') == short[0].get('method')
+
+
+def test_stages_recorded_once_per_classification(classifier):
+    before = classifier.get_stage_stats()['ensemble_classifications']
+    classifier.classify(LONG_TEXT, KEYWORDS, method='ensemble')
+    assert classifier.get_stage_stats()['ensemble_classifications'] == before + 1
+
+
+def test_ensemble_pools_raw_window_scores(classifier):
+    windows = list(classifier._iter_windows(LONG_TEXT))
+    per_method = classifier.ensemble_scores(windows, [KEYWORDS] * len(windows), per_method=True)
+    scores = classifier._ensemble_scores(np.fmax.reduce(per_method, axis=0))
+    expected = scores / scores.max()
+
+    results = classifier.classify(LONG_TEXT, KEYWORDS, method='ensemble', top_k=10)
+    for result in results:
+        idx = classifier._section_index[result['section_number']]
+        assert result['confidence_score'] == pytest.approx(expected[idx])
+    # A weak window is not rescaled to count as much as the strongest one
+    assert results[-1]['confidence_score'] < 1.0
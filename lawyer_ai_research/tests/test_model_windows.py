@@ -0,0 +1,57 @@
+"""Texts are windowed at the input limit of the model being run, not the smallest one."""
+
+import pytest
+
+from crime_classifier import CrimeClassifier
+
+SENTENCE = "The accused took the victim's phone from her bag and ran away with it"
+
+
+def words(count):
+    tokens = (SENTENCE + " ") * (count // len(SENTENCE.split()) + 1)
+    return " ".join(tokens.split()[:count])
+
+
+class RecordingNLI:
+    """Stand-in for the zero-shot pipeline that records each premise it is given."""
+
+    def __init__(self):
+        self.premises = []
+
+    def __call__(self, texts, labels, multi_label=True, batch_size=None):
+        single = isinstance(texts, str)
+        outputs = []
+        for text in [texts] if single else texts:
+            self.premises.append(text)
+            outputs.append({'labels': list(labels), 'scores': [0.5] * len(labels)})
+        return outputs[0] if single else outputs
+
+
+@pytest.fixture
+def nli_classifier():
+    classifier = CrimeClassifier(linear_model_path=None, cache_size=0)
+    classifier._models['zero_shot'] = RecordingNLI()
+    classifier._models['sentence'] = None
+    return classifier
+
+
+@pytest.mark.parametrize("method", ['zero_shot', 'ensemble'])
+def test_ordinary_transcript_takes_one_nli_pass(nli_classifier, method):
+    text = words(300)
+    results, stats = nli_classifier.classify_with_stats(text, ['theft'], method=method)
+    assert results
+    assert nli_classifier.zero_shot_classifier.premises == [text]
+    assert stats['nli_pairs_evaluated'] == len(nli_classifier.ipc_sections)
+
+
+def test_embedding_scorers_still_window_at_their_limit(nli_classifier):
+    _, stats = nli_classifier.classify_with_stats(words(300), ['theft'], method='similarity')
+    assert stats['windows'] == 2
+
+
+@pytest.mark.parametrize("method", ['zero_shot', 'ensemble'])
+def test_long_transcript_uses_nli_sized_windows(nli_classifier, method):
+    nli_classifier.classify(words(1600), ['theft'], method=method)
+    premises = nli_classifier.zero_shot_classifier.premises
+    assert len(premises) == 3
+    assert all(len(premise.split()) <= nli_classifier.nli_window_size for premise in premises)
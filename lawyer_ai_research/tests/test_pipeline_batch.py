@@ -0,0 +1,24 @@
+"""Batch processing keeps the results of groups unaffected by a classification error."""
+
+
+def test_failed_group_does_not_discard_other_results(pipeline, monkeypatch):
+    classify_many_with_stats = pipeline.classifier.classify_many_with_stats
+
+    def failing_classify_many(texts, keywords_list, method, top_k, candidate_sections=None):
+        if candidate_sections is not None:
+            raise RuntimeError("model failure")
+        return classify_many_with_stats(texts, keywords_list, method=method, top_k=top_k)
+
+    monkeypatch.setattr(pipeline.classifier, 'classify_many_with_stats', failing_classify_many)
+    results = pipeline.batch_process([
+        {'text': "The accused committed theft of a phone."},
+        {'text': "The accused committed theft of a phone.", 'candidate_sections': ['IPC 379']},
+        {'text': "Charged u/s 302 IPC for the murder."},
+    ], citation_mode='fast')
+
+    assert 'error' not in results[0]
+    assert results[0]['case_analysis']['ipc_sections']
+    assert results[1]['error'] == "model failure"
+    assert results[1]['transcript_index'] == 1
+    # Citation-only transcripts never reach the classifier
+    assert [section['section'] for section in results[2]['case_analysis']['ipc_sections']] == ['IPC 302']
@@ -0,0 +1,70 @@
+"""Result cache keys come from configuration only, and entries expire after their TTL."""
+
+import pytest
+
+import result_cache
+from crime_classifier import CrimeClassifier
+from result_cache import ClassificationCache
+
+
+@pytest.fixture
+def cached_classifier():
+    return CrimeClassifier(linear_model_path=None, cache_size=16)
+
+
+def test_cache_lookup_loads_no_model(cached_classifier, monkeypatch):
+    def load_model(role):
+        raise AssertionError(f"cache lookup loaded the {role} model")
+
+    monkeypatch.setattr(cached_classifier, '_get_model', load_model)
+    ranked = [{'section_number': 'IPC 379', 'confidence_score': 0.9}]
+    key = cached_classifier._cache_key("He stole a phone.", ['theft'], 'zero_shot')
+    cached_classifier.cache.put(key, ranked)
+
+    results, stats = cached_classifier.classify_with_stats("He  stole a phone. ", ['Theft'], method='zero_shot')
+    assert results == ranked
+    assert stats['cache_hit']
+    assert not any(cached_classifier.loaded_models().values())
+    assert cached_classifier.active_backends == {}
+
+
+def test_key_covers_model_configuration():
+    text, keywords = "He stole a phone.", ['theft']
+    base = CrimeClassifier(linear_model_path=None, cache_size=16)
+    variants = [
+        CrimeClassifier(linear_model_path=None, cache_size=16, inference_backend='onnx_int8'),
+        CrimeClassifier(linear_model_path=None, cache_size=16, sentence_model_name='all-mpnet-base-v2'),
+        CrimeClassifier(linear_model_path=None, cache_size=16, model_name='roberta-large-mnli')
+    ]
+    key = base._cache_key(text, keywords, 'ensemble')
+    assert key == CrimeClassifier(linear_model_path=None, cache_size=16)._cache_key(text, keywords, 'ensemble')
+    assert key != base._cache_key(text, keywords, 'similarity')
+    for variant in variants:
+        assert variant._cache_key(text, keywords, 'ensemble') != key
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, 'monotonic', lambda: now[0])
+    cache = ClassificationCache(max_entries=4, ttl_seconds=60)
+    cache.put('key', ['result'])
+
+    now[0] += 59
+    assert cache.get('key') == ['result']
+    now[0] += 2
+    assert cache.get('key') is None
+    assert cache.get_stats()['expirations'] == 1
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_entries_without_ttl_stay_until_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, 'monotonic', lambda: now[0])
+    cache = ClassificationCache(max_entries=2, ttl_seconds=None)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, key)
+    now[0] += 10 ** 6
+
+    assert cache.get('a') is None
+    assert cache.get('c') == 'c'
+    assert cache.get_stats()['evictions'] == 1
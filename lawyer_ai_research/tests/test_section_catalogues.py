@@ -0,0 +1,45 @@
+"""External section catalogues stay local to the classifier that loads them."""
+
+import json
+
+import pytest
+
+from crime_classifier import CrimeClassifier
+from ipc_database import IPC_DATABASE
+from penalty_estimator import PenaltyEstimator
+
+POCSO_4 = {
+    "section": "POCSO 4",
+    "title": "Punishment for penetrative sexual assault",
+    "description": "Whoever commits penetrative sexual assault on a child shall be punished.",
+    "penalty": "Imprisonment for not less than 10 years, and fine",
+    "keywords": ["child", "sexual assault"],
+    "act": "POCSO Act"
+}
+
+
+@pytest.fixture
+def catalogue(tmp_path):
+    path = tmp_path / "pocso.json"
+    path.write_text(json.dumps([POCSO_4]))
+    return str(path)
+
+
+def test_catalogue_does_not_change_shared_database(catalogue):
+    ipc_sections = dict(IPC_DATABASE)
+    with_catalogue = CrimeClassifier(section_catalogues=[catalogue], linear_model_path=None, cache_size=0)
+    without_catalogue = CrimeClassifier(linear_model_path=None, cache_size=0)
+
+    assert 'POCSO 4' in with_catalogue.sections
+    assert 'POCSO 4' in {section['section_number'] for section in with_catalogue.ipc_sections}
+    assert 'POCSO 4' not in without_catalogue.sections
+    assert IPC_DATABASE == ipc_sections
+
+
+def test_catalogue_sections_are_classified_and_priced(catalogue):
+    classifier = CrimeClassifier(section_catalogues=[catalogue], linear_model_path=None, cache_size=0)
+    results = classifier.classify("A child was subjected to sexual assault.", ['child'], method='keyword')
+    assert results[0]['section_number'] == 'POCSO 4'
+
+    assert PenaltyEstimator(classifier.sections).estimate_penalty_range('POCSO 4')
+    assert PenaltyEstimator().estimate_penalty_range('POCSO 4') == {}
@@ -0,0 +1,134 @@
+"""Transcript sessions analysed append by append give the whole transcript's analysis."""
+
+import numpy as np
+import pytest
+
+from transcript_session import SessionNotFound
+
+TRANSCRIPT = (
+    "Case No: Crl. Appeal No. 1234/2023\n"
+    "Court: High Court of Delhi\n"
+    "Facts:\n"
+    "On 10 January 2023 the accused stole a mobile phone worth Rs. 25,000 from the complainant.\n"
+    "He threatened her with a knife. The phone was recovered from his possession.\n"
+    "Judgment:\n"
+    "The accused is found guilty of theft and robbery and sentenced to 2 years imprisonment."
+)
+
+
+def summary(result):
+    preprocessing = result['preprocessing_summary']
+    return {
+        'word_count': preprocessing['word_count'],
+        'sentence_count': preprocessing['sentence_count'],
+        'entities': preprocessing['entities_extracted'],
+        'crime_keywords': preprocessing['crime_keywords_found'],
+        'actions': sorted(preprocessing['actions_identified'])
+    }
+
+
+@pytest.mark.parametrize("piece_chars", [7, 40, 1000])
+def test_appends_match_whole_transcript(pipeline, piece_chars):
+    pipeline.open_session('hearing')
+    for start in range(0, len(TRANSCRIPT), piece_chars):
+        pipeline.append_to_session('hearing', TRANSCRIPT[start:start + piece_chars])
+    appended = pipeline.close_session('hearing')
+
+    whole = pipeline.process_transcript(TRANSCRIPT)
+    assert summary(appended) == summary(whole)
+    assert appended['session']['characters'] == len(TRANSCRIPT)
+    assert appended['case_analysis']['ipc_sections']
+
+
+def test_incomplete_line_waits_for_its_end(pipeline):
+    pipeline.open_session('hearing')
+    held = pipeline.append_to_session('hearing', "Facts:\nThe accused stole a phone. He thr")
+    assert held['session']['pending_line_chars'] == len("The accused stole a phone. He thr")
+    assert held['preprocessing_summary']['word_count'] == 1
+
+    completed = pipeline.append_to_session('hearing', "eatened the owner.\n")
+    assert completed['session']['pending_line_chars'] == 0
+    assert completed['preprocessing_summary']['word_count'] == 1 + len("The accused stole a phone. He threatened the owner.".split())
+    assert 'threatened' in completed['preprocessing_summary']['actions_identified']
+
+
+def test_session_counts_its_own_nli_pairs(pipeline, monkeypatch):
+    raw_scores_with_stats = pipeline.classifier.raw_scores_with_stats
+
+    def score_during_other_session(*args, **kwargs):
+        scores, stats = raw_scores_with_stats(*args, **kwargs)
+        # Another session's request finishing on the shared classifier in the meantime
+        pipeline.classifier.last_classification_stats = {'nli_pairs_evaluated': 1000}
+        return scores, dict(stats, nli_pairs_evaluated=3)
+
+    monkeypatch.setattr(pipeline.classifier, 'raw_scores_with_stats', score_during_other_session)
+    pipeline.open_session('hearing')
+    pipeline.append_to_session('hearing', "The accused stole a phone.\n")
+    result = pipeline.append_to_session('hearing', "He threatened the owner.\n")
+    assert result['case_analysis']['classification_stats']['nli_pairs_evaluated'] == 6
+
+
+def test_unknown_session(pipeline):
+    with pytest.raises(SessionNotFound):
+        pipeline.append_to_session('missing', "text\n")
+    pipeline.open_session('hearing')
+    pipeline.close_session('hearing')
+    with pytest.raises(SessionNotFound):
+        pipeline.close_session('hearing')
+
+
+def test_key_errors_inside_an_update_are_not_session_not_found(pipeline, monkeypatch):
+    def failing_classify(*args, **kwargs):
+        raise KeyError('IPC 999')
+
+    monkeypatch.setattr(pipeline, '_classify_chunk', failing_classify)
+    pipeline.open_session('hearing')
+    with pytest.raises(KeyError) as error:
+        pipeline.append_to_session('hearing', "The accused stole a phone.\n")
+    # The API maps only SessionNotFound to 404; this stays a server error
+    assert not isinstance(error.value, SessionNotFound)
+
+
+OFFENCE_CHUNK = "Facts:\nThe accused committed theft and robbery of the phone and stole cash; the theft was planned.\n"
+SMALL_TALK_CHUNK = "The witness said the weather was fine and he was not under any threat that day.\n"
+
+
+@pytest.fixture
+def ensemble_pipeline(pipeline):
+    pipeline.classification_method = 'ensemble'
+    pipeline.classifier._models.update(zero_shot=None, sentence=None)
+    return pipeline
+
+
+def test_chunks_pool_raw_scores_before_ranking(ensemble_pipeline, monkeypatch):
+    pipeline, classifier = ensemble_pipeline, ensemble_pipeline.classifier
+    raw_scores_with_stats = classifier.raw_scores_with_stats
+    chunk_scores = []
+
+    def recording_raw_scores(*args, **kwargs):
+        scores, stats = raw_scores_with_stats(*args, **kwargs)
+        chunk_scores.append(scores)
+        return scores, stats
+
+    monkeypatch.setattr(classifier, 'raw_scores_with_stats', recording_raw_scores)
+    pipeline.open_session('hearing')
+    pipeline.append_to_session('hearing', OFFENCE_CHUNK)
+    result = pipeline.append_to_session('hearing', SMALL_TALK_CHUNK)
+    ranked = {section['section']: section['confidence_score'] for section in result['case_analysis']['ipc_sections']}
+
+    # Ranked on its own, the small talk's best section would score 1.0 like the offence's
+    small_talk_top = classifier.rank_raw_scores(chunk_scores[1], 'ensemble', 1)[0]['section_number']
+    assert ranked[small_talk_top] < 1.0
+    assert max(ranked.values()) == pytest.approx(1.0)
+
+    expected = classifier.rank_raw_scores(np.fmax(*chunk_scores), 'ensemble', pipeline.top_k_sections)
+    assert list(ranked) == [entry['section_number'] for entry in expected]
+    assert list(ranked.values()) == pytest.approx([entry['confidence_score'] for entry in expected])
+
+
+def test_classification_input_from_section_lines(preprocessor):
+    chunk = preprocessor.classification_input({
+        'facts': ["The accused stole a phone."], 'other': ["He threatened the owner."]
+    })
+    assert 'stole' in chunk['actions'] and 'threatened' in chunk['actions']
+    assert "Facts: The accused stole a phone." in chunk['classification_text']
@@ -0,0 +1,90 @@
+"""Streaming preprocessing finds what preprocess() finds on the whole transcript."""
+
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from cases_database import get_all_cases
+from text_preprocessor import LegalTextPreprocessor, TranscriptStream
+
+CHUNK_SIZES = [1000, 1700, 4096, 100_000]
+
+
+def transcript_lines():
+    lines = ["Case No: Crl. Appeal No. 1234/2023", "Court: High Court of Delhi", "Facts:"]
+    for number, case in enumerate(get_all_cases().values()):
+        lines += [
+            f"On 1{number % 10} March 2023 Mr. Ramesh Kumar{'abcdefgh'[number % 8]} paid Rs. 5,000 to the accused.",
+            case['facts'],
+            "Judgment:",
+            case['judgment']
+        ]
+    return [line + "\n" for line in lines * 3]
+
+
+class RegexNER:
+    """Stand-in for a spaCy pipeline tagging "Mr. <Name> <Name>" as PERSON; records what it parses."""
+
+    pattern = re.compile(r"Mr\. [A-Z]\w+ [A-Z]\w+")
+
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, text):
+        self.texts.append(text)
+        return SimpleNamespace(ents=[
+            SimpleNamespace(text=match.group(), label_='PERSON', start_char=match.start())
+            for match in self.pattern.finditer(text)
+        ])
+
+
+def assert_same_as_preprocess(stream_result, whole):
+    for entity_type, values in whole['entities'].items():
+        assert sorted(stream_result['entities'][entity_type]) == sorted(values), entity_type
+    assert stream_result['crime_keywords'] == whole['crime_keywords']
+    assert sorted(stream_result['actions']) == sorted(whole['actions'])
+    assert stream_result['word_count'] == whole['word_count']
+    assert stream_result['sentence_count'] == whole['sentence_count']
+
+
+@pytest.mark.parametrize("chunk_chars", CHUNK_SIZES)
+def test_stream_matches_preprocess(preprocessor, chunk_chars):
+    lines = transcript_lines()
+    whole = preprocessor.preprocess(''.join(lines))
+    assert_same_as_preprocess(preprocessor.preprocess_stream(lines, chunk_chars=chunk_chars), whole)
+
+
+@pytest.mark.parametrize("chunk_chars", CHUNK_SIZES[:2])
+def test_flush_between_lines(preprocessor, chunk_chars):
+    lines = transcript_lines()
+    stream = TranscriptStream(preprocessor, chunk_chars=chunk_chars)
+    for number, line in enumerate(lines):
+        stream.add_line(line)
+        if number % 3 == 0:
+            stream.flush()
+    assert_same_as_preprocess(stream.result(), preprocessor.preprocess(''.join(lines)))
+
+
+@pytest.mark.parametrize("chunk_chars", CHUNK_SIZES[:3])
+def test_ner_chunks_have_sentence_context(chunk_chars):
+    preprocessor = LegalTextPreprocessor()
+    preprocessor._nlp_loaded = True
+    preprocessor._nlp = ner = RegexNER()
+    lines = transcript_lines()
+
+    whole = preprocessor.preprocess(''.join(lines))
+    ner.texts.clear()
+    streamed = preprocessor.preprocess_stream(lines, chunk_chars=chunk_chars)
+
+    # Names crossing a chunk boundary are found once and whole
+    assert sorted(streamed['entities']['persons']) == sorted(whole['entities']['persons'])
+    assert len(ner.texts) > 1
+    # Each chunk after the first starts at a sentence boundary and ends at one (or the text end)
+    cleaned_text = preprocessor.clean_text(''.join(lines))
+    for text in ner.texts:
+        assert text in cleaned_text
+    for text in ner.texts[1:]:
+        assert re.match(r"\s*[A-Z0-9]", text)
+    for text in ner.texts[:-1]:
+        assert re.search(r"[.!?]['\")\]]*$", text)
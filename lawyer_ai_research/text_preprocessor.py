@@ -3,50 +3,85 @@ Text Preprocessing Pipeline for Legal Case Transcripts
 Handles cleaning, structuring, and entity extraction from court case transcripts.
 """
 
+import os
 import re
-import spacy
-from typing import Dict, List, Tuple, Optional
+import threading
+from typing import Dict, Iterable, List, Tuple, Optional
 from datetime import datetime
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# Words that end with a period without ending a sentence ("Mr. Smith", "Rs. 500", "u/s. 302")
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sh', 'smt', 'hon', 'sr', 'jr', 'st',
+    'no', 'nos', 'rs', 'sec', 'secs', 'vs', 'viz', 'cf',
+    'crl', 'cr', 'art', 'arts', 'cl', 'para', 'paras', 'govt', 'dept', 'ltd', 'co', 'inc'
+}
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+_SENTENCE_END = re.compile(r'(\w*)([.!?]+)["\')\]]*(?=\s|$)')
+
+
+def _ends_sentence(match) -> bool:
+    """Whether a _SENTENCE_END match ends a sentence rather than an abbreviation or initial."""
+    word, punctuation = match.groups()
+    return not (punctuation == '.' and (word.lower() in ABBREVIATIONS or (len(word) == 1 and word.isalpha())))
+
+
+def count_sentences(text: str) -> int:
+    """
+    Count the sentences in a text without a tokenizer model.
+    
+    A sentence ends at '.', '!' or '?' followed by whitespace or the end of the text,
+    except after common abbreviations and single-letter initials; trailing text without
+    a terminator counts as one more sentence.
+    """
+    count = 0
+    last_end = 0
+    for match in _SENTENCE_END.finditer(text):
+        if _ends_sentence(match):
+            count += 1
+            last_end = match.end()
+    if text[last_end:].strip():
+        count += 1
+    return count
+
+
+# Entity types of extract_entities(), and the spaCy NER labels feeding them
+ENTITY_TYPES = ['persons', 'locations', 'organizations', 'dates', 'amounts', 'case_numbers', 'courts']
+SPACY_ENTITY_TYPES = {'PERSON': 'persons', 'GPE': 'locations', 'LOC': 'locations', 'ORG': 'organizations'}
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
 
 class LegalTextPreprocessor:
     """Preprocesses legal case transcripts for IPC classification."""
     
-    def __init__(self):
-        """Initialize the preprocessor with required models."""
-        try:
-            # Load spaCy model (you may need to install: python -m spacy download en_core_web_sm)
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            print("Warning: spaCy model not found. Install with: python -m spacy download en_core_web_sm")
-            self.nlp = None
-        
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
+    # Only doc.ents is read, and en_core_web_sm's NER has its own tok2vec layer, so the
+    # other components are never loaded
+    SPACY_EXCLUDE = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter']
+    
+    def __init__(self, spacy_model: str = "en_core_web_sm", nltk_data_dir: Optional[str] = None):
+        """
+        Initialize the preprocessor; spaCy and NLTK resources are loaded on first use.
+        
+        Nothing is downloaded: on offline nodes point these at a bundle written by
+        resource_bundle.py.
+        
+        Args:
+            spacy_model: Installed spaCy model name, or the path of a saved model directory
+            nltk_data_dir: Extra directory searched for NLTK corpora (stopwords, wordnet)
+        """
+        self.spacy_model = spacy_model
+        self.nltk_data_dir = nltk_data_dir
+        self._nlp = None
+        self._nlp_loaded = False
+        self._nlp_lock = threading.Lock()
+        self._stop_words = None
+        self._lemmatizer = None
+        self._lemmatizer_loaded = False
         
         # Legal-specific patterns
         self.court_patterns = [
             r'Court\s+of\s+([A-Z][a-z]+)',
-            r'([A-Z][a-z]+)\s+Court',
+            # ([A-Z][a-z]+)\s+Court, only tried where a word starts (or right after a previous
+            # match) instead of at every letter: same matches, a fraction of the backtracking
+            r'(?:(?<![a-z])|(?<=court))([A-Z][a-z]+)\s+Court',
             r'High\s+Court\s+of\s+([A-Z][a-z]+)',
             r'Supreme\s+Court'
         ]
@@ -54,7 +89,8 @@ class LegalTextPreprocessor:
         self.date_patterns = [
             r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
             r'\b\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{2,4}\b',
-            r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{2,4}\b'
+            # (?=[adfjmnos]) rejects most positions before the month alternation is tried
+            r'\b(?=[adfjmnos])(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{2,4}\b'
         ]
         
         self.case_number_patterns = [
@@ -68,31 +104,170 @@ class LegalTextPreprocessor:
             r'₹\s*(\d+(?:,\d{3})*(?:\.\d{2})?)',
             r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*rupees?'
         ]
+        
+        self.crime_keywords = [
+            'theft', 'steal', 'stolen', 'robbery', 'rob', 'burglary', 'burgle',
+            'murder', 'kill', 'killed', 'homicide', 'assault', 'attack', 'hurt',
+            'rape', 'sexual', 'molest', 'molestation', 'abuse', 'abused',
+            'fraud', 'cheat', 'cheating', 'deceive', 'deception', 'forgery',
+            'extortion', 'blackmail', 'threat', 'threaten', 'intimidate',
+            'kidnap', 'kidnapping', 'abduct', 'abduction', 'trespass',
+            'defamation', 'slander', 'libel', 'breach of trust', 'embezzle',
+            'conspiracy', 'conspire', 'conspirator', 'dacoity', 'dacoit'
+        ]
+        
+        self.action_patterns = [
+            r'\b(?:stole|stolen|stealing)\b',
+            r'\b(?:robbed|robbing|robbery)\b',
+            r'\b(?:killed|killing|murdered|murdering)\b',
+            r'\b(?:attacked|attacking|assaulted|assaulting)\b',
+            r'\b(?:raped|raping|molested|molesting)\b',
+            r'\b(?:cheated|cheating|defrauded|defrauding)\b',
+            r'\b(?:threatened|threatening|intimidated|intimidating)\b',
+            r'\b(?:kidnapped|kidnapping|abducted|abducting)\b',
+            r'\b(?:trespassed|trespassing|entered illegally)\b',
+            r'\b(?:forged|forging|falsified|falsifying)\b'
+        ]
+        
+        # Common section headers
+        self.section_headers = {
+            'case_header': [r'Case\s+No', r'Court\s+Name', r'Petitioner', r'Respondent', r'Date\s+of\s+Judgment'],
+            'facts': [r'Facts', r'Background', r'Case\s+History', r'Incident'],
+            'allegations': [r'Allegations', r'Charges', r'Complaint', r'FIR'],
+            'evidence': [r'Evidence', r'Testimony', r'Witness', r'Documents'],
+            'arguments': [r'Arguments', r'Submissions', r'Contentions', r'Pleadings'],
+            'judgment': [r'Judgment', r'Order', r'Decision', r'Verdict', r'Conclusion']
+        }
+        
+        self._compile_patterns()
+
+    def _compile_patterns(self):
+        """
+        Compile the pattern lists once per preprocessor instead of on every call.
+        
+        Entity patterns stay separate regexes: a match of one must not hide an overlapping
+        match of another ("High Court of Delhi" yields both "High" and "Delhi"). Action words
+        never overlap, and section headers only need any match, so each of those is merged
+        into a single alternation.
+        """
+        self._entity_regexes = [
+            (entity_type, re.compile(pattern, re.IGNORECASE))
+            for entity_type, patterns in (
+                ('dates', self.date_patterns),
+                ('case_numbers', self.case_number_patterns),
+                ('courts', self.court_patterns),
+                ('amounts', self.amount_patterns)
+            )
+            for pattern in patterns
+        ]
+        # Every action word starts with one of these letters; checking that first spares the
+        # alternation at most positions
+        self._action_regex = re.compile(
+            '(?=[acdefikmrst])(?:' + '|'.join(self.action_patterns) + ')', re.IGNORECASE
+        )
+        self._section_header_regexes = [
+            (section, re.compile('|'.join(patterns), re.IGNORECASE))
+            for section, patterns in self.section_headers.items()
+        ]
+        self._special_chars_regex = re.compile(r'[^\w\s.,;:!?()\[\]{}"-]')
+        self._repeated_punctuation_regex = re.compile(r'([.!?])\1+')
 
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded on first access (None if the model is not installed)."""
+        if not self._nlp_loaded:
+            with self._nlp_lock:
+                if not self._nlp_loaded:
+                    try:
+                        # Load spaCy model (you may need to install: python -m spacy download en_core_web_sm)
+                        import spacy
+                        self._nlp = spacy.load(self.spacy_model, exclude=self.SPACY_EXCLUDE)
+                    except (ImportError, OSError):
+                        print(f"Warning: spaCy model {self.spacy_model} not found. "
+                              "Install with: python -m spacy download en_core_web_sm")
+                        self._nlp = None
+                    self._nlp_loaded = True
+        return self._nlp
+    
+    def _nltk_data(self):
+        """The nltk module with nltk_data_dir on its search path (None if NLTK is not installed)."""
+        try:
+            import nltk
+        except ImportError:
+            return None
+        if self.nltk_data_dir and os.path.abspath(self.nltk_data_dir) not in nltk.data.path:
+            nltk.data.path.insert(0, os.path.abspath(self.nltk_data_dir))
+        return nltk
+    
+    @property
+    def stop_words(self) -> set:
+        """English stop words: NLTK's list if its corpus is available, otherwise spaCy's."""
+        if self._stop_words is None:
+            stop_words = None
+            if self._nltk_data() is not None:
+                try:
+                    from nltk.corpus import stopwords
+                    stop_words = set(stopwords.words('english'))
+                except LookupError:
+                    pass
+            if stop_words is None:
+                try:
+                    from spacy.lang.en.stop_words import STOP_WORDS
+                    stop_words = set(STOP_WORDS)
+                except ImportError:
+                    print("Warning: no stop word list available (NLTK stopwords corpus or spaCy)")
+                    stop_words = set()
+            self._stop_words = stop_words
+        return self._stop_words
+    
+    @property
+    def lemmatizer(self):
+        """NLTK WordNet lemmatizer, loaded on first access (None if WordNet is not available)."""
+        if not self._lemmatizer_loaded:
+            nltk = self._nltk_data()
+            try:
+                if nltk is None:
+                    raise LookupError("NLTK is not installed")
+                nltk.data.find('corpora/wordnet')
+                from nltk.stem import WordNetLemmatizer
+                self._lemmatizer = WordNetLemmatizer()
+            except LookupError:
+                print("Warning: WordNet not found. Bundle it with: python resource_bundle.py")
+                self._lemmatizer = None
+            self._lemmatizer_loaded = True
+        return self._lemmatizer
+    
+    def warmup(self) -> bool:
+        """Load the spaCy model up front; returns whether it is available."""
+        return self.nlp is not None
+    
     def clean_text(self, text: str) -> str:
         """Clean and normalize the input text."""
         if not text:
             return ""
         
-        # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Remove special characters but keep legal punctuation
-        text = re.sub(r'[^\w\s.,;:!?()\[\]{}"-]', ' ', text)
+        # Remove extra whitespace and normalize (str.split() splits on exactly the characters \s matches)
+        text = ' '.join(text.split())
         
-        # Normalize quotes
-        text = re.sub(r'["""]', '"', text)
-        text = re.sub(r'[''']', "'", text)
+        # Remove special characters but keep legal punctuation (curly quotes included)
+        text = self._special_chars_regex.sub(' ', text)
         
         # Remove excessive punctuation
-        text = re.sub(r'[.]{2,}', '.', text)
-        text = re.sub(r'[!]{2,}', '!', text)
-        text = re.sub(r'[?]{2,}', '?', text)
+        text = self._repeated_punctuation_regex.sub(r'\1', text)
         
         return text.strip()
 
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
-        """Extract named entities from the text."""
+    def extract_entities(self, text: str, doc=None) -> Dict[str, List[str]]:
+        """
+        Extract named entities from the text.
+        
+        Args:
+            text: Cleaned transcript text
+            doc: spaCy Doc of the text if it was already parsed (e.g. by nlp.pipe)
+            
+        Returns:
+            Entity strings by type
+        """
         entities = {
             'persons': [],
             'locations': [],
@@ -103,29 +278,14 @@ class LegalTextPreprocessor:
             'courts': []
         }
         
-        # Extract dates
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            entities['dates'].extend(matches)
-        
-        # Extract case numbers
-        for pattern in self.case_number_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            entities['case_numbers'].extend(matches)
-        
-        # Extract court names
-        for pattern in self.court_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            entities['courts'].extend(matches)
-        
-        # Extract amounts
-        for pattern in self.amount_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            entities['amounts'].extend(matches)
+        # Dates, case numbers, court names and amounts
+        for entity_type, regex in self._entity_regexes:
+            entities[entity_type].extend(regex.findall(text))
         
         # Use spaCy for NER if available
-        if self.nlp:
+        if doc is None and self.nlp:
             doc = self.nlp(text)
+        if doc is not None:
             for ent in doc.ents:
                 if ent.label_ == 'PERSON':
                     entities['persons'].append(ent.text)
@@ -142,21 +302,10 @@ class LegalTextPreprocessor:
 
     def extract_crime_keywords(self, text: str) -> List[str]:
         """Extract crime-related keywords from the text."""
-        crime_keywords = [
-            'theft', 'steal', 'stolen', 'robbery', 'rob', 'burglary', 'burgle',
-            'murder', 'kill', 'killed', 'homicide', 'assault', 'attack', 'hurt',
-            'rape', 'sexual', 'molest', 'molestation', 'abuse', 'abused',
-            'fraud', 'cheat', 'cheating', 'deceive', 'deception', 'forgery',
-            'extortion', 'blackmail', 'threat', 'threaten', 'intimidate',
-            'kidnap', 'kidnapping', 'abduct', 'abduction', 'trespass',
-            'defamation', 'slander', 'libel', 'breach of trust', 'embezzle',
-            'conspiracy', 'conspire', 'conspirator', 'dacoity', 'dacoit'
-        ]
-        
         found_keywords = []
         text_lower = text.lower()
         
-        for keyword in crime_keywords:
+        for keyword in self.crime_keywords:
             if keyword in text_lower:
                 found_keywords.append(keyword)
         
@@ -164,47 +313,13 @@ class LegalTextPreprocessor:
 
     def extract_actions(self, text: str) -> List[str]:
         """Extract action verbs that might indicate criminal activity."""
-        action_patterns = [
-            r'\b(?:stole|stolen|stealing)\b',
-            r'\b(?:robbed|robbing|robbery)\b',
-            r'\b(?:killed|killing|murdered|murdering)\b',
-            r'\b(?:attacked|attacking|assaulted|assaulting)\b',
-            r'\b(?:raped|raping|molested|molesting)\b',
-            r'\b(?:cheated|cheating|defrauded|defrauding)\b',
-            r'\b(?:threatened|threatening|intimidated|intimidating)\b',
-            r'\b(?:kidnapped|kidnapping|abducted|abducting)\b',
-            r'\b(?:trespassed|trespassing|entered illegally)\b',
-            r'\b(?:forged|forging|falsified|falsifying)\b'
-        ]
-        
-        actions = []
-        for pattern in action_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            actions.extend(matches)
+        actions = self._action_regex.findall(text)
         
         return list(set(actions))
 
     def structure_transcript(self, text: str) -> Dict[str, str]:
         """Structure the transcript into logical sections."""
-        sections = {
-            'case_header': '',
-            'facts': '',
-            'allegations': '',
-            'evidence': '',
-            'arguments': '',
-            'judgment': '',
-            'other': ''
-        }
-        
-        # Common section headers
-        section_headers = {
-            'case_header': [r'Case\s+No', r'Court\s+Name', r'Petitioner', r'Respondent', r'Date\s+of\s+Judgment'],
-            'facts': [r'Facts', r'Background', r'Case\s+History', r'Incident'],
-            'allegations': [r'Allegations', r'Charges', r'Complaint', r'FIR'],
-            'evidence': [r'Evidence', r'Testimony', r'Witness', r'Documents'],
-            'arguments': [r'Arguments', r'Submissions', r'Contentions', r'Pleadings'],
-            'judgment': [r'Judgment', r'Order', r'Decision', r'Verdict', r'Conclusion']
-        }
+        sections = {section: [] for section in self.section_names}
         
         lines = text.split('\n')
         current_section = 'other'
@@ -214,33 +329,91 @@ class LegalTextPreprocessor:
             if not line:
                 continue
             
-            # Check if line matches any section header
-            for section, patterns in section_headers.items():
-                for pattern in patterns:
-                    if re.search(pattern, line, re.IGNORECASE):
-                        current_section = section
-                        break
-                if current_section != 'other':
-                    break
-            
-            sections[current_section] += line + ' '
-        
-        # Clean up sections
-        for key in sections:
-            sections[key] = sections[key].strip()
+            current_section = self._line_section(line, current_section)
+            sections[current_section].append(line)
         
-        return sections
+        return {section: ' '.join(section_lines) for section, section_lines in sections.items()}
+
+    @property
+    def section_names(self) -> List[str]:
+        """Transcript sections, ending with 'other' for lines outside any headed section."""
+        return list(self.section_headers) + ['other']
+
+    def _line_section(self, line: str, current_section: str) -> str:
+        """Section a line belongs to, given the section of the lines before it."""
+        # Check if line matches any section header
+        for section, regex in self._section_header_regexes:
+            if regex.search(line):
+                return section
+            if current_section != 'other':
+                break
+        return current_section
 
     def preprocess(self, text: str) -> Dict:
         """Main preprocessing function that combines all steps."""
         if not text:
             return {}
         
-        # Clean the text
-        cleaned_text = self.clean_text(text)
-        
+        return self._preprocess_cleaned(text, self.clean_text(text))
+
+    def preprocess_many(self, texts: List[str], n_process: int = 1, batch_size: int = 32) -> List[Dict]:
+        """
+        Preprocess a batch of transcripts, running spaCy NER over them with nlp.pipe.
+        
+        Args:
+            texts: Raw transcript texts
+            n_process: spaCy worker processes (1 parses in this process)
+            batch_size: Texts per nlp.pipe batch
+            
+        Returns:
+            One preprocess() result per text, in order ({} for empty texts)
+        """
+        cleaned = {i: self.clean_text(text) for i, text in enumerate(texts) if text}
+        docs = {}
+        if self.nlp and cleaned:
+            docs = dict(zip(cleaned, self.nlp.pipe(cleaned.values(), n_process=n_process, batch_size=batch_size)))
+        
+        return [
+            self._preprocess_cleaned(text, cleaned[i], docs.get(i)) if i in cleaned else {}
+            for i, text in enumerate(texts)
+        ]
+
+    def preprocess_stream(self, 
+                          lines: Iterable[str], 
+                          chunk_chars: int = 100_000, 
+                          max_section_chars: int = 20_000) -> Dict:
+        """
+        Preprocess a transcript read line by line, in memory bounded by the chunk size.
+        
+        Pattern-matched entities, keywords, actions and the word and sentence counts are
+        those of preprocess() on the whole text. spaCy entities (persons, locations,
+        organizations) come from NER over each chunk with a sentence of context on either
+        side, so they can differ from a whole-text parse where the model would use more
+        context than that. Sections are assigned per line (preprocess() sees the
+        cleaned text as a single line) and each keeps only its first max_section_chars
+        characters, so the result has no 'original_text' or 'cleaned_text'.
+        
+        Args:
+            lines: Transcript lines (e.g. an open file)
+            chunk_chars: Characters of cleaned text scanned at a time
+            max_section_chars: Characters kept per section for the classification text
+            
+        Returns:
+            preprocess() result without the full texts, plus 'truncated_sections'
+        """
+        stream = TranscriptStream(self, chunk_chars=chunk_chars, max_section_chars=max_section_chars)
+        stream.feed(lines)
+        return stream.result()
+
+    def preprocess_file(self, path: str, encoding: str = 'utf-8', **kwargs) -> Dict:
+        """preprocess_stream() over the lines of a text file."""
+        with open(path, encoding=encoding) as f:
+            return self.preprocess_stream(f, **kwargs)
+
+    def _preprocess_cleaned(self, text: str, cleaned_text: str, doc=None) -> Dict:
+        """Preprocessing steps after cleaning (doc: spaCy Doc of cleaned_text, if already parsed)."""
         # Extract entities
-        entities = self.extract_entities(cleaned_text)
+        entities = self.extract_entities(cleaned_text, doc)
         
         # Extract crime keywords
         crime_keywords = self.extract_crime_keywords(cleaned_text)
@@ -265,7 +438,32 @@ class LegalTextPreprocessor:
             'structured_sections': structured_sections,
             'classification_text': classification_text,
             'word_count': len(cleaned_text.split()),
-            'sentence_count': len(sent_tokenize(cleaned_text))
+            'sentence_count': count_sentences(cleaned_text)
+        }
+
+    def classification_input(self, section_lines: Dict[str, List[str]]) -> Dict:
+        """
+        Crime keywords, actions and classification text of cleaned lines already assigned
+        to transcript sections (e.g. the lines appended to a transcript since its last update).
+        
+        Args:
+            section_lines: Cleaned lines by section name ('facts', 'evidence', ...)
+            
+        Returns:
+            Dict with 'crime_keywords', 'actions' and 'classification_text'
+        """
+        cleaned_text = ' '.join(line for lines in section_lines.values() for line in lines)
+        crime_keywords = self.extract_crime_keywords(cleaned_text)
+        actions = self.extract_actions(cleaned_text)
+        return {
+            'crime_keywords': crime_keywords,
+            'actions': actions,
+            'classification_text': self._create_classification_text(
+                cleaned_text,
+                crime_keywords,
+                actions,
+                {section: ' '.join(lines) for section, lines in section_lines.items()}
+            )
         }
 
     def _create_classification_text(self, cleaned_text: str, crime_keywords: List[str], 
@@ -293,6 +491,215 @@ class LegalTextPreprocessor:
         
         return " ".join(classification_parts)
 
+class TranscriptStream:
+    """
+    Preprocessing state of a transcript consumed line by line.
+    
+    Cleaned lines are scanned in chunks of about chunk_chars characters. Each scan starts
+    OVERLAP_CHARS before the new text (as context for word boundaries) and only counts
+    matches starting in the new text; the last OVERLAP_CHARS of each chunk are left for the
+    next scan, so a match crossing a chunk boundary is found once and whole. spaCy NER
+    runs per chunk, widened by the sentence before it and to the end of its last sentence;
+    only entities starting in the chunk are kept. Only distinct entities, keywords and
+    actions, counters and the start of each section are kept.
+    """
+    
+    OVERLAP_CHARS = 1000
+    
+    def __init__(self, 
+                 preprocessor: LegalTextPreprocessor, 
+                 chunk_chars: int = 100_000, 
+                 max_section_chars: int = 20_000):
+        """
+        Start an empty transcript.
+        
+        Args:
+            preprocessor: Preprocessor whose patterns and spaCy model are used
+            chunk_chars: Characters of cleaned text scanned at a time
+            max_section_chars: Characters kept per section (and of the cleaned text as
+                the fallback classification text)
+        """
+        self.preprocessor = preprocessor
+        self.chunk_chars = max(chunk_chars, self.OVERLAP_CHARS)
+        self.max_section_chars = max_section_chars
+        
+        self.entities = {entity_type: set() for entity_type in ENTITY_TYPES}
+        self.crime_keywords = set()
+        self.actions = set()
+        self.word_count = 0
+        self.sentence_count = 0
+        # Whether scanned text follows the last sentence end (an unterminated sentence)
+        self._open_sentence = False
+        # Global offset up to which a counted sentence end reaches
+        self._sentence_end_offset = 0
+        
+        self.current_section = 'other'
+        self.sections = {section: [] for section in preprocessor.section_names}
+        self._section_chars = dict.fromkeys(self.sections, 0)
+        self.truncated_sections = set()
+        self._text_start = []
+        self._text_start_chars = 0
+        
+        # Scanned text kept as context for the next scan, and text not scanned yet
+        self._context = ''
+        self._pending = []
+        self._pending_chars = 0
+        # Global offset of the start of _context
+        self._offset = 0
+        self._empty = True
+    
+    def feed(self, lines: Iterable[str]):
+        """Add lines to the transcript."""
+        for line in lines:
+            self.add_line(line)
+    
+    def add_line(self, line: str) -> str:
+        """Add one line to the transcript and return it cleaned ('' if it has no text)."""
+        cleaned = self.preprocessor.clean_text(line)
+        if not cleaned:
+            return cleaned
+        
+        self.current_section = self.preprocessor._line_section(cleaned, self.current_section)
+        self._keep(self.current_section, cleaned)
+        self.word_count += len(cleaned.split())
+        
+        # The cleaned lines joined by spaces are the cleaned whole transcript
+        segment = cleaned if self._empty else ' ' + cleaned
+        self._empty = False
+        if self._text_start_chars < self.max_section_chars:
+            self._text_start.append(segment[:self.max_section_chars - self._text_start_chars])
+            self._text_start_chars += len(self._text_start[-1])
+        self._pending.append(segment)
+        self._pending_chars += len(segment)
+        if self._pending_chars >= self.chunk_chars + self.OVERLAP_CHARS:
+            self._scan()
+        return cleaned
+    
+    def flush(self):
+        """
+        Scan the pending text now instead of once chunk_chars have accumulated.
+        
+        Only the last OVERLAP_CHARS stay pending, so result() rescans a bounded tail
+        when lines arrive in small increments.
+        """
+        if self._pending_chars > self.OVERLAP_CHARS:
+            self._scan()
+    
+    def _keep(self, section: str, line: str):
+        """Append a line to a section, up to max_section_chars."""
+        room = self.max_section_chars - self._section_chars[section]
+        if room <= 0 or len(line) > room:
+            self.truncated_sections.add(section)
+        if room > 0:
+            self.sections[section].append(line[:room])
+            self._section_chars[section] += min(len(line), room) + 1
+    
+    def _scan(self):
+        """Scan the pending text except its last OVERLAP_CHARS, and keep the results."""
+        text = self._context + ''.join(self._pending)
+        start, stop = len(self._context), len(text) - self.OVERLAP_CHARS
+        found = self._collect(text, start, stop)
+        
+        for entity_type, values in found['entities'].items():
+            self.entities[entity_type] |= values
+        self.crime_keywords |= found['crime_keywords']
+        self.actions |= found['actions']
+        self.sentence_count += found['sentence_count']
+        self._open_sentence = found['open_sentence']
+        self._sentence_end_offset = found['sentence_end_offset']
+        
+        context_start = max(stop - self.OVERLAP_CHARS, 0)
+        self._offset += context_start
+        self._context = text[context_start:stop]
+        self._pending = [text[stop:]]
+        self._pending_chars = len(text) - stop
+    
+    @staticmethod
+    def _ner_bounds(text: str, start: int, stop: int) -> Tuple[int, int]:
+        """text[start:stop] widened back by one whole sentence and on to the next sentence end."""
+        ends = [match.end() for match in _SENTENCE_END.finditer(text) if _ends_sentence(match)]
+        before = [end for end in ends if end <= start]
+        ner_start = before[-2] if len(before) > 1 else 0
+        ner_stop = next((end for end in ends if end >= stop), len(text))
+        return ner_start, ner_stop
+    
+    def _collect(self, text: str, start: int, stop: int) -> Dict:
+        """Entities, keywords, actions and sentence ends of the matches starting in text[start:stop]."""
+        preprocessor = self.preprocessor
+        entities = {entity_type: set() for entity_type in ENTITY_TYPES}
+        for entity_type, regex in preprocessor._entity_regexes:
+            for match in regex.finditer(text):
+                if start <= match.start() < stop:
+                    value = (match.group(1) if regex.groups else match.group()).strip()
+                    if value:
+                        entities[entity_type].add(value)
+        
+        if preprocessor.nlp and stop > start:
+            # NER also sees the sentence before the chunk and the rest of the sentence the
+            # chunk stops in, and keeps the entities starting in the chunk
+            ner_start, ner_stop = self._ner_bounds(text, start, stop)
+            for ent in preprocessor.nlp(text[ner_start:ner_stop]).ents:
+                entity_type = SPACY_ENTITY_TYPES.get(ent.label_)
+                if entity_type and ent.text.strip() and start <= ner_start + ent.start_char < stop:
+                    entities[entity_type].add(ent.text.strip())
+        
+        actions = {
+            match.group() for match in preprocessor._action_regex.finditer(text)
+            if start <= match.start() < stop
+        }
+        
+        # A keyword split by the end of the text is still found in the next scan
+        text_lower = text.lower()
+        crime_keywords = {keyword for keyword in preprocessor.crime_keywords if keyword in text_lower}
+        
+        sentence_count = 0
+        open_sentence = self._open_sentence
+        after = max(start, self._sentence_end_offset - self._offset)
+        for match in _SENTENCE_END.finditer(text):
+            if start <= match.start() < stop and _ends_sentence(match):
+                sentence_count += 1
+                open_sentence = False
+                after = match.end()
+        if text[after:stop].strip():
+            open_sentence = True
+        
+        return {
+            'entities': entities,
+            'crime_keywords': crime_keywords,
+            'actions': actions,
+            'sentence_count': sentence_count,
+            'open_sentence': open_sentence,
+            'sentence_end_offset': self._offset + after
+        }
+    
+    def result(self) -> Dict:
+        """Preprocessing result of the lines added so far (see preprocess_stream)."""
+        text = self._context + ''.join(self._pending)
+        found = self._collect(text, len(self._context), len(text))
+        
+        sections = {section: ' '.join(lines) for section, lines in self.sections.items()}
+        crime_keywords = [
+            keyword for keyword in self.preprocessor.crime_keywords
+            if keyword in self.crime_keywords or keyword in found['crime_keywords']
+        ]
+        actions = list(self.actions | found['actions'])
+        
+        return {
+            'entities': {
+                entity_type: list(values | found['entities'][entity_type])
+                for entity_type, values in self.entities.items()
+            },
+            'crime_keywords': crime_keywords,
+            'actions': actions,
+            'structured_sections': sections,
+            'truncated_sections': sorted(self.truncated_sections),
+            'classification_text': self.preprocessor._create_classification_text(
+                ''.join(self._text_start), crime_keywords, actions, sections
+            ),
+            'word_count': self.word_count,
+            'sentence_count': self.sentence_count + found['sentence_count'] + int(found['open_sentence'])
+        }
+
 # Example usage and testing
 if __name__ == "__main__":
     # Sample legal transcript
@@ -0,0 +1,152 @@
+"""
+Transcript Sessions
+Running analysis of transcripts that grow during a hearing. Each session keeps the
+preprocessing state of its transcript (a TranscriptStream) and the raw classification
+scores of its appended chunks pooled per section, so an update only processes the
+appended text.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from crime_classifier import CrimeClassifier
+from text_preprocessor import TranscriptStream
+
+
+class SessionNotFound(Exception):
+    """No open session has the requested ID (never opened, closed or evicted)."""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"No open session {session_id}")
+        self.session_id = session_id
+
+
+class TranscriptSession:
+    """State of one transcript analysed incrementally."""
+
+    def __init__(self,
+                 session_id: str,
+                 stream: TranscriptStream,
+                 case_metadata: Optional[Dict] = None,
+                 citation_mode: str = 'off',
+                 candidate_sections: Optional[List[str]] = None):
+        """
+        Start an empty session.
+
+        Args:
+            session_id: Transcript identifier
+            stream: Preprocessing state of the transcript
+            case_metadata: Optional metadata about the case
+            citation_mode: Citation mode used for every update
+            candidate_sections: Only rank these sections (e.g. the charges in the FIR)
+        """
+        self.session_id = session_id
+        self.stream = stream
+        self.case_metadata = case_metadata
+        self.citation_mode = citation_mode
+        self.candidate_sections = candidate_sections
+
+        # Cited sections by section number, in order of first citation
+        self.cited: Dict[str, Dict] = {}
+        # Max or sum of the chunks' raw scores (CrimeClassifier.raw_scores_with_stats)
+        self.pooled_scores: Optional[np.ndarray] = None
+        self.chunks_classified = 0
+        # Ensemble stages run by any chunk
+        self.stages_run: List[str] = []
+        self.nli_pairs_evaluated = 0
+        self.characters = 0
+        self.updates = 0
+        # Text after the last line break, added once its line is complete
+        self.partial_line = ''
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.lock = threading.Lock()
+
+    def split_lines(self, text: str, final: bool = False) -> List[str]:
+        """
+        Complete lines of the transcript after appending text.
+
+        Args:
+            text: Appended text
+            final: Also return the incomplete last line (the transcript is finished)
+        """
+        self.characters += len(text)
+        self.updates += 1
+        self.updated_at = datetime.now()
+
+        lines = (self.partial_line + text).split('\n')
+        self.partial_line = '' if final else lines.pop()
+        return [line for line in lines if line]
+
+    def pool(self, scores: np.ndarray, pooling: str, stages_run: List[str]):
+        """Merge one chunk's raw scores, and the ensemble stages it ran, into the session."""
+        if self.pooled_scores is None:
+            self.pooled_scores = scores.copy()
+        else:
+            self.pooled_scores = CrimeClassifier.pool_scores(self.pooled_scores, scores, pooling)
+        self.chunks_classified += 1
+        self.stages_run = [
+            stage for stage in CrimeClassifier.ENSEMBLE_STAGES if stage in self.stages_run or stage in stages_run
+        ]
+
+    def session_scores(self, pooling: str) -> Optional[np.ndarray]:
+        """Raw scores pooled over all chunks (None before the first classified chunk)."""
+        if self.pooled_scores is None or pooling != 'mean':
+            return self.pooled_scores
+        return self.pooled_scores / self.chunks_classified
+
+    def info(self) -> Dict:
+        """Summary of the session for API responses."""
+        return {
+            'session_id': self.session_id,
+            'updates': self.updates,
+            'characters': self.characters,
+            'chunks_classified': self.chunks_classified,
+            'pending_line_chars': len(self.partial_line),
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+
+class SessionStore:
+    """Open sessions by ID, evicting the least recently updated beyond max_sessions."""
+
+    def __init__(self, max_sessions: int = 100):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, TranscriptSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session: TranscriptSession):
+        """Register a session, replacing any open session with the same ID."""
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get(self, session_id: str) -> TranscriptSession:
+        """Open session by ID (SessionNotFound if there is none)."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise SessionNotFound(session_id)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def remove(self, session_id: str) -> TranscriptSession:
+        """Close a session and return it (SessionNotFound if there is none)."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                raise SessionNotFound(session_id)
+            return session
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)